@@ -350,7 +350,7 @@ def cascade_concept(
     st = get_session(session_id, db)
     if not st:
         return {"error": "unknown session"}
-    facts = st.net._facts_by_concept.get(concept_id, set())
+    facts = list(st.net.store.by_concept(concept_id))
     return {
         "count": len(facts),
         "affected_facts": [
@@ -371,7 +371,7 @@ def cascade_predicate(
     st = get_session(session_id, db)
     if not st:
         return {"error": "unknown session"}
-    facts = st.net._facts_by_pred.get(predicate_name, set())
+    facts = st.net.view(predicate_name)
     return {
         "count": len(facts),
         "affected_facts": [
@@ -8,9 +8,11 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ctmsn.core.concept import Concept
+from ctmsn.forcing.budget import Budget
 from ctmsn.forcing.conditions import Conditions
 from ctmsn.forcing.engine import ForcingEngine
 from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.planner import plan
 from ctmsn.param.context import Context
 from ctmsn.param.domain import EnumDomain, PredicateDomain, RangeDomain
 from ctmsn.param.variable import Variable
@@ -276,7 +278,8 @@ def evaluate_formula(
             except (ValueError, TypeError):
                 pass
 
-    result = evaluate(formula, st.net, ctx)
+    # Переставленные операнды — только для вычисления; текст формулы исходный.
+    result = evaluate(plan(formula, st.net), st.net, ctx)
     return {"result": result.value}
 
 
@@ -654,7 +657,7 @@ def get_context_highlights(
         if val_str in st.net.concepts:
             highlighted_nodes.add(val_str)
 
-    for fact in st.net.facts():
+    for fact in st.net.view():
         args_ids = [a.id if isinstance(a, Concept) else str(a) for a in fact.args]
         if any(aid in highlighted_nodes for aid in args_ids):
             edge_id = f"{fact.predicate}__{'_'.join(args_ids)}"
@@ -722,7 +725,7 @@ def _eval_condition(rec: FormulaRecord, net, ctx, var_map) -> ConditionResultIte
     try:
         f = formula_from_json(formula_data, net, var_map)
         text_repr = formula_to_text(f)
-        result = evaluate(f, net, ctx)
+        result = evaluate(plan(f, net), net, ctx)
         result_str = result.value
     except Exception:
         text_repr = text_repr or "(invalid)"
@@ -865,6 +868,11 @@ class ForcingForceResp(BaseModel):
     status: str  # "true" | "false" | "unknown"
     explanation: Optional[str] = None
     extended_context: Optional[dict] = None
+    exhaustive: bool = True  # False — поиск прерван по бюджету времени
+
+
+# Бюджет поиска force() на запрос, секунды.
+FORCE_TIME_BUDGET = 2.0
 
 
 @router.post("/api/workspaces/{wid}/forcing/force")
@@ -909,9 +917,9 @@ def forcing_force(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid target formula")
 
-    # Run force()
+    # Run force(): без ограничения размера пространства, но не дольше бюджета
     engine = ForcingEngine(net)
-    force_result = engine.force(ctx, phi_f, conditions)
+    force_result = engine.force(ctx, phi_f, conditions, budget=Budget(time_limit=FORCE_TIME_BUDGET))
 
     # Serialize extended context
     extended_ctx = None
@@ -924,6 +932,7 @@ def forcing_force(
         status=force_result.status.value,
         explanation=force_result.explanation,
         extended_context=extended_ctx,
+        exhaustive=force_result.exhaustive,
     ).model_dump()
 
 
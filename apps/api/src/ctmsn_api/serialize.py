@@ -18,7 +18,7 @@ def serialize(net) -> dict[str, Any]:
     def add(pred: str, kind: str):
         if pred not in net.predicates:
             return
-        for st in net.facts(pred):
+        for st in net.view(pred):
             label, src, dst = st.args
             src_id = src.id if hasattr(src, 'id') else str(src)
             dst_id = dst.id if hasattr(dst, 'id') else str(dst)
@@ -33,7 +33,7 @@ def serialize(net) -> dict[str, Any]:
     def add_binary(pred: str, kind: str, label: str | None = None):
         if pred not in net.predicates:
             return
-        for st in net.facts(pred):
+        for st in net.view(pred):
             src, dst = st.args
             edge_label = label or pred
             src_id = src.id if hasattr(src, 'id') else str(src)
@@ -59,11 +59,11 @@ def serialize(net) -> dict[str, Any]:
 
     equations = []
     if "comp2" in net.predicates:
-        for st in net.facts("comp2"):
+        for st in net.view("comp2"):
             left, right, result = st.args
             equations.append({"kind":"comp2","left":str(left),"right":str(right),"result":str(result)})
     if "compN" in net.predicates:
-        for st in net.facts("compN"):
+        for st in net.view("compN"):
             chain, result = st.args
             equations.append({"kind":"compN","chain":str(chain),"result":str(result)})
 
@@ -72,11 +72,11 @@ def serialize(net) -> dict[str, Any]:
 
     traces = {"comp2": [], "compN": []}
     if "comp2_expl" in net.predicates:
-        for st in net.facts("comp2_expl"):
+        for st in net.view("comp2_expl"):
             left, right, result, mid = st.args
             traces["comp2"].append({"left":str(left),"right":str(right),"result":str(result),"mid":str(mid)})
     if "compN_expl" in net.predicates:
-        for st in net.facts("compN_expl"):
+        for st in net.view("compN_expl"):
             chain, result, trace = st.args
             traces["compN"].append({"chain":str(chain),"result":str(result),"trace":str(trace)})
 
@@ -43,13 +43,14 @@ def network_from_json(data: str) -> tuple[SemanticNetwork, list[str]]:
         roles = tuple(pdata.get("roles", []))
         net.add_predicate(Predicate(name=pdata["name"], arity=pdata["arity"], roles=roles))
 
-    for fdata in raw.get("facts", []):
-        pred_name = fdata["predicate"]
-        args = tuple(net.concepts[a] if a in net.concepts else a for a in fdata["args"])
-        try:
-            net.assert_fact(pred_name, args)
-        except ValueError as e:
-            contradictions.append(str(e))
+    concepts = net.concepts
+    net.assert_facts(
+        (
+            (fdata["predicate"], tuple(concepts[a] if a in concepts else a for a in fdata["args"]))
+            for fdata in raw.get("facts", [])
+        ),
+        errors=contradictions,
+    )
 
     return net, contradictions
 
@@ -233,6 +233,7 @@ export type ForcingForceResult = {
   status: "true" | "false" | "unknown";
   explanation: string | null;
   extended_context: Record<string, any> | null;
+  exhaustive?: boolean; // false — поиск прерван по бюджету времени
 };
 
 // ─── Transition (переходные/устойчивые режимы) ───────────────
@@ -1,6 +1,7 @@
-__all__ = ["Concept", "Predicate", "Statement", "SemanticNetwork"]
+__all__ = ["Concept", "Predicate", "Statement", "SemanticNetwork", "FactStore", "FactView", "IndexedFactStore", "CompactFactStore"]
 
 from ctmsn.core.concept import Concept
 from ctmsn.core.predicate import Predicate
 from ctmsn.core.statement import Statement
+from ctmsn.core.store import FactStore, FactView, IndexedFactStore, CompactFactStore
 from ctmsn.core.network import SemanticNetwork
@@ -0,0 +1,44 @@
+"""__slots__ для frozen-датаклассов на Python 3.9 (аналог dataclass(slots=True)).
+
+Декоратор пересоздаёт класс с __slots__ по именам полей: у экземпляров нет
+__dict__, атрибуты лежат в слотах. Сериализация pickle идёт через конструктор
+(__reduce__), поэтому кешированные хеши пересчитываются в новом процессе.
+"""
+
+from __future__ import annotations
+
+from dataclasses import FrozenInstanceError, fields
+from typing import Any, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+def _reduce(self: Any) -> Tuple[Any, ...]:
+    return (type(self), tuple(getattr(self, f.name) for f in fields(self) if f.init))
+
+
+def _frozen_setattr(self: Any, name: str, value: Any) -> None:
+    raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+
+def _frozen_delattr(self: Any, name: str) -> None:
+    raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+
+def add_slots(cls: Type[T]) -> Type[T]:
+    """Пересоздать frozen-датакласс cls с __slots__ по его полям."""
+    dc: Any = cls  # fields() и type(cls)(...) mypy для Type[T] не выводит
+    names = tuple(f.name for f in fields(dc))
+    body = dict(cls.__dict__)
+    for name in names:
+        body.pop(name, None)
+    body.pop("__dict__", None)
+    body.pop("__weakref__", None)
+    body["__slots__"] = names
+    body.setdefault("__reduce__", _reduce)
+    # Сгенерированные dataclass __setattr__/__delattr__ ссылаются на исходный
+    # класс через super(cls, self) и в пересозданном классе не работают.
+    body["__setattr__"] = _frozen_setattr
+    body["__delattr__"] = _frozen_delattr
+    new: Type[T] = type(dc)(cls.__name__, cls.__bases__, body)
+    return new
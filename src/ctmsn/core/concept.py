@@ -2,16 +2,38 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Mapping, FrozenSet
 
+from ctmsn.core._slots import add_slots
 
-@dataclass(frozen=True)
+
+@add_slots
+@dataclass(frozen=True, eq=False)
 class Concept:
+    """Концепт сети. Равенство и хеш — только по id.
+
+    label/tags/meta — описание, а не идентичность: два объекта с одним id
+    равны. Сеть интернирует концепты (SemanticNetwork.intern), так что в
+    фактах один id представлен одним объектом и сравнение обычно сводится к
+    проверке идентичности.
+    """
+
     id: str
     label: str | None = None
     tags: FrozenSet[str] = field(default_factory=frozenset)
     meta: Mapping[str, Any] = field(default_factory=dict)
+    _hash: int = field(init=False, repr=False, default=0)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_hash", hash(self.id))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Concept):
+            return self.id == other.id
+        return NotImplemented
 
     def __hash__(self) -> int:
-        return hash(self.id)
+        return self._hash
 
     def with_tag(self, *tags: str) -> "Concept":
         return Concept(
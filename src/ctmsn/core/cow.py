@@ -0,0 +1,155 @@
+"""Индекс "ключ -> множество" с копированием при записи (copy-on-write).
+
+Ключи распределены по фиксированному числу шардов (обычных dict). fork()
+возвращает новый индекс, разделяющий шарды и множества-корзины с исходным, за
+O(SHARDS) независимо от числа фактов. Обе стороны после fork() теряют владение
+общими данными: первая запись в шард копирует только этот шард, первая запись в
+корзину — только эту корзину. Чтение никогда не копирует.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+SHARDS = 64
+
+_EMPTY: FrozenSet[Any] = frozenset()
+
+
+class CowIndex:
+    __slots__ = ("_shards", "_owned_shards", "_owned_keys")
+
+    def __init__(self) -> None:
+        self._shards: List[Optional[Dict[Hashable, Set[Any]]]] = [None] * SHARDS
+        # Свежий индекс владеет всем; после fork() — ничем.
+        self._owned_shards: Optional[Set[int]] = None
+        self._owned_keys: Optional[Set[Hashable]] = None
+
+    # ── чтение ────────────────────────────────────────────────
+
+    def get(self, key: Hashable) -> Set[Any] | FrozenSet[Any]:
+        """Корзина ключа (или пустое множество). Мутировать результат нельзя."""
+        shard = self._shards[hash(key) % SHARDS]
+        if shard is None:
+            return _EMPTY
+        return shard.get(key, _EMPTY)
+
+    def __contains__(self, key: Hashable) -> bool:
+        shard = self._shards[hash(key) % SHARDS]
+        return shard is not None and key in shard
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self._shards if s is not None)
+
+    def keys(self) -> Iterator[Hashable]:
+        for s in self._shards:
+            if s is not None:
+                yield from s.keys()
+
+    def values(self) -> Iterator[Set[Any]]:
+        for s in self._shards:
+            if s is not None:
+                yield from s.values()
+
+    def items(self) -> Iterator[Tuple[Hashable, Set[Any]]]:
+        for s in self._shards:
+            if s is not None:
+                yield from s.items()
+
+    # ── запись ────────────────────────────────────────────────
+
+    def _writable_shard(self, i: int) -> Dict[Hashable, Set[Any]]:
+        shard = self._shards[i]
+        if shard is None:
+            shard = self._shards[i] = {}
+            if self._owned_shards is not None:
+                self._owned_shards.add(i)
+        elif self._owned_shards is not None and i not in self._owned_shards:
+            shard = self._shards[i] = dict(shard)
+            self._owned_shards.add(i)
+        return shard
+
+    def _writable_bucket(self, shard: Dict[Hashable, Set[Any]], key: Hashable) -> Set[Any]:
+        bucket = shard.get(key)
+        if bucket is None:
+            bucket = shard[key] = set()
+            if self._owned_keys is not None:
+                self._owned_keys.add(key)
+        elif self._owned_keys is not None and key not in self._owned_keys:
+            bucket = shard[key] = set(bucket)
+            self._owned_keys.add(key)
+        return bucket
+
+    def add(self, key: Hashable, item: Any) -> None:
+        shard = self._writable_shard(hash(key) % SHARDS)
+        self._writable_bucket(shard, key).add(item)
+
+    def update(self, key: Hashable, items: Iterable[Any]) -> None:
+        """Добавить пачку элементов в корзину ключа (одна проверка владения)."""
+        shard = self._writable_shard(hash(key) % SHARDS)
+        self._writable_bucket(shard, key).update(items)
+
+    def discard(self, key: Hashable, item: Any) -> None:
+        i = hash(key) % SHARDS
+        cur = self._shards[i]
+        if cur is None or item not in cur.get(key, _EMPTY):
+            return
+        shard = self._writable_shard(i)
+        bucket = self._writable_bucket(shard, key)
+        bucket.discard(item)
+        if not bucket:
+            del shard[key]
+
+    def pop(self, key: Hashable) -> Set[Any]:
+        """Удалить ключ и вернуть его корзину (собственную копию, если корзина общая)."""
+        i = hash(key) % SHARDS
+        cur = self._shards[i]
+        if cur is None or key not in cur:
+            return set()
+        shard = self._writable_shard(i)
+        bucket = shard.pop(key)
+        if self._owned_keys is not None and key not in self._owned_keys:
+            return set(bucket)
+        if self._owned_keys is not None:
+            self._owned_keys.discard(key)
+        return bucket
+
+    # ── структурное разделение ────────────────────────────────
+
+    def changed(self, other: "CowIndex") -> Iterator[Tuple[Hashable, Set[Any] | FrozenSet[Any], Set[Any] | FrozenSet[Any]]]:
+        """Ключи, корзины которых у self и other — разные объекты.
+
+        Общие (разделённые после fork) шарды и корзины пропускаются по
+        идентичности, поэтому для индексов с общей историей обход стоит
+        O(SHARDS + изменённые корзины). Выдаёт (ключ, корзина self, корзина other).
+        """
+        for mine, theirs in zip(self._shards, other._shards):
+            if mine is theirs:
+                continue
+            mine = mine or {}
+            theirs = theirs or {}
+            for key in mine.keys() | theirs.keys():
+                a = mine.get(key, _EMPTY)
+                b = theirs.get(key, _EMPTY)
+                if a is not b:
+                    yield key, a, b
+
+    def fork(self) -> "CowIndex":
+        """O(SHARDS)-копия, разделяющая данные с исходным индексом."""
+        new = CowIndex.__new__(CowIndex)
+        new._shards = list(self._shards)
+        new._owned_shards = set()
+        new._owned_keys = set()
+        self._owned_shards = set()
+        self._owned_keys = set()
+        return new
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CowIndex):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"CowIndex(keys={len(self)})"
@@ -0,0 +1,242 @@
+"""Разность сетей и трёхстороннее слияние.
+
+diff_networks(old, new) — дельта концептов, предикатов и фактов. Факты
+сравнивает движок (FactStore.delta): для копий одной сети (copy()/fork) общие
+copy-on-write корзины пропускаются по идентичности, и стоимость — O(изменений);
+для несвязанных сетей — разность по хеш-индексам, O(фактов) без копий множеств.
+
+apply_diff(net, d) накатывает дельту атомарно (в транзакции), d.inverse() —
+обратная дельта (undo). merge_networks(base, ours, theirs) — трёхстороннее
+слияние: изменения theirs накатываются на копию ours, конфликтующие
+пропускаются (побеждает ours) и перечисляются в MergeResult.conflicts.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple, TypeVar
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.statement import Statement
+
+__all__ = [
+    "NetworkDiff",
+    "MergeConflict",
+    "MergeResult",
+    "diff_networks",
+    "apply_diff",
+    "merge_networks",
+]
+
+T = TypeVar("T")
+# (старое значение, новое значение); None — записи нет.
+Change = Tuple[Optional[T], Optional[T]]
+
+
+def _same_concept(a: Optional[Concept], b: Optional[Concept]) -> bool:
+    # Concept.__eq__ сравнивает только id — для дельты важны и описания.
+    if a is b:
+        return True
+    if a is None or b is None:
+        return False
+    return a.id == b.id and a.label == b.label and a.tags == b.tags and a.meta == b.meta
+
+
+def _same_predicate(a: Optional[Predicate], b: Optional[Predicate]) -> bool:
+    return a is b or a == b
+
+
+@dataclass(frozen=True)
+class NetworkDiff:
+    """Дельта между двумя сетями.
+
+    concepts / predicates — изменённые записи: ключ -> (было, стало), где None
+    означает отсутствие (добавление или удаление).
+    added_facts / removed_facts — факты, появившиеся и исчезнувшие.
+    """
+
+    concepts: Mapping[str, Change[Concept]] = field(default_factory=dict)
+    predicates: Mapping[str, Change[Predicate]] = field(default_factory=dict)
+    added_facts: FrozenSet[Statement] = frozenset()
+    removed_facts: FrozenSet[Statement] = frozenset()
+
+    def is_empty(self) -> bool:
+        return not (self.concepts or self.predicates or self.added_facts or self.removed_facts)
+
+    def inverse(self) -> "NetworkDiff":
+        """Обратная дельта: apply_diff(new, d.inverse()) возвращает old."""
+        return NetworkDiff(
+            concepts={k: (new, old) for k, (old, new) in self.concepts.items()},
+            predicates={k: (new, old) for k, (old, new) in self.predicates.items()},
+            added_facts=self.removed_facts,
+            removed_facts=self.added_facts,
+        )
+
+    def __len__(self) -> int:
+        return len(self.concepts) + len(self.predicates) + len(self.added_facts) + len(self.removed_facts)
+
+
+def _dict_changes(old: Mapping[str, T], new: Mapping[str, T], same) -> Dict[str, Change[T]]:
+    out: Dict[str, Change[T]] = {}
+    for key, value in new.items():
+        prev = old.get(key)
+        if not same(prev, value):
+            out[key] = (prev, value)
+    for key, prev in old.items():
+        if key not in new:
+            out[key] = (prev, None)
+    return out
+
+
+def diff_networks(old: SemanticNetwork, new: SemanticNetwork) -> NetworkDiff:
+    """Дельта, переводящая old в new."""
+    added, removed = old.store.delta(new.store)
+    return NetworkDiff(
+        concepts=_dict_changes(old.concepts, new.concepts, _same_concept),
+        predicates=_dict_changes(old.predicates, new.predicates, _same_predicate),
+        added_facts=frozenset(added),
+        removed_facts=frozenset(removed),
+    )
+
+
+def apply_diff(net: SemanticNetwork, d: NetworkDiff, *, errors: List[str] | None = None) -> None:
+    """Накатить дельту на сеть (мутирует net).
+
+    Порядок: удаление фактов, добавление/замена предикатов и концептов,
+    добавление фактов, удаление предикатов и концептов. Уже применённые
+    изменения (факт уже есть/уже удалён) пропускаются. Ошибки добавления
+    фактов — как в SemanticNetwork.assert_facts: без errors изменение
+    откатывается целиком и выбрасывается ValueError/KeyError.
+    """
+    with net.begin():
+        for st in d.removed_facts:
+            if net.contains(st):
+                net.remove_fact(st)
+        for name, (_old_pred, pred) in d.predicates.items():
+            if pred is None:
+                continue
+            if name in net.predicates:
+                net.replace_predicate(name, pred)
+            else:
+                net.add_predicate(pred)
+        for cid, (_old_concept, concept) in d.concepts.items():
+            if concept is None:
+                continue
+            if cid in net.concepts:
+                if not _same_concept(net.concepts[cid], concept):
+                    net.replace_concept(cid, concept)
+            else:
+                net.add_concept(concept)
+        net.assert_facts(d.added_facts, errors=errors)
+        for name, (_old_pred, pred) in d.predicates.items():
+            if pred is None and name in net.predicates:
+                net.remove_predicate(name)
+        for cid, (_old_concept, concept) in d.concepts.items():
+            if concept is None and cid in net.concepts:
+                net.remove_concept(cid)
+
+
+@dataclass(frozen=True)
+class MergeConflict:
+    """Конфликт слияния: kind — "concept" | "predicate" | "fact"; key — id,
+    имя предиката или факт в виде строки."""
+
+    kind: str
+    key: str
+    message: str
+
+
+@dataclass(frozen=True)
+class MergeResult:
+    network: SemanticNetwork
+    conflicts: Tuple[MergeConflict, ...]
+
+    @property
+    def clean(self) -> bool:
+        return not self.conflicts
+
+
+def _fmt_fact(st: Statement) -> str:
+    return f"{st.predicate}({', '.join(getattr(a, 'id', str(a)) for a in st.args)})"
+
+
+def merge_networks(base: SemanticNetwork, ours: SemanticNetwork, theirs: SemanticNetwork) -> MergeResult:
+    """Трёхстороннее слияние ours и theirs относительно общего предка base.
+
+    Изменения, сделанные только одной стороной, переносятся; одинаковые
+    изменения обеих сторон сливаются. Конфликты (обе стороны по-разному
+    изменили одну запись; одна удалила концепт/предикат, который другая
+    использует в новых фактах; противоречие has_/lacks_ между новыми
+    фактами) разрешаются в пользу ours и перечисляются в результате.
+    """
+    d_ours = diff_networks(base, ours)
+    d_theirs = diff_networks(base, theirs)
+    conflicts: List[MergeConflict] = []
+
+    def pick(kind: str, ours_ch: Mapping[str, Change[T]], theirs_ch: Mapping[str, Change[T]], same) -> Dict[str, Change[T]]:
+        out: Dict[str, Change[T]] = {}
+        for key, change in theirs_ch.items():
+            mine = ours_ch.get(key)
+            if mine is None:
+                out[key] = change
+            elif not same(mine[1], change[1]):
+                conflicts.append(MergeConflict(kind, key, f"{kind} '{key}' changed differently on both sides"))
+        return out
+
+    concepts = pick("concept", d_ours.concepts, d_theirs.concepts, _same_concept)
+    predicates = pick("predicate", d_ours.predicates, d_theirs.predicates, _same_predicate)
+
+    # Удаление, которое уничтожило бы новые факты другой стороны.
+    used_concepts = {a.id for st in d_ours.added_facts for a in st.args if isinstance(a, Concept)}
+    used_predicates = {st.predicate for st in d_ours.added_facts}
+    for cid in [k for k, (_o, new) in concepts.items() if new is None and k in used_concepts]:
+        del concepts[cid]
+        conflicts.append(MergeConflict("concept", cid, f"concept '{cid}' removed by theirs but used in new facts"))
+    for name in [k for k, (_o, new) in predicates.items() if new is None and k in used_predicates]:
+        del predicates[name]
+        conflicts.append(MergeConflict("predicate", name, f"predicate '{name}' removed by theirs but used in new facts"))
+
+    # Смена арности при оставшихся в ours фактах старой арности.
+    for name in list(predicates):
+        new = predicates[name][1]
+        cur = ours.predicates.get(name)
+        if new is None or cur is None or cur.arity == new.arity:
+            continue
+        dropped = sum(1 for st in d_theirs.removed_facts if st.predicate == name)
+        if ours.count(name) > dropped:
+            del predicates[name]
+            conflicts.append(MergeConflict("predicate", name, f"arity of '{name}' changed by theirs but ours has facts"))
+
+    gone_concepts = {k for k, (_o, new) in d_ours.concepts.items() if new is None}
+    gone_predicates = {k for k, (_o, new) in d_ours.predicates.items() if new is None}
+    added: List[Statement] = []
+    for st in d_theirs.added_facts:
+        if st.predicate in gone_predicates or any(
+            isinstance(a, Concept) and a.id in gone_concepts for a in st.args
+        ):
+            conflicts.append(MergeConflict("fact", _fmt_fact(st), "fact references an entry removed by ours"))
+            continue
+        contra = ours.complement(st.predicate)
+        if contra is not None and ours.contains(Statement(contra, st.args)):
+            conflicts.append(MergeConflict("fact", _fmt_fact(st), f"contradicts {contra} in ours"))
+            continue
+        added.append(st)
+
+    result = ours.copy()
+    errors: List[str] = []
+    apply_diff(
+        result,
+        NetworkDiff(
+            concepts=concepts,
+            predicates=predicates,
+            added_facts=frozenset(added),
+            removed_facts=d_theirs.removed_facts,
+        ),
+        errors=errors,
+    )
+    # Страховка: прочие отказы assert_facts (например, противоречие с фактом,
+    # ставшим видимым после смены предикатов).
+    conflicts.extend(MergeConflict("fact", "", msg) for msg in errors)
+    return MergeResult(network=result, conflicts=tuple(conflicts))
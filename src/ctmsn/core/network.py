@@ -1,30 +1,216 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Set, Tuple
+from functools import lru_cache
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 from ctmsn.core.concept import Concept
 from ctmsn.core.predicate import Predicate
 from ctmsn.core.statement import Statement, CoreTerm
+from ctmsn.core.store import FactStore, FactView, IndexedFactStore, arg_key
+from ctmsn.core.transaction import ADD, CONCEPT, MISSING, PREDICATE, REMOVE, Transaction
+
+__all__ = ["SemanticNetwork", "arg_key", "complement_of"]
+
+FactSpec = Union[Statement, Tuple[str, Sequence[CoreTerm]]]
+# Подписчик изменений фактов: (ADD | REMOVE, факт).
+FactListener = Callable[[str, Statement], None]
+
+
+@lru_cache(maxsize=None)
+def complement_of(predicate: str) -> str | None:
+    """Дополнительный предикат по имени: has_X <-> lacks_X (иначе None).
+
+    Результат кешируется: строки собираются один раз на имя, а не на факт.
+    """
+    if predicate.startswith("has_"):
+        return "lacks_" + predicate[len("has_"):]
+    if predicate.startswith("lacks_"):
+        return "has_" + predicate[len("lacks_"):]
+    return None
+
+
+# Глобальный источник меток версий: метка уникальна среди всех сетей процесса,
+# поэтому равные версии у разных сетей означают общую историю (copy()).
+_STAMPS = count(1)
+
+_MASK64 = (1 << 64) - 1
+
+
+def _fact_hash(st: Statement) -> int:
+    """64-битный Zobrist-ключ факта (концепты по id, литералы по значению).
+
+    Встроенный hash() перемешивается финализатором splitmix64, чтобы XOR
+    ключей близких фактов не вырождался. Ключ устойчив только в пределах
+    процесса (hash строк рандомизирован).
+    """
+    x = hash((st.predicate, tuple(arg_key(a) for a in st.args))) & _MASK64
+    x ^= x >> 30
+    x = (x * 0xBF58476D1CE4E5B9) & _MASK64
+    x ^= x >> 27
+    x = (x * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _contradiction_message(contra_pred: str, args: Sequence[CoreTerm]) -> str:
+    args_str = ", ".join(getattr(a, "id", str(a)) for a in args)
+    return f"Противоречие: уже существует факт {contra_pred}({args_str})"
 
 
 @dataclass
 class SemanticNetwork:
+    """Семантическая сеть: концепты, предикаты и факты.
+
+    Факты хранит движок store (см. ctmsn.core.store): по умолчанию
+    IndexedFactStore с copy-on-write индексами; для сетей с миллионами фактов —
+    SemanticNetwork(store=CompactFactStore()).
+    """
+
     concepts: Dict[str, Concept] = field(default_factory=dict)
     predicates: Dict[str, Predicate] = field(default_factory=dict)
+    store: FactStore = field(default_factory=IndexedFactStore)
+    _journal: List[Transaction] = field(default_factory=list, repr=False, compare=False)
+    # predicate -> дополнительный предикат, если объявлены оба (has_X/lacks_X).
+    _complements: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # XOR ключей всех фактов; None — ещё не запрошен (см. fingerprint()).
+    _fingerprint: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    # Версии предикатов (см. version()); _epoch — версия нетронутых предикатов.
+    _versions: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _epoch: int = field(default_factory=lambda: next(_STAMPS), init=False, repr=False, compare=False)
+    _listeners: List[FactListener] = field(default_factory=list, init=False, repr=False, compare=False)
 
-    _facts: Set[Statement] = field(default_factory=set)
-    _facts_by_pred: Dict[str, Set[Statement]] = field(default_factory=dict)
-    _facts_by_concept: Dict[str, Set[Statement]] = field(default_factory=dict)
+    def __post_init__(self) -> None:
+        for name in self.predicates:
+            self._link_complement(name)
+
+    def begin(self) -> Transaction:
+        """Начать (вложенную) транзакцию; см. ctmsn.core.transaction."""
+        tx = Transaction(self)
+        self._journal.append(tx)
+        return tx
+
+    def _set_concept(self, concept_id: str, concept: Concept | None) -> None:
+        if self._journal:
+            self._journal[-1].record_entry(CONCEPT, concept_id, self.concepts.get(concept_id, MISSING))
+        if concept is None:
+            del self.concepts[concept_id]
+        else:
+            self.concepts[concept_id] = concept
+
+    def _set_predicate(self, name: str, pred: Predicate | None) -> None:
+        if self._journal:
+            self._journal[-1].record_entry(PREDICATE, name, self.predicates.get(name, MISSING))
+        if pred is None:
+            del self.predicates[name]
+            contra = self._complements.pop(name, None)
+            if contra is not None:
+                del self._complements[contra]
+        else:
+            self.predicates[name] = pred
+            self._link_complement(name)
+
+    def _link_complement(self, name: str) -> None:
+        contra = complement_of(name)
+        if contra is not None and contra in self.predicates:
+            self._complements[name] = contra
+            self._complements[contra] = name
+
+    def complement(self, predicate: str) -> str | None:
+        """Объявленный в сети дополнительный предикат (has_X <-> lacks_X) или None."""
+        return self._complements.get(predicate)
 
     def add_concept(self, concept: Concept) -> None:
         if concept.id in self.concepts:
             raise ValueError(f"Concept '{concept.id}' already exists")
-        self.concepts[concept.id] = concept
+        self._set_concept(concept.id, concept)
 
     def add_predicate(self, pred: Predicate) -> None:
         if pred.name in self.predicates:
             raise ValueError(f"Predicate '{pred.name}' already exists")
-        self.predicates[pred.name] = pred
+        self._set_predicate(pred.name, pred)
+
+    def fingerprint(self) -> int:
+        """64-битный отпечаток множества фактов (Zobrist-хеш).
+
+        XOR ключей всех фактов: первый вызов считает его за O(фактов), далее
+        каждое добавление/удаление факта (в том числе откат транзакции)
+        обновляет его за O(арности). Копия наследует отпечаток. Равные
+        множества фактов дают равные отпечатки; обратное верно лишь с высокой
+        вероятностью, поэтому при совпадении отпечатков точное равенство
+        проверяется сравнением фактов (view() == other.view()). Отпечаток не
+        учитывает концепты и предикаты без фактов.
+        """
+        if self._fingerprint is None:
+            h = 0
+            for st in self.store.facts():
+                h ^= _fact_hash(st)
+            self._fingerprint = h
+        return self._fingerprint
+
+    def intern(self, term: CoreTerm) -> CoreTerm:
+        """Канонический объект концепта с тем же id (если он есть в сети).
+
+        Литералы и незарегистрированные концепты возвращаются как есть.
+        """
+        if isinstance(term, Concept):
+            return self.concepts.get(term.id, term)
+        return term
+
+    def _intern_args(self, args: Tuple[CoreTerm, ...]) -> Tuple[CoreTerm, ...]:
+        concepts = self.concepts
+        for a in args:
+            if isinstance(a, Concept) and concepts.get(a.id, a) is not a:
+                return tuple(concepts.get(x.id, x) if isinstance(x, Concept) else x for x in args)
+        return args
+
+    def version(self, predicate: str) -> int:
+        """Версия расширения предиката: меняется при каждом добавлении/удалении
+        его фактов. Метки берутся из общего для процесса счётчика, так что
+        равные версии (в том числе у сети и её копии) гарантируют одинаковые
+        факты предиката. Ключ для кешей вычислений (ctmsn.logic.cache)."""
+        return self._versions.get(predicate, self._epoch)
+
+    def subscribe(self, listener: FactListener) -> Callable[[], None]:
+        """Подписаться на добавление/удаление фактов (включая откат транзакций).
+
+        listener(kind, statement) вызывается после каждого изменения, kind —
+        ADD или REMOVE из ctmsn.core.transaction. Копии сети подписчиков не
+        наследуют. Возвращает функцию отписки.
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def _notify(self, kind: str, st: Statement) -> None:
+        for listener in tuple(self._listeners):
+            listener(kind, st)
+
+    def _index(self, st: Statement) -> None:
+        self.store.add(st)
+        self._versions[st.predicate] = next(_STAMPS)
+        if self._fingerprint is not None:
+            self._fingerprint ^= _fact_hash(st)
+        if self._journal:
+            self._journal[-1].record_add(st)
+        if self._listeners:
+            self._notify(ADD, st)
+
+    def _unindex(self, st: Statement) -> None:
+        self.store.discard(st)
+        self._versions[st.predicate] = next(_STAMPS)
+        if self._fingerprint is not None:
+            self._fingerprint ^= _fact_hash(st)
+        if self._journal:
+            self._journal[-1].record_remove(st)
+        if self._listeners:
+            self._notify(REMOVE, st)
+
+    def _has(self, st: Statement) -> bool:
+        return self.store.contains(st)
 
     def assert_fact(self, predicate: str, args: Tuple[CoreTerm, ...]) -> Statement:
         if predicate not in self.predicates:
@@ -32,141 +218,247 @@ class SemanticNetwork:
         pred = self.predicates[predicate]
         if len(args) != pred.arity:
             raise ValueError(f"Arity mismatch: {predicate} expects {pred.arity}, got {len(args)}")
+        args = self._intern_args(args)
 
         # Check for contradicting has_*/lacks_* facts
-        contra_pred = None
-        if predicate.startswith("has_"):
-            contra_pred = "lacks_" + predicate[len("has_"):]
-        elif predicate.startswith("lacks_"):
-            contra_pred = "has_" + predicate[len("lacks_"):]
-
-        if contra_pred and contra_pred in self.predicates:
-            contra_st = Statement(predicate=contra_pred, args=args)
-            if contra_st in self._facts:
-                args_str = ", ".join(getattr(a, "id", str(a)) for a in args)
-                raise ValueError(
-                    f"Противоречие: уже существует факт {contra_pred}({args_str})"
-                )
+        contra_pred = self._complements.get(predicate)
+        if contra_pred is not None and self.store.count(contra_pred):
+            if self._has(Statement(predicate=contra_pred, args=args)):
+                raise ValueError(_contradiction_message(contra_pred, args))
 
         st = Statement(predicate=predicate, args=args)
-        if st in self._facts:
+        if self._has(st):
             return st
 
-        self._facts.add(st)
-        self._facts_by_pred.setdefault(predicate, set()).add(st)
+        self._index(st)
+        return st
 
-        for a in args:
-            if isinstance(a, Concept):
-                self._facts_by_concept.setdefault(a.id, set()).add(st)
+    def assert_facts(
+        self,
+        facts: Iterable[FactSpec],
+        *,
+        check_contradictions: bool = True,
+        errors: List[str] | None = None,
+    ) -> List[Statement]:
+        """Массово добавить факты: Statement или пары (predicate, args).
 
-        return st
+        Арность проверяется по пачке, противоречия has_*/lacks_* ищутся одним
+        проходом по множеству уже принятых ключей (плюс существующие факты
+        дополнительного предиката, если они есть), индексы движка строятся
+        один раз в конце (FactStore.add_many). Порядок значим так же, как при
+        последовательных assert_fact: из пары противоречащих фактов
+        принимается первый.
+
+        Концепты-аргументы интернируются (см. intern()).
+        Неизвестный предикат — KeyError. Ошибки арности и противоречия: если
+        errors не передан — ValueError, и сеть не меняется; если передан —
+        факт пропускается, а сообщение добавляется в errors.
+        Возвращает список действительно добавленных фактов.
+        """
+        batch: List[Statement] = []
+        seen: Set[Tuple[str, Tuple[CoreTerm, ...]]] = set()
+        store = self.store
+        # predicate -> (арность, дополнительный предикат, есть ли уже факты
+        # у предиката, есть ли факты у дополнительного) — считается один раз.
+        meta: Dict[str, Tuple[int, Optional[str], bool, bool]] = {}
+
+        def reject(msg: str) -> None:
+            if errors is None:
+                raise ValueError(msg)
+            errors.append(msg)
+
+        for item in facts:
+            given: Statement | None = None
+            if isinstance(item, Statement):
+                given = item
+                predicate, args = item.predicate, item.args
+            else:
+                predicate, args = item[0], tuple(item[1])
+            m = meta.get(predicate)
+            if m is None:
+                pred = self.predicates.get(predicate)
+                if pred is None:
+                    raise KeyError(f"Unknown predicate '{predicate}'")
+                contra = self._complements.get(predicate) if check_contradictions else None
+                m = meta[predicate] = (
+                    pred.arity,
+                    contra,
+                    store.count(predicate) > 0,
+                    contra is not None and store.count(contra) > 0,
+                )
+            arity, contra, existing, contra_existing = m
+            if len(args) != arity:
+                reject(f"Arity mismatch: {predicate} expects {arity}, got {len(args)}")
+                continue
+            interned = self._intern_args(args)
+            if interned is not args:
+                args, given = interned, None
+            key = (predicate, args)
+            if key in seen:
+                continue
+            if contra is not None and (
+                (contra, args) in seen or (contra_existing and self._has(Statement(contra, args)))
+            ):
+                reject(_contradiction_message(contra, args))
+                continue
+            seen.add(key)
+            st = given if given is not None else Statement(predicate, args)
+            # Пустой до загрузки предикат не требует проверки наличия факта.
+            if not (existing and self._has(st)):
+                batch.append(st)
+
+        self.store.add_many(batch)
+        for predicate in {st.predicate for st in batch}:
+            self._versions[predicate] = next(_STAMPS)
+        if self._fingerprint is not None:
+            h = self._fingerprint
+            for st in batch:
+                h ^= _fact_hash(st)
+            self._fingerprint = h
+        if self._journal:
+            tx = self._journal[-1]
+            for st in batch:
+                tx.record_add(st)
+        if self._listeners:
+            for st in batch:
+                self._notify(ADD, st)
+        return batch
+
+    def find_contradictions(self) -> List[Tuple[Statement, Statement]]:
+        """Все пары противоречащих фактов (has_X(args), lacks_X(args)) за один проход.
+
+        Для каждой объявленной пары дополнительных предикатов перебирается
+        меньшее расширение, а наличие парного факта проверяется по индексу.
+        Противоречия возникают, например, после assert_facts(...,
+        check_contradictions=False).
+        """
+        out: List[Tuple[Statement, Statement]] = []
+        for name, contra in self._complements.items():
+            if not name.startswith("has_"):
+                continue
+            n_has, n_lacks = self.store.count(name), self.store.count(contra)
+            if not n_has or not n_lacks:
+                continue
+            small, other = (name, contra) if n_has <= n_lacks else (contra, name)
+            for st in self.store.facts(small):
+                pair = Statement(other, st.args)
+                if self._has(pair):
+                    out.append((st, pair) if small == name else (pair, st))
+        return out
 
     def facts(self, predicate: str | None = None) -> Iterable[Statement]:
-        if predicate is None:
-            return set(self._facts)
-        return set(self._facts_by_pred.get(predicate, set()))
+        """Копия множества фактов (все или одного предиката).
+
+        Безопасна для мутации сети во время обхода; для чтения без выделения
+        памяти — view(), count() и contains().
+        """
+        return set(self.store.facts(predicate))
+
+    def view(self, predicate: str | None = None) -> FactView:
+        """Живое представление фактов только для чтения (collections.abc.Set)."""
+        return FactView(self.store, predicate)
+
+    def count(self, predicate: str | None = None) -> int:
+        """Число фактов (всех или одного предиката) без копирования."""
+        return self.store.count(predicate)
+
+    def contains(self, statement: Statement) -> bool:
+        """Есть ли факт в сети."""
+        return self.store.contains(statement)
+
+    def match(self, predicate: str, pattern: Sequence[Optional[Any]]) -> Iterator[Statement]:
+        """Итератор фактов предиката, совпадающих с шаблоном аргументов.
+
+        None в шаблоне — подстановочный знак; прочие позиции сравниваются как в
+        evaluator (концепты по id, литералы по значению). Связанные позиции
+        разрешаются через индекс (predicate, позиция, значение): перебирается
+        наименьшее из пересекаемых множеств, а не всё расширение предиката.
+        """
+        pred = self.predicates.get(predicate)
+        if pred is not None and len(pattern) != pred.arity:
+            return iter(())
+        return self.store.match(predicate, pattern)
+
+    def scan_size(self, predicate: str, pattern: Sequence[Optional[Any]]) -> int:
+        """Сколько фактов просмотрит match(predicate, pattern) — размер
+        наименьшей индексной корзины или всего расширения предиката."""
+        pred = self.predicates.get(predicate)
+        if pred is not None and len(pattern) != pred.arity:
+            return 0
+        return self.store.scan_size(predicate, pattern)
 
     def remove_concept(self, concept_id: str) -> Set[Statement]:
         if concept_id not in self.concepts:
             raise KeyError(f"Unknown concept '{concept_id}'")
-        del self.concepts[concept_id]
+        self._set_concept(concept_id, None)
         removed: Set[Statement] = set()
-        refs = self._facts_by_concept.pop(concept_id, set())
-        for st in refs:
+        for st in tuple(self.store.by_concept(concept_id)):
             removed.add(st)
-            self._facts.discard(st)
-            bp = self._facts_by_pred.get(st.predicate)
-            if bp:
-                bp.discard(st)
-            for a in st.args:
-                if isinstance(a, Concept) and a.id != concept_id:
-                    bc = self._facts_by_concept.get(a.id)
-                    if bc:
-                        bc.discard(st)
+            self._unindex(st)
         return removed
 
     def remove_predicate(self, predicate_name: str) -> Set[Statement]:
         if predicate_name not in self.predicates:
             raise KeyError(f"Unknown predicate '{predicate_name}'")
-        del self.predicates[predicate_name]
-        removed = self._facts_by_pred.pop(predicate_name, set())
+        self._set_predicate(predicate_name, None)
+        removed = set(self.store.facts(predicate_name))
         for st in removed:
-            self._facts.discard(st)
-            for a in st.args:
-                if isinstance(a, Concept):
-                    bc = self._facts_by_concept.get(a.id)
-                    if bc:
-                        bc.discard(st)
+            self._unindex(st)
         return removed
 
     def remove_fact(self, statement: Statement) -> None:
-        if statement not in self._facts:
+        if not self._has(statement):
             raise KeyError(f"Fact not found: {statement}")
-        self._facts.discard(statement)
-        bp = self._facts_by_pred.get(statement.predicate)
-        if bp:
-            bp.discard(statement)
-        for a in statement.args:
-            if isinstance(a, Concept):
-                bc = self._facts_by_concept.get(a.id)
-                if bc:
-                    bc.discard(statement)
+        self._unindex(statement)
 
     def replace_concept(self, old_id: str, new_concept: Concept) -> None:
         if old_id not in self.concepts:
             raise KeyError(f"Unknown concept '{old_id}'")
         if new_concept.id != old_id:
             raise ValueError("replace_concept requires same id; use remove+add for id change")
-        self.concepts[old_id] = new_concept
-        old_facts = list(self._facts_by_concept.get(old_id, set()))
+        self._set_concept(old_id, new_concept)
+        old_facts = list(self.store.by_concept(old_id))
         for st in old_facts:
-            self._facts.discard(st)
-            bp = self._facts_by_pred.get(st.predicate)
-            if bp:
-                bp.discard(st)
-            for a in st.args:
-                if isinstance(a, Concept):
-                    bc = self._facts_by_concept.get(a.id)
-                    if bc:
-                        bc.discard(st)
+            self._unindex(st)
             new_args = tuple(new_concept if (isinstance(a, Concept) and a.id == old_id) else a for a in st.args)
             new_st = Statement(predicate=st.predicate, args=new_args)
-            self._facts.add(new_st)
-            self._facts_by_pred.setdefault(st.predicate, set()).add(new_st)
-            for a in new_args:
-                if isinstance(a, Concept):
-                    self._facts_by_concept.setdefault(a.id, set()).add(new_st)
+            if not self._has(new_st):
+                self._index(new_st)
 
     def replace_predicate(self, old_name: str, new_predicate: Predicate) -> None:
         if old_name not in self.predicates:
             raise KeyError(f"Unknown predicate '{old_name}'")
         if new_predicate.name != old_name:
             raise ValueError("replace_predicate requires same name")
-        existing_facts = self._facts_by_pred.get(old_name, set())
-        if existing_facts and new_predicate.arity != self.predicates[old_name].arity:
+        existing = self.store.count(old_name)
+        if existing and new_predicate.arity != self.predicates[old_name].arity:
             raise ValueError(
                 f"Cannot change arity of '{old_name}' from {self.predicates[old_name].arity} "
-                f"to {new_predicate.arity}: {len(existing_facts)} facts exist"
+                f"to {new_predicate.arity}: {existing} facts exist"
             )
-        self.predicates[old_name] = new_predicate
+        self._set_predicate(old_name, new_predicate)
 
     def copy(self) -> "SemanticNetwork":
         """Return an independent copy of the network.
 
-        Concepts, predicates and statements are immutable (frozen), so a shallow
-        copy of the index containers is sufficient: mutating the copy
-        (assert_fact/remove_fact) does not affect the original.
+        The fact store is forked (FactStore.fork). For the default
+        IndexedFactStore the fork is copy-on-write (see CowIndex): the copy
+        shares shards and buckets with the original, and each side duplicates
+        only the shards/buckets it later writes to. Cost is O(concepts +
+        predicates) for the public dicts plus a constant per index, not
+        O(facts). Open transactions are not carried over to the copy.
         """
-        new = SemanticNetwork()
+        new = SemanticNetwork(store=self.store.fork())
         new.concepts = dict(self.concepts)
         new.predicates = dict(self.predicates)
-        new._facts = set(self._facts)
-        new._facts_by_pred = {k: set(v) for k, v in self._facts_by_pred.items()}
-        new._facts_by_concept = {k: set(v) for k, v in self._facts_by_concept.items()}
+        new._complements = dict(self._complements)
+        new._fingerprint = self._fingerprint
+        new._versions = dict(self._versions)
+        new._epoch = self._epoch
         return new
 
     def validate(self) -> None:
-        for st in self._facts:
+        for st in self.view():
             if st.predicate not in self.predicates:
                 raise ValueError(f"Fact references unknown predicate '{st.predicate}'")
             if len(st.args) != self.predicates[st.predicate].arity:
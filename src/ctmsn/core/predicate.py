@@ -1,15 +1,23 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from ctmsn.core._slots import add_slots
 
+
+@add_slots
 @dataclass(frozen=True)
 class Predicate:
     name: str
     arity: int
     roles: tuple[str, ...] = ()
+    _hash: int = field(init=False, repr=False, compare=False, default=0)
 
     def __post_init__(self) -> None:
         if self.arity <= 0:
             raise ValueError("Predicate arity must be positive")
         if self.roles and len(self.roles) != self.arity:
             raise ValueError("If roles provided, len(roles) must equal arity")
+        object.__setattr__(self, "_hash", hash((self.name, self.arity, self.roles)))
+
+    def __hash__(self) -> int:
+        return self._hash
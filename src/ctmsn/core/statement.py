@@ -1,20 +1,41 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Tuple, Union
 
+from ctmsn.core._slots import add_slots
 from ctmsn.core.concept import Concept
 
 Literal = Union[str, int, float, bool]
 CoreTerm = Union[Concept, Literal]
 
 
-@dataclass(frozen=True)
+@add_slots
+@dataclass(frozen=True, eq=False)
 class Statement:
     predicate: str
     args: Tuple[CoreTerm, ...]
+    # Хеш считается один раз: факт попадает в несколько индексов-множеств.
+    _hash: int = field(init=False, repr=False, default=0)
 
     def __post_init__(self) -> None:
         if not self.predicate:
             raise ValueError("Statement predicate must be non-empty")
         if not self.args:
             raise ValueError("Statement must have at least 1 arg")
+        object.__setattr__(self, "_hash", hash((self.predicate, self.args)))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Statement):
+            return NotImplemented
+        # Сравнение кортежей сначала проверяет идентичность элементов, поэтому
+        # для интернированных концептов это сравнение указателей.
+        return (
+            self._hash == other._hash
+            and self.predicate == other.predicate
+            and self.args == other.args
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
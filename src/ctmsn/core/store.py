@@ -0,0 +1,535 @@
+"""Движки хранения фактов SemanticNetwork.
+
+FactStore — интерфейс: сеть проверяет предикаты, арность и противоречия, а
+движок лишь хранит утверждения и отвечает на запросы по индексам.
+
+IndexedFactStore — движок по умолчанию: множества Statement в трёх индексах
+CowIndex (по предикату, по концепту, по позиции аргумента); fork() — O(1).
+
+CompactFactStore — компактный движок для больших сетей: концепты, литералы и
+имена предикатов интернируются в целые числа, факты лежат в столбцах
+array('i'), индексы — хеш-таблицы "ключ -> array строк". Объекты Statement
+создаются только на границе API (при выдаче фактов наружу).
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Set as AbstractSet
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.cow import CowIndex
+from ctmsn.core.statement import Statement
+
+
+def arg_key(value: Any) -> Hashable:
+    """Ключ значения аргумента для позиционного индекса.
+
+    Концепты сравниваются по id (как в evaluator), литералы — по значению;
+    тег в ключе не даёт концепту "a" совпасть с литералом "a".
+    """
+    if isinstance(value, Concept):
+        return (True, value.id)
+    return (False, value)
+
+
+class FactView(AbstractSet):
+    """Множество фактов только для чтения поверх живого индекса движка.
+
+    Не копирует факты: len() — FactStore.count (O(1)), "in" — FactStore.contains,
+    итерация идёт по индексу. Видит последующие изменения сети; мутировать сеть
+    во время обхода представления нельзя (снимок — set(view)). Операции над
+    множествами (|, &, -, ^) возвращают frozenset.
+    """
+
+    __slots__ = ("_store", "_predicate")
+
+    def __init__(self, store: "FactStore", predicate: str | None = None) -> None:
+        self._store = store
+        self._predicate = predicate
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[Any]) -> frozenset:
+        return frozenset(it)
+
+    def __contains__(self, st: object) -> bool:
+        if not isinstance(st, Statement):
+            return False
+        if self._predicate is not None and st.predicate != self._predicate:
+            return False
+        return self._store.contains(st)
+
+    def __iter__(self) -> Iterator[Statement]:
+        return iter(self._store.facts(self._predicate))
+
+    def __len__(self) -> int:
+        return self._store.count(self._predicate)
+
+    def __repr__(self) -> str:
+        return f"FactView(predicate={self._predicate!r}, size={len(self)})"
+
+
+class FactStore:
+    def add(self, st: Statement) -> None:
+        """Добавить факт; уже имеющийся факт не добавляется повторно."""
+        raise NotImplementedError
+
+    def add_many(self, statements: Sequence[Statement]) -> None:
+        """Добавить пачку фактов; имеющиеся в движке и повторы пропускаются.
+
+        Движки переопределяют метод, чтобы строить индексы один раз на пачку.
+        """
+        for st in statements:
+            self.add(st)
+
+    def discard(self, st: Statement) -> None:
+        raise NotImplementedError
+
+    def contains(self, st: Statement) -> bool:
+        raise NotImplementedError
+
+    def facts(self, predicate: str | None = None) -> Iterable[Statement]:
+        """Живая (не копия) коллекция фактов; не мутировать сеть во время обхода."""
+        raise NotImplementedError
+
+    def by_concept(self, concept_id: str) -> Iterable[Statement]:
+        raise NotImplementedError
+
+    def match(self, predicate: str, pattern: Sequence[Optional[Any]]) -> Iterator[Statement]:
+        """Факты предиката по шаблону (None — любое значение); устойчив к мутациям."""
+        raise NotImplementedError
+
+    def count(self, predicate: str | None = None) -> int:
+        raise NotImplementedError
+
+    def scan_size(self, predicate: str, pattern: Sequence[Optional[Any]]) -> int:
+        """Сколько фактов просмотрит match() с этим шаблоном (для профилирования)."""
+        return self.count(predicate)
+
+    def fork(self) -> "FactStore":
+        """Независимая копия движка."""
+        raise NotImplementedError
+
+    def delta(self, other: "FactStore") -> Tuple[Set[Statement], Set[Statement]]:
+        """(добавленные, удалённые) факты при переходе от self к other.
+
+        Общий случай — разность по хеш-индексам: каждый факт одной стороны
+        проверяется contains() другой, без построения копий множеств.
+        """
+        added = {st for st in other.facts() if not self.contains(st)}
+        removed = {st for st in self.facts() if not other.contains(st)}
+        return added, removed
+
+    def __iter__(self) -> Iterator[Statement]:
+        return iter(self.facts())
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FactStore):
+            return NotImplemented
+        if self.count() != other.count():
+            return False
+        return all(other.contains(st) for st in self.facts())
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class IndexedFactStore(FactStore):
+    def __init__(self) -> None:
+        self._by_pred = CowIndex()
+        self._by_concept = CowIndex()
+        self._by_arg = CowIndex()
+        self._size = 0
+
+    def add(self, st: Statement) -> None:
+        if self.contains(st):
+            return
+        self._by_pred.add(st.predicate, st)
+        for i, a in enumerate(st.args):
+            if isinstance(a, Concept):
+                self._by_concept.add(a.id, st)
+            self._by_arg.add((st.predicate, i, arg_key(a)), st)
+        self._size += 1
+
+    def add_many(self, statements: Sequence[Statement]) -> None:
+        by_pred: Dict[str, List[Statement]] = {}
+        by_concept: Dict[str, List[Statement]] = {}
+        by_arg: Dict[Hashable, List[Statement]] = {}
+        statements = [st for st in dict.fromkeys(statements) if not self.contains(st)]
+        for st in statements:
+            pred = st.predicate
+            by_pred.setdefault(pred, []).append(st)
+            i = 0
+            for a in st.args:
+                if isinstance(a, Concept):
+                    by_concept.setdefault(a.id, []).append(st)
+                    by_arg.setdefault((pred, i, (True, a.id)), []).append(st)
+                else:
+                    by_arg.setdefault((pred, i, (False, a)), []).append(st)
+                i += 1
+        for index, groups in ((self._by_pred, by_pred), (self._by_concept, by_concept), (self._by_arg, by_arg)):
+            for key, items in groups.items():
+                index.update(key, items)
+        self._size += len(statements)
+
+    def discard(self, st: Statement) -> None:
+        if not self.contains(st):
+            return
+        self._by_pred.discard(st.predicate, st)
+        for i, a in enumerate(st.args):
+            if isinstance(a, Concept):
+                self._by_concept.discard(a.id, st)
+            self._by_arg.discard((st.predicate, i, arg_key(a)), st)
+        self._size -= 1
+
+    def contains(self, st: Statement) -> bool:
+        return st in self._by_pred.get(st.predicate)
+
+    def facts(self, predicate: str | None = None) -> Iterable[Statement]:
+        if predicate is None:
+            return (st for bucket in self._by_pred.values() for st in bucket)
+        return self._by_pred.get(predicate)
+
+    def by_concept(self, concept_id: str) -> Iterable[Statement]:
+        return self._by_concept.get(concept_id)
+
+    def match(self, predicate: str, pattern: Sequence[Optional[Any]]) -> Iterator[Statement]:
+        buckets = []
+        for i, v in enumerate(pattern):
+            if v is None:
+                continue
+            b = self._by_arg.get((predicate, i, arg_key(v)))
+            if not b:
+                return iter(())
+            buckets.append(b)
+        if not buckets:
+            return iter(tuple(self._by_pred.get(predicate)))
+        buckets.sort(key=len)
+        smallest, rest = buckets[0], buckets[1:]
+        # Снимок наименьшего множества: итератор переживает мутации сети.
+        return (st for st in tuple(smallest) if all(st in b for b in rest))
+
+    def count(self, predicate: str | None = None) -> int:
+        if predicate is None:
+            return self._size
+        return len(self._by_pred.get(predicate))
+
+    def scan_size(self, predicate: str, pattern: Sequence[Optional[Any]]) -> int:
+        sizes = []
+        for i, v in enumerate(pattern):
+            if v is not None:
+                sizes.append(len(self._by_arg.get((predicate, i, arg_key(v)))))
+        return min(sizes) if sizes else len(self._by_pred.get(predicate))
+
+    def fork(self) -> "IndexedFactStore":
+        new = IndexedFactStore.__new__(IndexedFactStore)
+        new._by_pred = self._by_pred.fork()
+        new._by_concept = self._by_concept.fork()
+        new._by_arg = self._by_arg.fork()
+        new._size = self._size
+        return new
+
+    def delta(self, other: FactStore) -> Tuple[Set[Statement], Set[Statement]]:
+        """Для движков с общей историей (fork) сравниваются только корзины
+        предикатов, не разделяемые между ними (CowIndex.changed)."""
+        if not isinstance(other, IndexedFactStore):
+            return super().delta(other)
+        added: Set[Statement] = set()
+        removed: Set[Statement] = set()
+        for _pred, mine, theirs in self._by_pred.changed(other._by_pred):
+            added.update(theirs - mine)
+            removed.update(mine - theirs)
+        return added, removed
+
+    def __repr__(self) -> str:
+        return f"IndexedFactStore(facts={self._size})"
+
+
+_NO_ARG = -1
+_DEAD = -1
+
+
+class CompactFactStore(FactStore):
+    """Столбцовое хранилище фактов с интернированием в int.
+
+    Строка i — один факт: _pred[i] — id предиката, _cols[k][i] — id k-го
+    аргумента (или -1 за пределами арности). Удаление помечает строку
+    (_pred[i] = -1); индексы чистятся лениво и перестраиваются, когда мёртвых
+    строк становится больше живых. Концепт интернируется по id: в таблице
+    значений хранится последний переданный объект Concept.
+    """
+
+    def __init__(self) -> None:
+        self._term_ids: Dict[Hashable, int] = {}
+        self._terms: List[Any] = []
+        self._pred_ids: Dict[str, int] = {}
+        self._pred_names: List[str] = []
+        self._arity: List[int] = []
+
+        self._pred = array("i")
+        self._cols: List[array] = []
+        self._dead = 0
+
+        self._live_rows = 0
+        # (pred, позиция, терм) / pred / терм -> строки (возможно, с мёртвыми).
+        # Отдельной таблицы "факт -> строка" нет: точный поиск идёт по
+        # наименьшей позиционной корзине, что экономит ~100 байт на факт.
+        self._by_arg: Dict[int, array] = {}
+        self._by_pred: Dict[int, array] = {}
+        self._by_term: Dict[int, array] = {}
+        self._counts: Dict[int, int] = {}
+
+    # ── интернирование ────────────────────────────────────────
+
+    def _term_id(self, value: Any, create: bool) -> int:
+        key = arg_key(value)
+        tid = self._term_ids.get(key)
+        if tid is None:
+            if not create:
+                return _NO_ARG
+            tid = len(self._terms)
+            self._term_ids[key] = tid
+            self._terms.append(value)
+        elif create and isinstance(value, Concept):
+            self._terms[tid] = value
+        return tid
+
+    def _pred_id(self, name: str, arity: int, create: bool) -> int:
+        pid = self._pred_ids.get(name)
+        if pid is None:
+            if not create:
+                return _NO_ARG
+            pid = len(self._pred_names)
+            self._pred_ids[name] = pid
+            self._pred_names.append(name)
+            self._arity.append(arity)
+        elif create and self._arity[pid] != arity and not self._counts.get(pid):
+            # Предикат переобъявлен с другой арностью после удаления всех фактов.
+            self._arity[pid] = arity
+        return pid
+
+    def _encode(self, st: Statement, create: bool) -> Optional[tuple]:
+        pid = self._pred_id(st.predicate, len(st.args), create)
+        if pid == _NO_ARG or self._arity[pid] != len(st.args):
+            return None
+        tids = []
+        for a in st.args:
+            t = self._term_id(a, create)
+            if t == _NO_ARG:
+                return None
+            tids.append(t)
+        return pid, tids
+
+    def _materialize(self, row: int) -> Statement:
+        pid = self._pred[row]
+        terms = self._terms
+        args = tuple(terms[self._cols[k][row]] for k in range(self._arity[pid]))
+        return Statement(predicate=self._pred_names[pid], args=args)
+
+    @staticmethod
+    def _index_key(pid: int, pos: int, tid: int) -> int:
+        return pid | (pos << 32) | (tid << 40)
+
+    def _find_row(self, pid: int, tids: Sequence[int]) -> int:
+        best = None
+        for k, t in enumerate(tids):
+            rows = self._by_arg.get(self._index_key(pid, k, t))
+            if rows is None:
+                return _NO_ARG
+            if best is None or len(rows) < len(best):
+                best = rows
+        pred, cols = self._pred, self._cols
+        for r in best or ():
+            if pred[r] == pid and all(cols[k][r] == t for k, t in enumerate(tids)):
+                return r
+        return _NO_ARG
+
+    # ── запись ────────────────────────────────────────────────
+
+    def add(self, st: Statement) -> None:
+        enc = self._encode(st, create=True)
+        if enc is None:
+            raise ValueError(f"Arity mismatch for stored predicate '{st.predicate}'")
+        pid, tids = enc
+        if self._find_row(pid, tids) != _NO_ARG:
+            return
+        row = len(self._pred)
+        self._pred.append(pid)
+        while len(self._cols) < len(tids):
+            self._cols.append(array("i", [_NO_ARG]) * row)
+        for k, col in enumerate(self._cols):
+            col.append(tids[k] if k < len(tids) else _NO_ARG)
+        self._live_rows += 1
+        self._by_pred.setdefault(pid, array("i")).append(row)
+        for k, t in enumerate(tids):
+            self._by_arg.setdefault(self._index_key(pid, k, t), array("i")).append(row)
+            self._by_term.setdefault(t, array("i")).append(row)
+        self._counts[pid] = self._counts.get(pid, 0) + 1
+
+    def add_many(self, statements: Sequence[Statement]) -> None:
+        start = len(self._pred)
+        # Повторы внутри пачки — до поиска строк: новые строки индексируются в конце.
+        for st in dict.fromkeys(statements):
+            enc = self._encode(st, create=True)
+            if enc is None:
+                raise ValueError(f"Arity mismatch for stored predicate '{st.predicate}'")
+            pid, tids = enc
+            if self._find_row(pid, tids) != _NO_ARG:
+                continue
+            row = len(self._pred)
+            self._pred.append(pid)
+            while len(self._cols) < len(tids):
+                self._cols.append(array("i", [_NO_ARG]) * row)
+            for k, col in enumerate(self._cols):
+                col.append(tids[k] if k < len(tids) else _NO_ARG)
+            self._counts[pid] = self._counts.get(pid, 0) + 1
+        self._live_rows += len(self._pred) - start
+        self._index_rows(range(start, len(self._pred)))
+
+    def discard(self, st: Statement) -> None:
+        enc = self._encode(st, create=False)
+        if enc is None:
+            return
+        pid, tids = enc
+        row = self._find_row(pid, tids)
+        if row == _NO_ARG:
+            return
+        self._pred[row] = _DEAD
+        self._dead += 1
+        self._live_rows -= 1
+        self._counts[pid] -= 1
+        if self._dead > 1024 and self._dead > self._live_rows:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Убрать мёртвые строки и перестроить индексы."""
+        live = [r for r, pid in enumerate(self._pred) if pid != _DEAD]
+        old_pred, old_cols = self._pred, self._cols
+        self._pred = array("i", (old_pred[r] for r in live))
+        self._cols = [array("i", (col[r] for r in live)) for col in old_cols]
+        self._dead = 0
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self) -> None:
+        self._by_pred = {}
+        self._by_arg = {}
+        self._by_term = {}
+        self._index_rows(range(len(self._pred)))
+
+    def _index_rows(self, rows: range) -> None:
+        """Проиндексировать диапазон строк: сначала списки, затем array разом."""
+        by_pred: Dict[int, List[int]] = {}
+        by_arg: Dict[int, List[int]] = {}
+        by_term: Dict[int, List[int]] = {}
+        pred, cols, arity = self._pred, self._cols, self._arity
+        for row in rows:
+            pid = pred[row]
+            if pid == _DEAD:
+                continue
+            by_pred.setdefault(pid, []).append(row)
+            for k in range(arity[pid]):
+                t = cols[k][row]
+                by_arg.setdefault(self._index_key(pid, k, t), []).append(row)
+                by_term.setdefault(t, []).append(row)
+        for index, groups in ((self._by_pred, by_pred), (self._by_arg, by_arg), (self._by_term, by_term)):
+            for key, items in groups.items():
+                index.setdefault(key, array("i")).extend(items)
+
+    # ── чтение ────────────────────────────────────────────────
+
+    def contains(self, st: Statement) -> bool:
+        enc = self._encode(st, create=False)
+        if enc is None:
+            return False
+        return self._find_row(*enc) != _NO_ARG
+
+    def _live(self, rows: Iterable[int]) -> Iterator[Statement]:
+        pred = self._pred
+        for r in rows:
+            if pred[r] != _DEAD:
+                yield self._materialize(r)
+
+    def facts(self, predicate: str | None = None) -> Iterable[Statement]:
+        if predicate is None:
+            return self._live(range(len(self._pred)))
+        pid = self._pred_ids.get(predicate)
+        if pid is None:
+            return ()
+        return self._live(self._by_pred.get(pid, ()))
+
+    def by_concept(self, concept_id: str) -> Iterable[Statement]:
+        tid = self._term_ids.get((True, concept_id))
+        if tid is None:
+            return ()
+        return self._live(sorted(set(self._by_term.get(tid, ()))))
+
+    def match(self, predicate: str, pattern: Sequence[Optional[Any]]) -> Iterator[Statement]:
+        pid = self._pred_ids.get(predicate)
+        if pid is None:
+            return iter(())
+        bound = []
+        for k, v in enumerate(pattern):
+            if v is None:
+                continue
+            t = self._term_id(v, create=False)
+            if t == _NO_ARG:
+                return iter(())
+            rows = self._by_arg.get(self._index_key(pid, k, t))
+            if rows is None:
+                return iter(())
+            bound.append((len(rows), rows, k, t))
+        if not bound:
+            return iter(list(self._live(self._by_pred.get(pid, ()))))
+        bound.sort(key=lambda b: b[0])
+        rows = bound[0][1]
+        checks = [(self._cols[k], t) for _, _, k, t in bound[1:]]
+        pred = self._pred
+        # Материализуем сразу: номера строк меняются при компактизации.
+        return iter([
+            self._materialize(r) for r in rows
+            if pred[r] == pid and all(col[r] == t for col, t in checks)
+        ])
+
+    def count(self, predicate: str | None = None) -> int:
+        if predicate is None:
+            return self._live_rows
+        pid = self._pred_ids.get(predicate)
+        return 0 if pid is None else self._counts.get(pid, 0)
+
+    def scan_size(self, predicate: str, pattern: Sequence[Optional[Any]]) -> int:
+        pid = self._pred_ids.get(predicate)
+        if pid is None:
+            return 0
+        sizes = []
+        for k, v in enumerate(pattern):
+            if v is None:
+                continue
+            t = self._term_id(v, create=False)
+            rows = None if t == _NO_ARG else self._by_arg.get(self._index_key(pid, k, t))
+            if rows is None:
+                return 0
+            sizes.append(len(rows))
+        return min(sizes) if sizes else len(self._by_pred.get(pid, ()))
+
+    def fork(self) -> "CompactFactStore":
+        new = CompactFactStore.__new__(CompactFactStore)
+        new._term_ids = dict(self._term_ids)
+        new._terms = list(self._terms)
+        new._pred_ids = dict(self._pred_ids)
+        new._pred_names = list(self._pred_names)
+        new._arity = list(self._arity)
+        new._pred = array("i", self._pred)
+        new._cols = [array("i", c) for c in self._cols]
+        new._dead = self._dead
+        new._live_rows = self._live_rows
+        new._by_pred = {k: array("i", v) for k, v in self._by_pred.items()}
+        new._by_arg = {k: array("i", v) for k, v in self._by_arg.items()}
+        new._by_term = {k: array("i", v) for k, v in self._by_term.items()}
+        new._counts = dict(self._counts)
+        return new
+
+    def __repr__(self) -> str:
+        return f"CompactFactStore(facts={self._live_rows}, terms={len(self._terms)})"
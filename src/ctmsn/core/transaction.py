@@ -0,0 +1,118 @@
+"""Журнал изменений сети: транзакции begin/commit/rollback с точными дельтами.
+
+Транзакция записывает каждую элементарную мутацию сети (факт добавлен/удалён,
+концепт или предикат заменён) в журнал отмены. added/removed — чистая дельта
+по фактам относительно начала транзакции: добавление и последующее удаление
+одного и того же факта взаимно сокращаются. Стоимость — O(изменений), копия
+сети не нужна ни для дельты, ни для отката.
+
+Транзакции вкладываются: commit вложенной переносит её журнал в объемлющую,
+rollback вложенной откатывает только её изменения.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Set, Tuple
+
+from ctmsn.core.statement import Statement
+
+if TYPE_CHECKING:
+    from ctmsn.core.network import SemanticNetwork
+
+# Маркер "записи не было" для журнала словарей concepts/predicates.
+MISSING: Any = object()
+
+ADD = "add"
+REMOVE = "remove"
+CONCEPT = "concept"
+PREDICATE = "predicate"
+
+
+class Transaction:
+    """Дескриптор транзакции, возвращаемый SemanticNetwork.begin().
+
+    added / removed — чистая дельта фактов; active — транзакция не завершена.
+    Поддерживает with-блок: исключение внутри блока откатывает транзакцию,
+    нормальный выход фиксирует её.
+    """
+
+    def __init__(self, net: "SemanticNetwork") -> None:
+        self.net = net
+        self.added: Set[Statement] = set()
+        self.removed: Set[Statement] = set()
+        self.active = True
+        self._log: List[Tuple[Any, ...]] = []
+
+    # ── запись (вызывается сетью) ─────────────────────────────
+
+    def record_add(self, st: Statement) -> None:
+        self._log.append((ADD, st))
+        if st in self.removed:
+            self.removed.discard(st)
+        else:
+            self.added.add(st)
+
+    def record_remove(self, st: Statement) -> None:
+        self._log.append((REMOVE, st))
+        if st in self.added:
+            self.added.discard(st)
+        else:
+            self.removed.add(st)
+
+    def record_entry(self, kind: str, key: str, old: Any) -> None:
+        self._log.append((kind, key, old))
+
+    # ── завершение ────────────────────────────────────────────
+
+    def _finish(self) -> None:
+        if not self.active:
+            raise RuntimeError("Transaction is already finished")
+        journal = self.net._journal
+        if not journal or journal[-1] is not self:
+            raise RuntimeError("Only the innermost transaction can be finished")
+        journal.pop()
+        self.active = False
+
+    def commit(self) -> None:
+        """Зафиксировать изменения (во вложенной транзакции — передать их наверх)."""
+        self._finish()
+        journal = self.net._journal
+        if journal:
+            parent = journal[-1]
+            for entry in self._log:
+                if entry[0] == ADD:
+                    parent.record_add(entry[1])
+                elif entry[0] == REMOVE:
+                    parent.record_remove(entry[1])
+                else:
+                    parent._log.append(entry)
+
+    def rollback(self) -> None:
+        """Откатить все изменения транзакции в обратном порядке."""
+        self._finish()
+        net = self.net
+        saved, net._journal = net._journal, []
+        try:
+            for entry in reversed(self._log):
+                kind = entry[0]
+                if kind == ADD:
+                    net._unindex(entry[1])
+                elif kind == REMOVE:
+                    net._index(entry[1])
+                else:
+                    setter = net._set_concept if kind == CONCEPT else net._set_predicate
+                    setter(entry[1], None if entry[2] is MISSING else entry[2])
+        finally:
+            net._journal = saved
+        self._log.clear()
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self.active:
+            return
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
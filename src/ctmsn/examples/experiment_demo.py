@@ -5,7 +5,7 @@
 печатает таблицу метрик и экспортирует артефакты JSON/CSV.
 
 Запуск:
-    python3 src/ctmsn/examples/experiment_demo.py [--out DIR] [--repeats N]
+    python3 src/ctmsn/examples/experiment_demo.py [--out DIR] [--repeats N] [--profile]
 """
 
 from __future__ import annotations
@@ -35,10 +35,14 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Экспериментальный контур CTMSN")
     parser.add_argument("--out", default=None, help="каталог для артефактов JSON/CSV")
     parser.add_argument("--repeats", type=int, default=3, help="повторов для оценки времени")
+    parser.add_argument("--profile", action="store_true", help="отчёт о самых дорогих атомах формул")
     args = parser.parse_args()
 
-    results = run_suite(build_suite(), repeats=args.repeats)
+    results = run_suite(build_suite(), repeats=args.repeats, profile=args.profile)
     print(format_table(results))
+    for r in results:
+        if r.profile is not None:
+            print(f"\n[{r.case}]\n{r.profile.format(5)}")
 
     if args.out:
         os.makedirs(args.out, exist_ok=True)
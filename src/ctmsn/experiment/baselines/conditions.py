@@ -66,7 +66,7 @@ def _build_net_and_rules(problem: Problem):
 
 def _audit_consistent(net: SemanticNetwork) -> bool:
     """Объект согласован тогда и только тогда, когда находится ровно на одной стадии."""
-    at_facts = [f for f in net.facts("at") if getattr(f.args[0], "id", None) == "obj"]
+    at_facts = [f for f in net.view("at") if getattr(f.args[0], "id", None) == "obj"]
     return len(at_facts) == 1
 
 
@@ -7,7 +7,7 @@ from ctmsn.core.concept import Concept
 from ctmsn.core.network import SemanticNetwork
 from ctmsn.core.predicate import Predicate
 from ctmsn.forcing.conditions import Conditions
-from ctmsn.logic.formula import FactAtom, Or
+from ctmsn.logic.dag import formulas
 from ctmsn.param.context import Context
 from ctmsn.transition.invariant import invariants
 from ctmsn.transition.rule import AddFact, FactOp, RetractFact, TransitionRule
@@ -63,7 +63,7 @@ def staged_process_case(
         rules.append(
             TransitionRule(
                 name=f"{src}->{dst}",
-                guard=FactAtom("at", (obj, net.concepts[src])),
+                guard=formulas.fact("at", obj, net.concepts[src]),
                 effect=tuple(effect),
             )
         )
@@ -72,7 +72,7 @@ def staged_process_case(
         rules.append(
             TransitionRule(
                 name=f"{last}->{first}",
-                guard=FactAtom("at", (obj, net.concepts[last])),
+                guard=formulas.fact("at", obj, net.concepts[last]),
                 effect=(RetractFact("at", ("obj", last)), AddFact("at", ("obj", first))),
             )
         )
@@ -80,7 +80,7 @@ def staged_process_case(
     conds: Conditions = Conditions()
     if with_invariant:
         conds = invariants(
-            Or(tuple(FactAtom("at", (obj, net.concepts[s])) for s in stages))
+            formulas.or_(*(formulas.fact("at", obj, net.concepts[s]) for s in stages))
         )
 
     return ExperimentCase(name=name, net=net, rules=rules, invariants=conds)
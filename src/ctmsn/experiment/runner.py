@@ -4,6 +4,7 @@ import time
 from dataclasses import dataclass
 from typing import Sequence
 
+from ctmsn.logic.profile import Profiler, ProfileReport
 from ctmsn.transition.engine import TransitionEngine, make_state
 from ctmsn.transition.trace import Trace
 from ctmsn.experiment.case import ExperimentCase
@@ -15,13 +16,17 @@ class RunResult:
     case: str
     trace: Trace
     metrics: RunMetrics
+    profile: ProfileReport | None = None
 
 
-def run_case(case: ExperimentCase, repeats: int = 1) -> RunResult:
+def run_case(case: ExperimentCase, repeats: int = 1, *, profile: bool = False) -> RunResult:
     """Прогнать один кейс до неподвижной точки и собрать метрики.
 
     repeats > 1 повторяет прогон и берёт наименьшую длительность как наиболее
     устойчивую оценку (результат переходов детерминирован, варьируется лишь время).
+    profile=True — после замеров ещё один прогон с Profiler; его отчёт
+    (гварды и инварианты по узлам) — в RunResult.profile, на duration_ms
+    он не влияет.
     """
     engine = TransitionEngine(
         rules=list(case.rules),
@@ -38,10 +43,23 @@ def run_case(case: ExperimentCase, repeats: int = 1) -> RunResult:
         best_ms = dt if best_ms is None else min(best_ms, dt)
 
     assert trace is not None
+    report: ProfileReport | None = None
+    if profile:
+        profiler = Profiler()
+        TransitionEngine(
+            rules=list(case.rules),
+            invariants=case.invariants,
+            max_steps=case.max_steps,
+            profiler=profiler,
+        ).run_to_fixpoint(make_state(case.net, case.context))
+        report = profiler.report()
+
     metrics = compute_metrics(case.name, trace, best_ms or 0.0)
-    return RunResult(case=case.name, trace=trace, metrics=metrics)
+    return RunResult(case=case.name, trace=trace, metrics=metrics, profile=report)
 
 
-def run_suite(cases: Sequence[ExperimentCase], repeats: int = 1) -> list[RunResult]:
+def run_suite(
+    cases: Sequence[ExperimentCase], repeats: int = 1, *, profile: bool = False
+) -> list[RunResult]:
     """Прогнать набор кейсов и вернуть результаты в порядке следования."""
-    return [run_case(c, repeats=repeats) for c in cases]
+    return [run_case(c, repeats=repeats, profile=profile) for c in cases]
@@ -1,6 +1,7 @@
-__all__ = ["CheckResult", "ForceResult", "Conditions", "Strategy", "BruteEnumStrategy", "ForcingEngine"]
+__all__ = ["CheckResult", "ForceResult", "Conditions", "Strategy", "BruteEnumStrategy", "BacktrackingStrategy", "ParallelStrategy", "ForcingEngine", "Budget", "Progress"]
 
+from ctmsn.forcing.budget import Budget, Progress
 from ctmsn.forcing.result import CheckResult, ForceResult
 from ctmsn.forcing.conditions import Conditions
-from ctmsn.forcing.strategy import Strategy, BruteEnumStrategy
+from ctmsn.forcing.strategy import Strategy, BruteEnumStrategy, BacktrackingStrategy, ParallelStrategy
 from ctmsn.forcing.engine import ForcingEngine
@@ -0,0 +1,113 @@
+"""Бюджет поиска force(): лимиты времени и узлов, прогресс и отмена.
+
+С бюджетом (force(..., budget=Budget(...))) размер пространства перебора
+заранее не проверяется: кандидаты перебираются лениво, а поиск
+останавливается по лимиту времени, лимиту проверенных кандидатов или по
+флагу отмены. Остановленный поиск даёт UNKNOWN с exhaustive=False.
+
+Движок отмечает каждого проверенного кандидата (Meter.tick); стратегии с
+долгим внутренним поиском (BacktrackingStrategy) между кандидатами
+вызывают Meter.check, чтобы лимит времени и отмена срабатывали вовремя.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+
+__all__ = ["Budget", "Meter", "Progress", "SearchTruncated", "lazy_product"]
+
+
+@dataclass(frozen=True)
+class Progress:
+    """Снимок хода поиска для обратного вызова.
+
+    remaining — оценка сверху числа непроверенных кандидатов (None, если
+    размер пространства неизвестен); elapsed — секунды с начала поиска.
+    """
+
+    nodes: int
+    remaining: Optional[int]
+    elapsed: float
+
+
+@dataclass
+class Budget:
+    """Ограничения поиска force().
+
+    time_limit — секунды (по часам time.monotonic); max_nodes — сколько
+    кандидатов проверить; progress — вызывается каждые progress_every
+    кандидатов и по окончании; cancel — объект с is_set() (например,
+    threading.Event) для кооперативной отмены из другого потока.
+    """
+
+    time_limit: Optional[float] = None
+    max_nodes: Optional[int] = None
+    progress: Optional[Callable[[Progress], None]] = field(default=None, compare=False)
+    progress_every: int = 1000
+    cancel: Any = field(default=None, compare=False)
+
+    def start(self, total: Optional[int]) -> "Meter":
+        return Meter(self, total)
+
+
+class SearchTruncated(Exception):
+    """Поиск остановлен бюджетом; текст — причина."""
+
+
+class Meter:
+    """Счётчик одного поиска с бюджетом; total — размер пространства или None."""
+
+    def __init__(self, budget: Budget, total: Optional[int]) -> None:
+        self.budget = budget
+        self.total = total
+        self.nodes = 0
+        self.t0 = time.monotonic()
+        self.deadline = None if budget.time_limit is None else self.t0 + budget.time_limit
+
+    def check(self) -> None:
+        """SearchTruncated, если поиск отменён или время вышло."""
+        b = self.budget
+        if b.cancel is not None and b.cancel.is_set():
+            raise SearchTruncated("cancelled")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchTruncated(f"time limit {b.time_limit}s reached")
+
+    def tick(self) -> None:
+        """Учесть очередного кандидата (или SearchTruncated, если бюджет исчерпан)."""
+        self.check()
+        b = self.budget
+        if b.max_nodes is not None and self.nodes >= b.max_nodes:
+            raise SearchTruncated(f"node limit {b.max_nodes} reached")
+        self.nodes += 1
+        if b.progress is not None and self.nodes % b.progress_every == 0:
+            self.report()
+
+    def report(self) -> None:
+        if self.budget.progress is not None:
+            remaining = None if self.total is None else max(0, self.total - self.nodes)
+            self.budget.progress(Progress(self.nodes, remaining, time.monotonic() - self.t0))
+
+
+def lazy_product(domains: Sequence[Sequence[Any]]) -> Iterator[Tuple[Any, ...]]:
+    """Декартово произведение в порядке itertools.product без копирования доменов.
+
+    itertools.product сначала превращает каждый домен в кортеж; здесь
+    значения берутся по индексу, поэтому range(10**9) не материализуется.
+    """
+    n = len(domains)
+    if any(len(d) == 0 for d in domains):
+        return
+    idx = [0] * n
+    while True:
+        yield tuple(d[i] for d, i in zip(domains, idx))
+        k = n - 1
+        while k >= 0:
+            idx[k] += 1
+            if idx[k] < len(domains[k]):
+                break
+            idx[k] = 0
+            k -= 1
+        if k < 0:
+            return
@@ -1,25 +1,83 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from typing import Iterator, Sequence
 
 from ctmsn.core.network import SemanticNetwork
 from ctmsn.param.context import Context
-from ctmsn.logic.formula import Formula, collect_variables
+from ctmsn.logic.formula import And, Formula, collect_variables
 from ctmsn.logic.tribool import TriBool
-from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.cache import EvalCache
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.dag import DagEvaluator
+from ctmsn.logic.memo import IdentityMemo
+from ctmsn.logic.batch import evaluate_product, first_true
+from ctmsn.logic.partial import specialize
+from ctmsn.logic.planner import Planner
+from ctmsn.logic.profile import Profiler
 from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing import parallel
+from ctmsn.forcing.budget import Budget, Meter, SearchTruncated
+from ctmsn.forcing.extensions import count_extensions, extensions
+from ctmsn.forcing.propagation import propagate as propagate_domains
 from ctmsn.forcing.result import CheckResult, ForceResult
-from ctmsn.forcing.strategy import Strategy, BruteEnumStrategy
+from ctmsn.forcing.strategy import BacktrackingStrategy, Strategy, BruteEnumStrategy, ParallelStrategy
+
+_DAGS: "IdentityMemo[DagEvaluator]" = IdentityMemo()
+
+# Сколько первых кандидатов поиска с reorder=True передаётся Planner.observe.
+OBSERVE_CANDIDATES = 64
 
 
 @dataclass
 class ForcingEngine:
+    """Проверка условий и поиск вынуждающих расширений контекста.
+
+    cache — необязательный EvalCache: повторные вычисления формул при
+    неизменных фактах и значениях переменных берутся из него.
+    reorder — при поиске в force() переставлять операнды And/Or по оценке
+    стоимости (logic.planner); имена условий в объяснениях не меняются.
+    Первые OBSERVE_CANDIDATES кандидатов последовательного поиска идут в
+    Planner.observe; планировщик (planner) живёт между вызовами force(),
+    поэтому наблюдённые доли TRUE уточняют порядок следующих поисков.
+    propagate — перед поиском в force() сузить домены переменных по
+    конъюнктам phi и условий (forcing.propagation, AC-3) и передать их
+    стратегии; размеры доменов до/после — в explanation.
+    profiler — необязательный logic.profile.Profiler: все вычисления формул
+    идут через него; кеш, остаточные формулы и пакетный режим при этом не
+    используются, чтобы в отчёте были узлы исходных формул.
+    """
+
     net: SemanticNetwork
+    cache: EvalCache | None = field(default=None, compare=False)
+    reorder: bool = field(default=False, compare=False)
+    propagate: bool = field(default=False, compare=False)
+    profiler: Profiler | None = field(default=None, compare=False)
+    planner: Planner | None = field(default=None, compare=False)
+
+    def _eval(self, formula: Formula, ctx: Context) -> TriBool:
+        if self.profiler is not None:
+            return self.profiler.evaluate(formula, self.net, ctx)
+        if self.cache is not None:
+            return self.cache.evaluate(formula, self.net, ctx)
+        return compiled(formula)(self.net, ctx)
+
+    def _eval_conditions(self, ctx: Context, conditions: Conditions) -> Sequence[TriBool]:
+        if self.profiler is not None:
+            return [self.profiler.evaluate(c, self.net, ctx) for c in conditions.items]
+        if self.cache is not None:
+            return [self.cache.evaluate(c, self.net, ctx) for c in conditions.items]
+        # Структура DAG условий считается один раз на объект Conditions.
+        dag = _DAGS.get(conditions)
+        if dag is None:
+            dag = _DAGS[conditions] = DagEvaluator(conditions.items)
+        if dag.shared:
+            return dag.evaluate(self.net, ctx)
+        return [compiled(c)(self.net, ctx) for c in conditions.items]
 
     def check(self, ctx: Context, conditions: Conditions) -> CheckResult:
         violated: list[str] = []
         unknown: list[str] = []
-        for i, c in enumerate(conditions.items):
-            v = evaluate(c, self.net, ctx)
+        for i, v in enumerate(self._eval_conditions(ctx, conditions)):
             if v is TriBool.FALSE:
                 violated.append(f"cond[{i}]")
             elif v is TriBool.UNKNOWN:
@@ -30,7 +88,7 @@ class ForcingEngine:
         chk = self.check(ctx, conditions)
         if not chk.ok:
             return TriBool.FALSE
-        v = evaluate(phi, self.net, ctx)
+        v = self._eval(phi, ctx)
         if v is TriBool.FALSE:
             return TriBool.FALSE
         if v is TriBool.TRUE and not chk.unknown:
@@ -43,7 +101,34 @@ class ForcingEngine:
         phi: Formula,
         conditions: Conditions,
         strategy: Strategy | None = None,
+        *,
+        batch: bool = False,
+        workers: int | None = None,
+        budget: Budget | None = None,
     ) -> ForceResult:
+        """Найти расширение ctx, вынуждающее phi при условиях.
+
+        batch=True — для BruteEnumStrategy условия и phi вычисляются сразу
+        на всём пространстве перебора (logic.batch, с NumPy при наличии
+        extras ``experiment``); результат тот же, что и при поочерёдном
+        переборе: первое в порядке перебора вынуждающее присваивание.
+        workers=N — перебор BruteEnumStrategy в N процессах (ParallelStrategy,
+        forcing.parallel); без стратегии — ParallelStrategy(workers=N).
+        budget — поиск без проверки размера пространства заранее, но с лимитами
+        времени/кандидатов, прогрессом и отменой (forcing.budget); исчерпанный
+        бюджет даёт UNKNOWN с exhaustive=False. Перебор с бюджетом идёт в
+        текущем процессе, без batch и workers.
+        Без кеша поиск идёт по остаточным формулам (logic.partial.specialize).
+        """
+        if workers is not None:
+            if strategy is None:
+                strategy = ParallelStrategy(workers=workers)
+            elif isinstance(strategy, ParallelStrategy):
+                strategy = replace(strategy, workers=workers)
+            elif type(strategy) is BruteEnumStrategy:
+                strategy = ParallelStrategy(max_branch=strategy.max_branch, domains=strategy.domains, workers=workers)
+            else:
+                raise ValueError(f"workers= is supported only for BruteEnumStrategy, got {type(strategy).__name__}")
         strategy = strategy or BruteEnumStrategy()
         cur = self.forces(ctx, phi, conditions)
         if cur is TriBool.TRUE:
@@ -53,11 +138,116 @@ class ForcingEngine:
         all_vars = set(collect_variables(phi))
         for cond in conditions.items:
             all_vars |= set(collect_variables(cond))
-        unassigned = [v for v in all_vars if not ctx.is_assigned(v)]
+        # Порядок перебора не должен зависеть от хешей (PYTHONHASHSEED).
+        unassigned = sorted((v for v in all_vars if not ctx.is_assigned(v)), key=lambda v: v.name)
+        strategy = strategy.for_goal(self.net, phi, conditions)
+        note = ""
+        if self.propagate:
+            prop = propagate_domains(self.net, ctx, And((phi,) + tuple(conditions.items)), unassigned)
+            note = f"; {prop.describe()}"
+            if prop.empty:
+                return ForceResult(status=TriBool.FALSE, context=None, explanation="No satisfying assignment found" + note)
+            strategy = strategy.with_domains(prop.domains)
+        meter: Meter | None = None
+        if budget is not None:
+            meter = budget.start(strategy.size(unassigned))
+            strategy = strategy.budgeted(meter)
+
+        # Наблюдения планировщика — по исходным атомам: в остаточных формулах
+        # атомы уже заменены сравнениями со значениями из фактов.
+        observed = (phi, *conditions.items) if self.reorder else ()
+        if self.cache is None and self.profiler is None:
+            # Сеть во время перебора не меняется: факты и заданные в ctx
+            # значения подставляются один раз, кандидаты проверяются по остатку.
+            phi = specialize(phi, self.net, ctx)
+            conditions = Conditions(tuple(specialize(c, self.net, ctx) for c in conditions.items))
+        if self.reorder:
+            if self.planner is None or self.planner.net is not self.net:
+                self.planner = Planner(self.net)
+            planner = self.planner
+            phi = planner.plan(phi)
+            conditions = Conditions(tuple(planner.plan(c) for c in conditions.items))
+
+        result = self._search(ctx, phi, conditions, strategy, unassigned, batch, meter, observed)
+        if isinstance(strategy, BacktrackingStrategy):
+            result.nodes = strategy.nodes
+        if meter is not None:
+            meter.report()
+        if note:
+            result.explanation = (result.explanation or "") + note
+        return result
 
+    def _extension_space(self, ctx: Context, phi: Formula, conditions: Conditions):
+        goal = And((phi,) + tuple(conditions.items))
+        variables = sorted({v for v in collect_variables(goal) if not ctx.is_assigned(v)}, key=lambda v: v.name)
+        domains = None
+        if self.propagate:
+            prop = propagate_domains(self.net, ctx, goal, variables)
+            if prop.empty:
+                return None
+            domains = prop.domains
+        return goal, variables, domains
+
+    def force_all(
+        self, ctx: Context, phi: Formula, conditions: Conditions, *, minimal: bool = True
+    ) -> Iterator[ForceResult]:
+        """Поток всех вынуждающих расширений ctx (forcing.extensions).
+
+        minimal=True — минимальные расширения (часть переменных может
+        остаться незаданной; для уже вынуждающего ctx — единственное пустое);
+        minimal=False — все полные присваивания перечислимых переменных.
+        Порядок детерминирован: компоненты и переменные — по именам.
+        """
+        space = self._extension_space(ctx, phi, conditions)
+        if space is None:
+            return
+        goal, variables, domains = space
+        for assignment in extensions(ctx, goal, variables, self._eval, minimal=minimal, domains=domains):
+            desc = {v.name: val for v, val in assignment}
+            yield ForceResult(
+                status=TriBool.TRUE,
+                context=ctx.extend(dict(assignment)),
+                explanation=f"Found assignment: {desc}" if assignment else "Already forced",
+            )
+
+    def count_forcing(self, ctx: Context, phi: Formula, conditions: Conditions, *, minimal: bool = True) -> int:
+        """Число расширений force_all() без построения контекстов.
+
+        Независимые компоненты считаются по отдельности, числа перемножаются.
+        """
+        space = self._extension_space(ctx, phi, conditions)
+        if space is None:
+            return 0
+        goal, variables, domains = space
+        return count_extensions(ctx, goal, variables, self._eval, minimal=minimal, domains=domains)
+
+    def _search(
+        self,
+        ctx: Context,
+        phi: Formula,
+        conditions: Conditions,
+        strategy: Strategy,
+        unassigned: list,
+        batch: bool,
+        meter: Meter | None = None,
+        observed: Sequence[Formula] = (),
+    ) -> ForceResult:
         try:
-            for assignment in strategy.candidates(ctx, unassigned):
+            serial = meter is not None or self.profiler is not None
+            if batch and not serial and type(strategy) is BruteEnumStrategy:
+                return self._force_batch(ctx, phi, conditions, strategy, unassigned)
+            if isinstance(strategy, ParallelStrategy) and not serial and strategy.workers != 1:
+                result = self._force_parallel(ctx, phi, conditions, strategy, unassigned)
+                if result is not None:
+                    return result
+            observer = self.planner if observed else None
+            for n, assignment in enumerate(strategy.candidates(ctx, unassigned)):
+                if meter is not None:
+                    meter.tick()
                 extended = ctx.extend(assignment)
+                if observer is not None and n < OBSERVE_CANDIDATES:
+                    for f in observed:
+                        observer.observe(f, extended)
                 if self.forces(extended, phi, conditions) is TriBool.TRUE:
                     desc = {v.name: val for v, val in assignment.items()}
                     return ForceResult(
@@ -67,4 +257,75 @@ class ForcingEngine:
                     )
             return ForceResult(status=TriBool.FALSE, context=None, explanation="No satisfying assignment found")
         except ValueError as e:
-            return ForceResult(status=TriBool.UNKNOWN, context=None, explanation=str(e))
+            # max_branch / max_nodes: перебор не выполнен до конца.
+            return ForceResult(status=TriBool.UNKNOWN, context=None, explanation=str(e), exhaustive=False)
+        except SearchTruncated as e:
+            nodes = meter.nodes if meter is not None else 0
+            return ForceResult(
+                status=TriBool.UNKNOWN,
+                context=None,
+                explanation=f"Search truncated: {e} after {nodes} candidates",
+                exhaustive=False,
+            )
+
+    def _force_batch(
+        self,
+        ctx: Context,
+        phi: Formula,
+        conditions: Conditions,
+        strategy: BruteEnumStrategy,
+        unassigned: list,
+    ) -> ForceResult:
+        enumerable, domains = strategy.space(unassigned)
+        if enumerable:
+            space = [(v.name, d) for v, d in zip(enumerable, domains)]
+            # forces() == TRUE ровно когда истинны phi и все условия.
+            goal = And((phi,) + tuple(conditions.items))
+            row = first_true(evaluate_product(goal, self.net, ctx, space))
+            if row is not None:
+                return self._found(ctx, enumerable, domains, row)
+        return ForceResult(status=TriBool.FALSE, context=None, explanation="No satisfying assignment found")
+
+    def _force_parallel(
+        self,
+        ctx: Context,
+        phi: Formula,
+        conditions: Conditions,
+        strategy: ParallelStrategy,
+        unassigned: list,
+    ) -> ForceResult | None:
+        """Перебор в пуле процессов; None — задачу не сериализовать."""
+        enumerable, domains = strategy.space(unassigned)
+        total = 1
+        for d in domains:
+            total *= len(d)
+        if not enumerable or not total:
+            return ForceResult(status=TriBool.FALSE, context=None, explanation="No satisfying assignment found")
+        blob = parallel.pack(self.net, ctx, phi, conditions.items, [v.name for v in enumerable], domains)
+        if blob is None:
+            return None
+        row = parallel.search(
+            blob,
+            total,
+            workers=strategy.workers,
+            chunk_size=strategy.chunk_size,
+            deterministic=strategy.deterministic,
+        )
+        if row is None:
+            return ForceResult(status=TriBool.FALSE, context=None, explanation="No satisfying assignment found")
+        return self._found(ctx, enumerable, domains, row)
+
+    @staticmethod
+    def _found(ctx: Context, enumerable: list, domains: list, row: int) -> ForceResult:
+        """Результат для строки row пространства перебора (порядок itertools.product)."""
+        combo = []
+        for d in reversed(domains):
+            row, k = divmod(row, len(d))
+            combo.append(d[k])
+        assignment = dict(zip(enumerable, reversed(combo)))
+        desc = {v.name: val for v, val in assignment.items()}
+        return ForceResult(
+            status=TriBool.TRUE,
+            context=ctx.extend(assignment),
+            explanation=f"Found assignment: {desc}",
+        )
@@ -0,0 +1,211 @@
+"""Все вынуждающие расширения контекста: перечисление и подсчёт.
+
+Расширение вынуждает phi, когда phi и все условия TRUE, то есть TRUE каждый
+конъюнкт верхнего уровня And(phi, *условия). Конъюнкты разбиваются на
+компоненты по общим свободным переменным: компоненты независимы, поэтому
+расширения всей задачи — декартово произведение расширений компонент, а их
+число — произведение чисел (компоненты не перебираются совместно).
+
+Внутри компоненты — поиск в глубину по переменным (в порядке имён);
+конъюнкт, ставший FALSE на частичном присваивании, отсекает поддерево
+(в логике Клини FALSE не меняется при доприсваивании).
+
+minimal=True — минимальные расширения: вынуждают, но без любой своей
+переменной уже нет (раз TRUE сохраняется при доприсваивании, достаточно
+проверить удаление по одной переменной). Переменные в них могут оставаться
+незаданными. minimal=False — полные присваивания всех перечислимых
+свободных переменных.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from ctmsn.logic.cache import formula_dependencies
+from ctmsn.logic.formula import Formula
+from ctmsn.logic.query import conjuncts
+from ctmsn.logic.tribool import TriBool
+from ctmsn.forcing.strategy import Domains, _values
+from ctmsn.param.context import Context
+from ctmsn.param.domain import PredicateDomain
+from ctmsn.param.variable import Variable
+
+__all__ = ["Component", "components", "count_extensions", "extensions"]
+
+Assignment = Tuple[Tuple[Variable, Any], ...]
+Evaluate = Callable[[Formula, Context], TriBool]
+
+
+@dataclass(frozen=True)
+class Component:
+    """Независимая часть задачи: переменные, их домены и конъюнкты."""
+
+    variables: Tuple[Variable, ...]
+    domains: Tuple[Sequence[Any], ...]
+    checks: Tuple[Formula, ...]
+
+
+def components(
+    ctx: Context,
+    goal: Formula,
+    variables: Sequence[Variable],
+    domains: Domains = None,
+) -> Tuple[List[Component], List[Formula]]:
+    """(компоненты, конъюнкты без перечислимых свободных переменных).
+
+    Переменные с PredicateDomain не перебираются и компоненты не связывают.
+    """
+    by_name = {
+        v.name: v for v in variables
+        if not ctx.is_assigned(v) and not isinstance(v.domain, PredicateDomain)
+    }
+    parent = {n: n for n in by_name}
+
+    def find(n: str) -> str:
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    ground: List[Formula] = []
+    owned: List[Tuple[str, Formula]] = []
+    for f in conjuncts(goal):
+        names = sorted(n for n in formula_dependencies(f)[1] if n in by_name)
+        if not names:
+            ground.append(f)
+            continue
+        for n in names[1:]:
+            parent[find(n)] = find(names[0])
+        owned.append((names[0], f))
+
+    groups: Dict[str, List[str]] = {}
+    for n in sorted(by_name):
+        groups.setdefault(find(n), []).append(n)
+    checks: Dict[str, List[Formula]] = {}
+    for n, f in owned:
+        checks.setdefault(find(n), []).append(f)
+
+    out = []
+    for root, names in sorted(groups.items(), key=lambda kv: kv[1][0]):
+        vs = tuple(by_name[n] for n in names)
+        doms = tuple(_values(v, domains) for v in vs)
+        out.append(Component(vs, doms, tuple(checks.get(root, ()))))
+    return out, ground
+
+
+def _search(comp: Component, values: Dict[str, Any], evaluate: Evaluate, minimal: bool) -> Iterator[Assignment]:
+    probe = Context(_values=values)
+    chosen: List[Tuple[Variable, Any]] = []
+
+    def status() -> TriBool:
+        result = TriBool.TRUE
+        for f in comp.checks:
+            v = evaluate(f, probe)
+            if v is TriBool.FALSE:
+                return TriBool.FALSE
+            if v is not TriBool.TRUE:
+                result = TriBool.UNKNOWN
+        return result
+
+    def is_minimal() -> bool:
+        for var, val in chosen:
+            del values[var.name]
+            still = status() is TriBool.TRUE
+            values[var.name] = val
+            if still:
+                return False
+        return True
+
+    def rec(i: int) -> Iterator[Assignment]:
+        st = status()
+        if st is TriBool.FALSE:
+            return
+        if minimal and st is TriBool.TRUE:
+            # Любое доприсваивание уже не минимально.
+            if is_minimal():
+                yield tuple(chosen)
+            return
+        if i == len(comp.variables):
+            if st is TriBool.TRUE:
+                yield tuple(chosen)
+            return
+        var = comp.variables[i]
+        if minimal:
+            yield from rec(i + 1)  # переменная остаётся незаданной
+        for val in comp.domains[i]:
+            values[var.name] = val
+            chosen.append((var, val))
+            yield from rec(i + 1)
+            chosen.pop()
+            del values[var.name]
+
+    yield from rec(0)
+
+
+def _ground_ok(ctx: Context, ground: Sequence[Formula], evaluate: Evaluate) -> bool:
+    return all(evaluate(f, ctx) is TriBool.TRUE for f in ground)
+
+
+def extensions(
+    ctx: Context,
+    goal: Formula,
+    variables: Sequence[Variable],
+    evaluate: Evaluate,
+    *,
+    minimal: bool = True,
+    domains: Domains = None,
+) -> Iterator[Assignment]:
+    """Поток вынуждающих присваиваний (произведение по компонентам).
+
+    Все компоненты, кроме последней, перебираются заранее; последняя — лениво,
+    поэтому первое расширение готово без полного перебора.
+    """
+    comps, ground = components(ctx, goal, variables, domains)
+    if not _ground_ok(ctx, ground, evaluate):
+        return
+    if not comps:
+        yield ()
+        return
+    *head, last = comps
+    per_component = []
+    for comp in head:
+        found = list(_search(comp, ctx.as_dict(), evaluate, minimal))
+        if not found:
+            return
+        per_component.append(found)
+    prefixes = (tuple(itertools.chain.from_iterable(parts)) for parts in itertools.product(*per_component))
+    # Порядок — как у itertools.product: последняя компонента меняется быстрее
+    # всего. Её расширения запоминаются при первом префиксе.
+    first = next(prefixes)
+    tails: List[Assignment] = []
+    for tail in _search(last, ctx.as_dict(), evaluate, minimal):
+        tails.append(tail)
+        yield first + tail
+    if not tails:
+        return
+    for prefix in prefixes:
+        for tail in tails:
+            yield prefix + tail
+
+
+def count_extensions(
+    ctx: Context,
+    goal: Formula,
+    variables: Sequence[Variable],
+    evaluate: Evaluate,
+    *,
+    minimal: bool = True,
+    domains: Domains = None,
+) -> int:
+    """Число вынуждающих присваиваний без построения контекстов."""
+    comps, ground = components(ctx, goal, variables, domains)
+    if not _ground_ok(ctx, ground, evaluate):
+        return 0
+    total = 1
+    for comp in comps:
+        total *= sum(1 for _ in _search(comp, ctx.as_dict(), evaluate, minimal))
+        if not total:
+            return 0
+    return total
@@ -0,0 +1,189 @@
+"""Параллельный перебор force() в пуле процессов.
+
+Пространство перебора — декартово произведение доменов в порядке
+itertools.product; строка i — i-е присваивание этого порядка. Пространство
+режется на непересекающиеся диапазоны строк, диапазоны проверяются в
+ProcessPoolExecutor. Сеть, контекст и формулы сериализуются один раз и
+передаются каждому процессу при его запуске (initializer); формулы — через
+io.formula_io, чтобы домены переменных (в т.ч. PredicateDomain с
+lambda) не требовали pickle.
+
+deterministic=True — ответ всегда первая в порядке перебора вынуждающая
+строка (как у последовательного BruteEnumStrategy): поиск ждёт только
+диапазоны перед найденной, остальные отменяются. deterministic=False —
+первая найденная любым процессом строка.
+
+Отмена касается и уже запущенных диапазонов: процессы делят счётчик —
+наименьший номер диапазона с найденной строкой (-1 — поиск завершён), и
+диапазон с большим номером прекращает проверку.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.formula import Formula
+from ctmsn.param.context import Context
+
+__all__ = ["pack", "search"]
+
+# Диапазонов на процесс: мельче — раньше отмена после находки, крупнее —
+# меньше накладных расходов на задачу.
+CHUNKS_PER_WORKER = 8
+# Через сколько строк диапазон проверяет, не отменён ли поиск.
+CHECK_EVERY = 256
+
+_state: Dict[str, Any] = {}
+
+
+def pack(
+    net: SemanticNetwork,
+    ctx: Context,
+    phi: Formula,
+    conditions: Sequence[Formula],
+    names: Sequence[str],
+    domains: Sequence[Sequence[Any]],
+) -> Optional[bytes]:
+    """Задача для процессов в виде pickle или None, если её не сериализовать."""
+    # ctmsn.io импортирует transition, а тот — forcing.engine: импорт по месту.
+    from ctmsn.io.formula_io import formula_to_dict
+
+    payload = (
+        net.copy(),
+        ctx.as_dict(),
+        formula_to_dict(phi),
+        [formula_to_dict(c) for c in conditions],
+        list(names),
+        [list(d) for d in domains],
+    )
+    try:
+        return pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+
+def _init_worker(blob: bytes, bound: Any) -> None:
+    from ctmsn.forcing.conditions import Conditions
+    from ctmsn.forcing.engine import ForcingEngine
+    from ctmsn.io.formula_io import formula_from_dict
+
+    net, values, phi, conditions, names, domains = pickle.loads(blob)
+    _state.update(
+        engine=ForcingEngine(net),
+        values=values,
+        phi=formula_from_dict(phi, net),
+        conditions=Conditions(tuple(formula_from_dict(c, net) for c in conditions)),
+        names=names,
+        domains=domains,
+        bound=bound,
+    )
+
+
+def _rows(domains: Sequence[Sequence[Any]], start: int, stop: int) -> Iterator[Tuple[Any, ...]]:
+    """Строки [start, stop) порядка itertools.product без перебора первых start."""
+    if any(not d for d in domains) or start >= stop:
+        return
+    # start — число в смешанной системе счисления; младший разряд — последний домен.
+    digits = []
+    row = start
+    for d in reversed(domains):
+        row, k = divmod(row, len(d))
+        digits.append(k)
+    if row:
+        return  # start за пределами пространства
+    digits.reverse()
+    combo = [d[k] for d, k in zip(domains, digits)]
+    for _ in range(stop - start):
+        yield tuple(combo)
+        i = len(domains) - 1
+        while i >= 0:
+            digits[i] += 1
+            if digits[i] < len(domains[i]):
+                combo[i] = domains[i][digits[i]]
+                break
+            digits[i] = 0
+            combo[i] = domains[i][0]
+            i -= 1
+        else:
+            return
+
+
+def _scan(chunk: int, start: int, stop: int) -> Optional[int]:
+    """Первая вынуждающая строка в [start, stop) или None (в том числе при отмене)."""
+    from ctmsn.logic.tribool import TriBool
+
+    engine, phi, conditions = _state["engine"], _state["phi"], _state["conditions"]
+    names, bound = _state["names"], _state["bound"]
+    values = dict(_state["values"])
+    ctx = Context(_values=values)
+    for i, combo in enumerate(_rows(_state["domains"], start, stop), start):
+        if (i - start) % CHECK_EVERY == 0 and bound.value < chunk:
+            return None
+        values.update(zip(names, combo))
+        if engine.forces(ctx, phi, conditions) is TriBool.TRUE:
+            with bound.get_lock():
+                if chunk < bound.value:
+                    bound.value = chunk
+            return i
+    return None
+
+
+def _ranges(total: int, workers: int, chunk_size: Optional[int]) -> List[Tuple[int, int]]:
+    size = chunk_size or max(1, -(-total // (workers * CHUNKS_PER_WORKER)))
+    return [(lo, min(lo + size, total)) for lo in range(0, total, size)]
+
+
+def search(
+    blob: bytes,
+    total: int,
+    *,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    deterministic: bool = True,
+) -> Optional[int]:
+    """Номер вынуждающей строки пространства из total строк или None."""
+    workers = workers or os.cpu_count() or 1
+    ranges = _ranges(total, workers, chunk_size)
+    if not ranges:
+        return None
+    mp = multiprocessing.get_context()
+    bound = mp.Value("q", len(ranges))
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(ranges)), mp_context=mp, initializer=_init_worker, initargs=(blob, bound)
+    ) as pool:
+        futures: Dict[Future, int] = {pool.submit(_scan, k, lo, hi): k for k, (lo, hi) in enumerate(ranges)}
+        found: Dict[int, int] = {}  # номер диапазона -> строка
+        done_before = 0  # все диапазоны с меньшими номерами проверены
+        finished: set = set()
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    if fut.cancelled():
+                        continue
+                    k = futures[fut]
+                    row = fut.result()
+                    finished.add(k)
+                    if row is not None:
+                        found[k] = row
+                        if not deterministic:
+                            return row
+                        # Диапазоны после найденного уже не нужны.
+                        for other, j in futures.items():
+                            if j > k:
+                                other.cancel()
+                while done_before in finished and done_before not in found:
+                    done_before += 1
+                if done_before in found:
+                    return found[done_before]
+            return None
+        finally:
+            # Остановить и уже запущенные диапазоны.
+            bound.value = -1
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,129 @@
+"""Распространение ограничений (AC-3) перед поиском в force().
+
+Вынуждение требует истинности phi и всех условий, поэтому каждый их
+конъюнкт верхнего уровня — ограничение. Конъюнкт с одной свободной
+перечислимой переменной — унарное ограничение: из домена убираются
+значения, при которых он FALSE. Конъюнкт с двумя — бинарное: AC-3 убирает
+значения, для которых во втором домене не осталось ни одного значения, не
+делающего конъюнкт FALSE (атомы FactAtom проверяются по фактам сети,
+EqAtom — сравнением). Убранные значения не входят ни в одно вынуждающее
+присваивание, а порядок оставшихся сохраняется, поэтому поиск по суженным
+доменам находит то же решение.
+
+Включается явно: ForcingEngine(net, propagate=True); суженные домены
+передаются стратегии через Strategy.with_domains.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.cache import formula_dependencies
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.formula import Formula
+from ctmsn.logic.query import conjuncts
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import PredicateDomain
+from ctmsn.param.variable import Variable
+
+__all__ = ["Propagation", "propagate"]
+
+# Бинарные ограничения с большим числом пар значений не распространяются.
+MAX_PAIRS = 100_000
+
+
+@dataclass(frozen=True)
+class Propagation:
+    """Суженные домены и размеры доменов до и после (по имени переменной)."""
+
+    domains: Dict[Variable, Tuple[Any, ...]]
+    sizes: Dict[str, Tuple[int, int]]
+
+    @property
+    def empty(self) -> bool:
+        """Домен какой-то переменной пуст — вынуждающего присваивания нет."""
+        return any(not d for d in self.domains.values())
+
+    def describe(self) -> str:
+        parts = [f"{name} {before}->{after}" for name, (before, after) in sorted(self.sizes.items())]
+        return "pruned domains: " + (", ".join(parts) if parts else "none")
+
+
+def propagate(
+    net: SemanticNetwork,
+    ctx: Context,
+    goal: Formula,
+    variables: Sequence[Variable],
+    *,
+    max_pairs: int = MAX_PAIRS,
+) -> Propagation:
+    """Сузить домены variables по конъюнктам goal (AC-3).
+
+    Переменные с PredicateDomain не сужаются, и ограничения с ними
+    пропускаются; значения из ctx считаются константами.
+    """
+    by_name = {
+        v.name: v for v in variables
+        if not ctx.is_assigned(v) and not isinstance(v.domain, PredicateDomain)
+    }
+    domains: Dict[Variable, List[Any]] = {v: list(v.domain.enumerate_values()) for v in by_name.values()}
+    before = {v: len(d) for v, d in domains.items()}
+
+    values = ctx.as_dict()
+    probe = Context(_values=values)
+
+    def holds(fn, assignment: Sequence[Tuple[Variable, Any]]) -> bool:
+        for var, val in assignment:
+            values[var.name] = val
+        ok = fn(net, probe) is not TriBool.FALSE
+        for var, _val in assignment:
+            del values[var.name]
+        return ok
+
+    # (x, y) -> ограничения на пару; дуга (x, y) сужает домен x.
+    binary: Dict[Tuple[Variable, Variable], List[Any]] = {}
+    for f in conjuncts(goal):
+        names = set(formula_dependencies(f)[1]) - values.keys()
+        if not names or not names <= by_name.keys():
+            continue
+        fn = compiled(f)
+        if len(names) == 1:
+            var = by_name[names.pop()]
+            domains[var] = [val for val in domains[var] if holds(fn, ((var, val),))]
+        elif len(names) == 2:
+            x, y = sorted((by_name[n] for n in names), key=lambda v: v.name)
+            if before[x] * before[y] <= max_pairs:
+                binary.setdefault((x, y), []).append(fn)
+                binary.setdefault((y, x), []).append(fn)
+
+    neighbours: Dict[Variable, List[Variable]] = {}
+    for x, y in binary:
+        neighbours.setdefault(y, []).append(x)
+
+    queue = deque(binary)
+    queued = set(binary)
+    while queue:
+        arc = queue.popleft()
+        queued.discard(arc)
+        x, y = arc
+        fns = binary[arc]
+        kept = [
+            vx for vx in domains[x]
+            if any(all(holds(fn, ((x, vx), (y, vy))) for fn in fns) for vy in domains[y])
+        ]
+        if len(kept) == len(domains[x]):
+            continue
+        domains[x] = kept
+        if not kept:
+            break
+        for z in neighbours.get(x, ()):
+            if z is not y and (z, x) not in queued:
+                queue.append((z, x))
+                queued.add((z, x))
+
+    sizes = {v.name: (before[v], len(d)) for v, d in domains.items() if len(d) != before[v]}
+    return Propagation({v: tuple(d) for v, d in domains.items()}, sizes)
@@ -17,3 +17,9 @@ class ForceResult:
     status: TriBool
     context: Any | None
     explanation: str | None = None
+    # False — поиск остановлен бюджетом (forcing.budget) или лимитом стратегии
+    # (max_branch, max_nodes) до конца перебора.
+    exhaustive: bool = True
+    # Число присваиваний, сделанных поиском (BacktrackingStrategy); None —
+    # стратегия их не считает или перебора не было.
+    nodes: int | None = None
@@ -1,34 +1,273 @@
 from __future__ import annotations
 import itertools
-from dataclasses import dataclass
-from typing import Iterable, Mapping, Any
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Iterator, Mapping, Any, Optional, Sequence, Tuple
 
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.budget import Meter, lazy_product
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.logic.cache import formula_dependencies
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.formula import And, FactAtom, Formula
+from ctmsn.logic.query import conjuncts, query
+from ctmsn.logic.tribool import TriBool
 from ctmsn.param.variable import Variable
 from ctmsn.param.context import Context
 from ctmsn.param.domain import PredicateDomain
 
 
 class Strategy:
+    def for_goal(self, net: SemanticNetwork, phi: Formula, conditions: Conditions) -> "Strategy":
+        """Стратегия для конкретной задачи force(); по умолчанию — та же."""
+        return self
+
+    def with_domains(self, domains: Mapping[Variable, Sequence[Any]]) -> "Strategy":
+        """Стратегия, перебирающая суженные домены (forcing.propagation); по умолчанию — та же."""
+        return self
+
+    def budgeted(self, meter: Meter) -> "Strategy":
+        """Стратегия для поиска с бюджетом (forcing.budget): без проверки
+        размера пространства заранее; по умолчанию — та же."""
+        return self
+
+    def size(self, vars_to_assign: list[Variable]) -> Optional[int]:
+        """Оценка сверху числа кандидатов или None, если неизвестна."""
+        return None
+
     def candidates(self, ctx: Context, vars_to_assign: list[Variable]) -> Iterable[Mapping[Variable, Any]]:
         raise NotImplementedError
 
 
+Domains = Optional[Mapping[Variable, Sequence[Any]]]
+
+
+def _values(v: Variable, domains: Domains) -> Sequence[Any]:
+    values = domains[v] if domains is not None and v in domains else v.domain.enumerate_values()
+    # range и кортежи не копируются: большие домены перебираются лениво.
+    return values if isinstance(values, (range, tuple, list)) else list(values)
+
+
+def _space_size(vars_to_assign: list[Variable], domains: Domains) -> int:
+    total = 1
+    for v in vars_to_assign:
+        if not isinstance(v.domain, PredicateDomain):
+            total *= len(_values(v, domains))
+    return total
+
+
 @dataclass
 class BruteEnumStrategy(Strategy):
-    max_branch: int = 2000
+    """Полный перебор в порядке itertools.product.
 
-    def candidates(self, ctx: Context, vars_to_assign: list[Variable]) -> Iterable[Mapping[Variable, Any]]:
+    max_branch — наибольший допустимый размер пространства (ValueError
+    заранее); None — без проверки, с ленивым перебором (так работает поиск
+    с бюджетом).
+    """
+
+    max_branch: Optional[int] = 2000
+    domains: Domains = field(default=None, compare=False)
+
+    def with_domains(self, domains: Mapping[Variable, Sequence[Any]]) -> "BruteEnumStrategy":
+        return replace(self, domains=domains)
+
+    def budgeted(self, meter: Meter) -> "BruteEnumStrategy":
+        return replace(self, max_branch=None)
+
+    def size(self, vars_to_assign: list[Variable]) -> Optional[int]:
+        return _space_size(vars_to_assign, self.domains)
+
+    def space(self, vars_to_assign: list[Variable]) -> Tuple[list[Variable], list[Sequence[Any]]]:
+        """Перебираемые переменные и их домены (в порядке itertools.product)."""
         enumerable = [v for v in vars_to_assign if not isinstance(v.domain, PredicateDomain)]
+        domains = [_values(v, self.domains) for v in enumerable]
+
+        if self.max_branch is not None:
+            total = 1
+            for d in domains:
+                total *= len(d)
+                if total > self.max_branch:
+                    raise ValueError(f"Search space {total} exceeds max_branch={self.max_branch}")
+        return enumerable, domains
+
+    def candidates(self, ctx: Context, vars_to_assign: list[Variable]) -> Iterable[Mapping[Variable, Any]]:
+        enumerable, domains = self.space(vars_to_assign)
         if not enumerable:
             return
 
-        domains = [list(v.domain.enumerate_values()) for v in enumerable]
+        combos = itertools.product(*domains) if self.max_branch is not None else lazy_product(domains)
+        for combo in combos:
+            yield dict(zip(enumerable, combo))
 
-        total = 1
-        for d in domains:
-            total *= len(d)
-            if total > self.max_branch:
-                raise ValueError(f"Search space {total} exceeds max_branch={self.max_branch}")
 
-        for combo in itertools.product(*domains):
-            yield dict(zip(enumerable, combo))
+@dataclass
+class ParallelStrategy(BruteEnumStrategy):
+    """Перебор BruteEnumStrategy, распределённый по процессам (forcing.parallel).
+
+    workers — число процессов (None — os.cpu_count()); chunk_size — строк в
+    одной задаче (None — около 8 задач на процесс). deterministic=True —
+    результат тот же, что у последовательного перебора. Если задачу нельзя
+    сериализовать или workers == 1, перебор идёт в текущем процессе.
+    max_branch=None — размер пространства не проверяется, как у BruteEnumStrategy.
+    """
+
+    max_branch: Optional[int] = 1_000_000
+    workers: Optional[int] = None
+    chunk_size: Optional[int] = None
+    deterministic: bool = True
+
+
+@dataclass
+class JoinStrategy(Strategy):
+    """Кандидаты из соединения фактов вместо полного перебора.
+
+    Вынуждение требует истинности phi и всех условий, поэтому каждый их
+    положительный атом верхнего уровня должен совпасть с фактом сети.
+    Значения переменных таких атомов берутся из logic.query (хеш-соединение
+    по индексам), остальные переменные перебираются как в BruteEnumStrategy
+    (max_branch ограничивает только этот перебор). Без подходящих атомов —
+    обычный перебор.
+    """
+
+    max_branch: Optional[int] = 2000
+    net: SemanticNetwork | None = None
+    goal: Formula | None = None
+    domains: Domains = field(default=None, compare=False)
+
+    def for_goal(self, net: SemanticNetwork, phi: Formula, conditions: Conditions) -> "JoinStrategy":
+        return replace(self, net=net, goal=And((phi,) + tuple(conditions.items)))
+
+    def with_domains(self, domains: Mapping[Variable, Sequence[Any]]) -> "JoinStrategy":
+        return replace(self, domains=domains)
+
+    def budgeted(self, meter: Meter) -> "JoinStrategy":
+        return replace(self, max_branch=None)
+
+    def size(self, vars_to_assign: list[Variable]) -> Optional[int]:
+        return _space_size(vars_to_assign, self.domains)
+
+    def candidates(self, ctx: Context, vars_to_assign: list[Variable]) -> Iterable[Mapping[Variable, Any]]:
+        brute = BruteEnumStrategy(self.max_branch, self.domains)
+        if self.net is None or self.goal is None:
+            yield from brute.candidates(ctx, vars_to_assign)
+            return
+        atoms = [
+            f for f in conjuncts(self.goal)
+            if isinstance(f, FactAtom)
+            and not f.predicate.startswith("lacks_")
+            and all(a is not None for a in f.args)
+            and any(isinstance(a, Variable) and not ctx.is_assigned(a) for a in f.args)
+        ]
+        if not atoms:
+            yield from brute.candidates(ctx, vars_to_assign)
+            return
+        joined = {a for f in atoms for a in f.args if isinstance(a, Variable)}
+        enumerable, domains = brute.space([v for v in vars_to_assign if v not in joined])
+        allowed = self.domains or {}
+        for binding in query(self.net, And(tuple(atoms)), ctx):
+            if any(v in allowed and val not in allowed[v] for v, val in binding.items()):
+                continue
+            for combo in lazy_product(domains):
+                assignment = {v: val for v, val in binding.items() if v in vars_to_assign}
+                assignment.update(zip(enumerable, combo))
+                yield assignment
+
+
+@dataclass
+class BacktrackingStrategy(Strategy):
+    """Поиск с возвратом по частичным присваиваниям.
+
+    Переменные присваиваются по одной; после каждого присваивания
+    конъюнкты phi и условий, зависящие от переменной, вычисляются на
+    частичном контексте, и FALSE отсекает всё поддерево (UNKNOWN — нет:
+    значение ещё может определиться). Кандидатами выдаются только полные
+    присваивания, пережившие проверки.
+
+    mrv=True — следующей берётся переменная с наименьшим числом
+    неопровергнутых значений (при равенстве — участвующая в большем числе
+    конъюнктов с другими свободными переменными); значения проверяются
+    заранее, и переменная без значений сразу вызывает возврат. mrv=False —
+    порядок переменных как в BruteEnumStrategy.
+
+    max_nodes ограничивает число присваиваний за поиск (ValueError, как
+    max_branch у перебора; None — без ограничения, так работает поиск с
+    бюджетом). Число сделанных присваиваний force() сообщает в
+    ForceResult.nodes.
+    Переменные с PredicateDomain не перебираются.
+    """
+
+    max_nodes: Optional[int] = 100_000
+    mrv: bool = True
+    net: SemanticNetwork | None = None
+    goal: Formula | None = None
+    domains: Domains = field(default=None, compare=False)
+    meter: Optional[Meter] = field(default=None, compare=False, repr=False)
+    # Счётчик присваиваний текущего поиска (на копии из for_goal).
+    nodes: int = field(default=0, init=False, compare=False, repr=False)
+
+    def for_goal(self, net: SemanticNetwork, phi: Formula, conditions: Conditions) -> "BacktrackingStrategy":
+        return replace(self, net=net, goal=And((phi,) + tuple(conditions.items)))
+
+    def with_domains(self, domains: Mapping[Variable, Sequence[Any]]) -> "BacktrackingStrategy":
+        return replace(self, domains=domains)
+
+    def budgeted(self, meter: Meter) -> "BacktrackingStrategy":
+        return replace(self, meter=meter, max_nodes=None)
+
+    def size(self, vars_to_assign: list[Variable]) -> Optional[int]:
+        return _space_size(vars_to_assign, self.domains)
+
+    def candidates(self, ctx: Context, vars_to_assign: list[Variable]) -> Iterable[Mapping[Variable, Any]]:
+        enumerable = [v for v in vars_to_assign if not isinstance(v.domain, PredicateDomain)]
+        if not enumerable:
+            return
+        domains = {v: _values(v, self.domains) for v in enumerable}
+        net = self.net
+        checks = []
+        if net is not None and self.goal is not None:
+            checks = [
+                (compiled(f), frozenset(formula_dependencies(f)[1])) for f in conjuncts(self.goal)
+            ]
+        self.nodes = 0
+        yield from self._search(ctx, {}, enumerable, domains, checks)
+
+    def _refuted(self, ctx: Context, name: str, checks: list) -> bool:
+        return any(name in deps and fn(self.net, ctx) is TriBool.FALSE for fn, deps in checks)
+
+    def _search(
+        self,
+        ctx: Context,
+        assignment: dict,
+        rest: list[Variable],
+        domains: dict,
+        checks: list,
+    ) -> Iterator[Mapping[Variable, Any]]:
+        if self.meter is not None:
+            self.meter.check()
+        if not rest:
+            yield dict(assignment)
+            return
+        if self.mrv:
+            names = {v.name for v in rest}
+            best = None
+            for i, v in enumerate(rest):
+                live = [val for val in domains[v] if not self._refuted(ctx.extend({v: val}), v.name, checks)]
+                if not live:
+                    return
+                degree = sum(1 for _fn, deps in checks if v.name in deps and len(deps & names) > 1)
+                key = (len(live), -degree, i)
+                if best is None or key < best[0]:
+                    best = (key, v, live)
+            _key, var, values = best  # type: ignore[misc]
+        else:
+            var, values = rest[0], domains[rest[0]]
+        remaining = [v for v in rest if v is not var]
+        for val in values:
+            self.nodes += 1
+            if self.max_nodes is not None and self.nodes > self.max_nodes:
+                raise ValueError(f"Search exceeded max_nodes={self.max_nodes}")
+            extended = ctx.extend({var: val})
+            if not self.mrv and self._refuted(extended, var.name, checks):
+                continue
+            assignment[var] = val
+            yield from self._search(extended, assignment, remaining, domains, checks)
+            del assignment[var]
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from ctmsn.io.serializer import (
     dump_context,
+    dump_diff,
     dump_network,
     load_context,
+    load_diff,
     load_network,
 )
 from ctmsn.io.formula_io import formula_from_dict, formula_to_dict
@@ -24,6 +26,8 @@ __all__ = [
     "load_network",
     "dump_context",
     "load_context",
+    "dump_diff",
+    "load_diff",
     "formula_to_dict",
     "formula_from_dict",
     "rule_to_dict",
@@ -49,23 +49,47 @@ def term_from_dict(
 
 
 def formula_to_dict(formula: Formula) -> dict[str, Any]:
-    if isinstance(formula, FactAtom):
-        return {
-            "type": "FactAtom",
-            "predicate": formula.predicate,
-            "args": [term_to_dict(a) for a in formula.args],
-        }
-    if isinstance(formula, EqAtom):
-        return {"type": "EqAtom", "left": term_to_dict(formula.left), "right": term_to_dict(formula.right)}
-    if isinstance(formula, Not):
-        return {"type": "Not", "inner": formula_to_dict(formula.inner)}
-    if isinstance(formula, And):
-        return {"type": "And", "items": [formula_to_dict(i) for i in formula.items]}
-    if isinstance(formula, Or):
-        return {"type": "Or", "items": [formula_to_dict(i) for i in formula.items]}
-    if isinstance(formula, Implies):
-        return {"type": "Implies", "left": formula_to_dict(formula.left), "right": formula_to_dict(formula.right)}
-    raise ValueError(f"Unknown formula type: {type(formula)}")
+    """Формула -> dict; обход явным стеком (глубина не ограничена рекурсией)."""
+    root: dict[str, Any] = {}
+    # (формула, контейнер, ключ или индекс, куда положить её dict)
+    stack: list[tuple[Formula, Any, Any]] = [(formula, root, "root")]
+    while stack:
+        f, parent, slot = stack.pop()
+        if isinstance(f, FactAtom):
+            d: dict[str, Any] = {
+                "type": "FactAtom",
+                "predicate": f.predicate,
+                "args": [term_to_dict(a) for a in f.args],
+            }
+        elif isinstance(f, EqAtom):
+            d = {"type": "EqAtom", "left": term_to_dict(f.left), "right": term_to_dict(f.right)}
+        elif isinstance(f, Not):
+            d = {"type": "Not", "inner": None}
+            stack.append((f.inner, d, "inner"))
+        elif isinstance(f, (And, Or)):
+            items: list[Any] = [None] * len(f.items)
+            d = {"type": "And" if isinstance(f, And) else "Or", "items": items}
+            stack.extend((it, items, i) for i, it in enumerate(f.items))
+        elif isinstance(f, Implies):
+            d = {"type": "Implies", "left": None, "right": None}
+            stack.append((f.right, d, "right"))
+            stack.append((f.left, d, "left"))
+        else:
+            raise ValueError(f"Unknown formula type: {type(f)}")
+        parent[slot] = d
+    return root["root"]
+
+
+_CHILD_KEYS = {"Not": ("inner",), "Implies": ("left", "right")}
+
+
+def _children(data: dict[str, Any]) -> list[dict[str, Any]]:
+    ftype = data.get("type")
+    if ftype in ("And", "Or"):
+        return list(data.get("items", []))
+    if ftype in _CHILD_KEYS:
+        return [data[k] for k in _CHILD_KEYS[ftype]]
+    return []
 
 
 def formula_from_dict(
@@ -73,24 +97,38 @@ def formula_from_dict(
     net: SemanticNetwork | None,
     var_map: dict[str, Variable] | None = None,
 ) -> Formula:
-    ftype = data.get("type")
-    if ftype == "FactAtom":
-        args = tuple(term_from_dict(a, net, var_map) for a in data.get("args", []))
-        return FactAtom(predicate=data["predicate"], args=args)
-    if ftype == "EqAtom":
-        return EqAtom(
-            left=term_from_dict(data["left"], net, var_map),
-            right=term_from_dict(data["right"], net, var_map),
-        )
-    if ftype == "Not":
-        return Not(inner=formula_from_dict(data["inner"], net, var_map))
-    if ftype == "And":
-        return And(items=tuple(formula_from_dict(i, net, var_map) for i in data.get("items", [])))
-    if ftype == "Or":
-        return Or(items=tuple(formula_from_dict(i, net, var_map) for i in data.get("items", [])))
-    if ftype == "Implies":
-        return Implies(
-            left=formula_from_dict(data["left"], net, var_map),
-            right=formula_from_dict(data["right"], net, var_map),
-        )
-    raise ValueError(f"Unknown formula type: {ftype!r}")
+    """dict -> формула; обход явным стеком в обратном порядке (сначала дети)."""
+    out: list[Formula] = []
+    # (данные узла, дети уже построены)
+    stack: list[tuple[dict[str, Any], bool]] = [(data, False)]
+    while stack:
+        node, built = stack.pop()
+        ftype = node.get("type")
+        if not built:
+            children = _children(node)
+            if children:
+                stack.append((node, True))
+                stack.extend((c, False) for c in reversed(children))
+                continue
+        if ftype == "FactAtom":
+            args = tuple(term_from_dict(a, net, var_map) for a in node.get("args", []))
+            out.append(FactAtom(predicate=node["predicate"], args=args))
+        elif ftype == "EqAtom":
+            out.append(EqAtom(
+                left=term_from_dict(node["left"], net, var_map),
+                right=term_from_dict(node["right"], net, var_map),
+            ))
+        elif ftype == "Not":
+            out.append(Not(inner=out.pop()))
+        elif ftype in ("And", "Or"):
+            n = len(node.get("items", []))
+            items = tuple(out[len(out) - n:]) if n else ()
+            del out[len(out) - n:]
+            out.append(And(items=items) if ftype == "And" else Or(items=items))
+        elif ftype == "Implies":
+            right = out.pop()
+            left = out.pop()
+            out.append(Implies(left=left, right=right))
+        else:
+            raise ValueError(f"Unknown formula type: {ftype!r}")
+    return out[0]
@@ -2,16 +2,47 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from ctmsn.core.concept import Concept
+from ctmsn.core.diff import NetworkDiff
 from ctmsn.core.network import SemanticNetwork
 from ctmsn.core.predicate import Predicate
+from ctmsn.core.statement import Statement
 from ctmsn.param.context import Context
 
 
+def _dump_concept(c: Concept) -> Dict[str, Any]:
+    return {"id": c.id, "label": c.label, "tags": list(c.tags), "meta": dict(c.meta)}
+
+
+def _load_concept(cdata: Dict[str, Any]) -> Concept:
+    return Concept(
+        id=cdata["id"],
+        label=cdata.get("label"),
+        tags=frozenset(cdata.get("tags", [])),
+        meta=dict(cdata.get("meta", {})),
+    )
+
+
+def _dump_predicate(p: Predicate) -> Dict[str, Any]:
+    return {"name": p.name, "arity": p.arity, "roles": list(p.roles)}
+
+
+def _load_predicate(pdata: Dict[str, Any]) -> Predicate:
+    return Predicate(
+        name=pdata["name"],
+        arity=pdata["arity"],
+        roles=tuple(pdata.get("roles", [])),
+    )
+
+
+def _dump_fact(f: Statement) -> Dict[str, Any]:
+    return {"predicate": f.predicate, "args": [getattr(a, "id", a) for a in f.args]}
+
+
 def dump_network(net: SemanticNetwork) -> Dict[str, Any]:
     return {
-        "concepts": {cid: {"id": c.id, "label": c.label, "tags": list(c.tags), "meta": dict(c.meta)} for cid, c in net.concepts.items()},
-        "predicates": {name: {"name": p.name, "arity": p.arity, "roles": list(p.roles)} for name, p in net.predicates.items()},
-        "facts": [{"predicate": f.predicate, "args": [getattr(a, "id", a) for a in f.args]} for f in net.facts()],
+        "concepts": {cid: _dump_concept(c) for cid, c in net.concepts.items()},
+        "predicates": {name: _dump_predicate(p) for name, p in net.predicates.items()},
+        "facts": [_dump_fact(f) for f in net.view()],
     }
 
 
@@ -23,28 +54,63 @@ def load_network(data: Dict[str, Any], strict: bool = True) -> SemanticNetwork:
     """
     net = SemanticNetwork()
     for cdata in data.get("concepts", {}).values():
-        net.add_concept(Concept(
-            id=cdata["id"],
-            label=cdata.get("label"),
-            tags=frozenset(cdata.get("tags", [])),
-            meta=dict(cdata.get("meta", {})),
-        ))
+        net.add_concept(_load_concept(cdata))
     for pdata in data.get("predicates", {}).values():
-        net.add_predicate(Predicate(
-            name=pdata["name"],
-            arity=pdata["arity"],
-            roles=tuple(pdata.get("roles", [])),
-        ))
-    for fdata in data.get("facts", []):
-        args = tuple(net.concepts[a] if a in net.concepts else a for a in fdata["args"])
-        try:
-            net.assert_fact(fdata["predicate"], args)
-        except ValueError:
-            if strict:
-                raise
+        net.add_predicate(_load_predicate(pdata))
+    concepts = net.concepts
+    net.assert_facts(
+        ((f["predicate"], tuple(concepts[a] if a in concepts else a for a in f["args"])) for f in data.get("facts", [])),
+        errors=None if strict else [],
+    )
     return net
 
 
+def dump_diff(d: NetworkDiff) -> Dict[str, Any]:
+    """Сериализовать NetworkDiff (для хранения и передачи дельт вместо сетей)."""
+
+    def pair(change, dump) -> Dict[str, Any]:
+        old, new = change
+        return {"old": None if old is None else dump(old), "new": None if new is None else dump(new)}
+
+    return {
+        "concepts": {cid: pair(ch, _dump_concept) for cid, ch in d.concepts.items()},
+        "predicates": {name: pair(ch, _dump_predicate) for name, ch in d.predicates.items()},
+        "added_facts": [_dump_fact(f) for f in d.added_facts],
+        "removed_facts": [_dump_fact(f) for f in d.removed_facts],
+    }
+
+
+def load_diff(data: Dict[str, Any], net: SemanticNetwork | None = None) -> NetworkDiff:
+    """Восстановить NetworkDiff из dump_diff.
+
+    Аргументы фактов разрешаются в концепты по значениям из самой дельты
+    (новым, затем старым) и по концептам сети net.
+    """
+
+    def pair(change: Dict[str, Any], load):
+        old, new = change.get("old"), change.get("new")
+        return (None if old is None else load(old), None if new is None else load(new))
+
+    concepts = {cid: pair(ch, _load_concept) for cid, ch in data.get("concepts", {}).items()}
+    predicates = {name: pair(ch, _load_predicate) for name, ch in data.get("predicates", {}).items()}
+    known: Dict[str, Concept] = dict(net.concepts) if net is not None else {}
+    for cid, (old, new) in concepts.items():
+        known[cid] = new if new is not None else old  # type: ignore[assignment]
+
+    def facts(key: str) -> frozenset:
+        return frozenset(
+            Statement(f["predicate"], tuple(known[a] if a in known else a for a in f["args"]))
+            for f in data.get(key, [])
+        )
+
+    return NetworkDiff(
+        concepts=concepts,
+        predicates=predicates,
+        added_facts=facts("added_facts"),
+        removed_facts=facts("removed_facts"),
+    )
+
+
 def dump_context(ctx: Context) -> Dict[str, Any]:
     values: Dict[str, Any] = {}
     for name, val in ctx.as_dict().items():
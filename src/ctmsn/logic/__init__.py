@@ -1,6 +1,13 @@
-__all__ = ["TriBool", "Term", "VarRef", "Formula", "FactAtom", "EqAtom", "Not", "And", "Or", "Implies", "evaluate"]
+__all__ = ["TriBool", "Term", "VarRef", "Formula", "FactAtom", "EqAtom", "Not", "And", "Or", "Implies", "evaluate", "compile_formula", "compiled", "specialize", "query", "Profiler"]
 
 from ctmsn.logic.tribool import TriBool
 from ctmsn.logic.terms import Term, VarRef
 from ctmsn.logic.formula import Formula, FactAtom, EqAtom, Not, And, Or, Implies
 from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.compiler import compile_formula, compiled
+from ctmsn.logic.partial import specialize
+from ctmsn.logic.query import query
+from ctmsn.logic.profile import Profiler
+
+# ctmsn.logic.compile(formula, net_schema); не в __all__, чтобы * не затенял builtin.
+compile = compile_formula
@@ -0,0 +1,220 @@
+"""Пакетное вычисление одной формулы на множестве контекстов.
+
+evaluate_many(formula, net, contexts) возвращает список TriBool — по одному
+на контекст — с той же семантикой, что и evaluate. Формула вычисляется по
+столбцам: значения переменных кодируются целыми числами (-1 — не задана),
+каждый атом (FactAtom/EqAtom) вычисляется один раз на различный кортеж
+значений своих переменных, а связки Клини работают над столбцами кодов
+FALSE=0 < UNKNOWN=1 < TRUE=2: And — минимум, Or — максимум, Not — 2 - x,
+Implies — max(2 - l, r).
+
+Если установлен NumPy (extras ``experiment``), столбцы — массивы и связки
+векторизованы; иначе используется чистый Python с тем же результатом.
+evaluate_product() вычисляет формулу сразу на декартовом произведении
+доменов без построения контекстов — этим пользуется
+ForcingEngine.force(..., batch=True).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.cache import formula_dependencies
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Formula, Implies, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+
+try:  # NumPy — необязательная зависимость (extras "experiment").
+    import numpy as _np
+except ImportError:  # pragma: no cover - зависит от окружения
+    _np = None
+
+__all__ = ["evaluate_many", "evaluate_product", "first_true", "HAS_NUMPY"]
+
+HAS_NUMPY = _np is not None
+
+# Ниже этого числа строк накладные расходы NumPy не окупаются.
+NUMPY_MIN_ROWS = 256
+
+_DECODE = (TriBool.FALSE, TriBool.UNKNOWN, TriBool.TRUE)
+_CODE = {TriBool.FALSE: 0, TriBool.UNKNOWN: 1, TriBool.TRUE: 2}
+
+# Столбец переменной: (различные значения, код строки -> индекс значения или -1).
+Column = Tuple[List[Any], Sequence[int]]
+
+
+def _use_numpy(use_numpy: Optional[bool], n: int) -> bool:
+    if use_numpy is None:
+        return HAS_NUMPY and n >= NUMPY_MIN_ROWS
+    if use_numpy and not HAS_NUMPY:
+        raise ImportError("NumPy path requires extras: pip install -e '.[experiment]'")
+    return use_numpy
+
+
+class _ColumnEvaluator:
+    def __init__(
+        self,
+        net: SemanticNetwork,
+        base: Mapping[str, Any],
+        columns: Mapping[str, Column],
+        n: int,
+        vectorized: bool,
+    ) -> None:
+        self.net = net
+        self.base = base
+        self.columns = columns
+        self.n = n
+        self.np = _np if vectorized else None
+
+    def leaf(self, f: Formula):
+        fn = compiled(f)
+        names = [name for name in formula_dependencies(f)[1] if name in self.columns]
+        if not names:
+            code = _CODE[fn(self.net, Context(_values=dict(self.base)))]
+            if self.np is not None:
+                return self.np.full(self.n, code, dtype=self.np.int8)
+            return [code] * self.n
+
+        cols = [self.columns[name] for name in names]
+
+        def compute(key: Tuple[int, ...]) -> int:
+            values = dict(self.base)
+            for name, (vals, _codes), k in zip(names, cols, key):
+                if k >= 0:
+                    values[name] = vals[k]
+                else:
+                    values.pop(name, None)
+            return _CODE[fn(self.net, Context(_values=values))]
+
+        np = self.np
+        if np is not None:
+            stacked = np.stack([np.asarray(c[1]) for c in cols], axis=1)
+            uniq, inverse = np.unique(stacked, axis=0, return_inverse=True)
+            table = np.fromiter((compute(tuple(int(x) for x in row)) for row in uniq), dtype=np.int8, count=len(uniq))
+            return table[inverse.reshape(-1)]
+
+        memo: Dict[Tuple[int, ...], int] = {}
+        out: List[int] = []
+        for key in zip(*(c[1] for c in cols)):
+            v = memo.get(key)
+            if v is None:
+                v = memo[key] = compute(key)
+            out.append(v)
+        return out
+
+    def eval(self, f: Formula):
+        np = self.np
+        if isinstance(f, (FactAtom, EqAtom)):
+            return self.leaf(f)
+        if isinstance(f, Not):
+            inner = self.eval(f.inner)
+            return 2 - inner if np is not None else [2 - x for x in inner]
+        if isinstance(f, (And, Or)):
+            if not f.items:
+                code = 2 if isinstance(f, And) else 0
+                return np.full(self.n, code, dtype=np.int8) if np is not None else [code] * self.n
+            cols = [self.eval(it) for it in f.items]
+            if np is not None:
+                op = np.minimum if isinstance(f, And) else np.maximum
+                return op.reduce(cols)
+            agg = min if isinstance(f, And) else max
+            return cols[0] if len(cols) == 1 else list(map(agg, *cols))
+        if isinstance(f, Implies):
+            l = self.eval(f.left)
+            r = self.eval(f.right)
+            if np is not None:
+                return np.maximum(2 - l, r)
+            return [max(2 - a, b) for a, b in zip(l, r)]
+        raise TypeError(f"Unsupported formula type: {type(f)}")
+
+
+def evaluate_codes(
+    formula: Formula,
+    net: SemanticNetwork,
+    base: Mapping[str, Any],
+    columns: Mapping[str, Column],
+    n: int,
+    *,
+    use_numpy: Optional[bool] = None,
+):
+    """Коды результатов (0/1/2) по строкам: массив NumPy или список."""
+    return _ColumnEvaluator(net, base, columns, n, _use_numpy(use_numpy, n)).eval(formula)
+
+
+def evaluate_many(
+    formula: Formula,
+    net: SemanticNetwork,
+    contexts: Sequence[Context],
+    *,
+    use_numpy: Optional[bool] = None,
+) -> List[TriBool]:
+    """Вычислить формулу в каждом контексте; атомы — раз на кортеж значений.
+
+    use_numpy: None — NumPy, если установлен и контекстов много; True —
+    обязательно (ImportError без extras); False — чистый Python.
+    """
+    contexts = list(contexts)
+    n = len(contexts)
+    columns: Dict[str, Column] = {}
+    try:
+        for name in formula_dependencies(formula)[1]:
+            index: Dict[Any, int] = {}
+            codes: List[int] = []
+            for ctx in contexts:
+                values = ctx._values
+                if name in values:
+                    codes.append(index.setdefault(values[name], len(index)))
+                else:
+                    codes.append(-1)
+            columns[name] = (list(index), codes)
+    except TypeError:
+        # Нехешируемые значения переменных — построчное вычисление.
+        fn = compiled(formula)
+        return [fn(net, ctx) for ctx in contexts]
+    codes = evaluate_codes(formula, net, {}, columns, n, use_numpy=use_numpy)
+    return [_DECODE[int(c)] for c in codes]
+
+
+def evaluate_product(
+    formula: Formula,
+    net: SemanticNetwork,
+    base: Context,
+    domains: Sequence[Tuple[str, Sequence[Any]]],
+    *,
+    use_numpy: Optional[bool] = None,
+):
+    """Коды формулы на декартовом произведении доменов (порядок itertools.product).
+
+    base — контекст с фиксированными значениями; domains — (имя переменной,
+    значения). Строка r соответствует r-му кортежу itertools.product.
+    """
+    n = 1
+    for _name, values in domains:
+        n *= len(values)
+    vectorized = _use_numpy(use_numpy, n)
+    if n == 0:
+        return _np.zeros(0, dtype=_np.int8) if vectorized else []
+    columns: Dict[str, Column] = {}
+    stride = n
+    for name, values in domains:
+        size = len(values)
+        stride //= size
+        if vectorized:
+            codes: Sequence[int] = (_np.arange(n) // stride) % size
+        else:
+            codes = [(r // stride) % size for r in range(n)]
+        columns[name] = (list(values), codes)
+    return _ColumnEvaluator(net, base._values, columns, n, vectorized).eval(formula)
+
+
+def first_true(codes) -> Optional[int]:
+    """Номер первой строки с TRUE в столбце кодов или None."""
+    if _np is not None and isinstance(codes, _np.ndarray):
+        hits = _np.flatnonzero(codes == 2)
+        return int(hits[0]) if hits.size else None
+    try:
+        return codes.index(2)
+    except ValueError:
+        return None
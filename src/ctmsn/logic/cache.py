@@ -0,0 +1,200 @@
+"""Мемоизация вычисления формул.
+
+EvalCache хранит результат каждой подформулы под ключом
+(формула, версии читаемых ею предикатов, значения только упомянутых в ней
+переменных). Версии предикатов — SemanticNetwork.version(): изменение фактов
+предиката инвалидирует лишь формулы, которые его читают, а смена значения
+переменной — лишь подформулы с этой переменной. Размер ограничен (LRU),
+статистика попаданий — stats().
+
+Кеш подключается явно: ForcingEngine(net, cache=...),
+TransitionEngine(..., cache=...) или напрямую cache.evaluate(formula, net, ctx).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.evaluator import _positive_form, evaluate
+from ctmsn.logic.formula import MAX_NESTING, And, EqAtom, FactAtom, Formula, Implies, Not, Or, fold
+from ctmsn.logic.memo import IdentityMemo
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.variable import Variable
+
+__all__ = ["CacheStats", "EvalCache", "formula_dependencies"]
+
+_UNSET: Any = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_Info = Tuple[Tuple[str, ...], Tuple[str, ...], int]
+_INFO: "IdentityMemo[_Info]" = IdentityMemo()
+
+
+def _node_info(f: Formula, kids: List[_Info]) -> _Info:
+    info = _INFO.get(f)
+    if info is not None:
+        return info
+    preds: Dict[str, None] = {}
+    names: Dict[str, None] = {}
+    if isinstance(f, FactAtom):
+        preds[_positive_form(f.predicate)[0]] = None
+        for a in f.args:
+            if isinstance(a, Variable):
+                names[a.name] = None
+    elif isinstance(f, EqAtom):
+        for t in (f.left, f.right):
+            if isinstance(t, Variable):
+                names[t.name] = None
+    elif not isinstance(f, (Not, And, Or, Implies)):
+        raise TypeError(f"Unsupported formula type: {type(f)}")
+    for p, n, _depth in kids:
+        preds.update(dict.fromkeys(p))
+        names.update(dict.fromkeys(n))
+    info = _INFO[f] = (tuple(preds), tuple(names), 1 + max((k[2] for k in kids), default=0))
+    return info
+
+
+def _info(formula: Formula) -> _Info:
+    """(читаемые предикаты, имена переменных, глубина); запоминается для каждого узла."""
+    info = _INFO.get(formula)
+    if info is None:
+        info = fold(formula, _node_info)
+    return info
+
+
+def formula_dependencies(formula: Formula) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(читаемые предикаты, имена переменных) формулы.
+
+    Предикаты — в положительной форме (lacks_X -> has_X), порядок — первого
+    упоминания. Результат запоминается для каждого узла формулы.
+    """
+    preds, names, _depth = _info(formula)
+    return preds, names
+
+
+class EvalCache:
+    """LRU-кеш результатов подформул; семантика — как у evaluate."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        # id(формулы) входит в ключ; сама формула хранится в значении, чтобы
+        # id не был переиспользован, и сверяется при попадании.
+        self._data: "OrderedDict[Hashable, Tuple[Formula, TriBool]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, formula: Formula, net: SemanticNetwork, ctx: Context) -> Optional[Hashable]:
+        preds, names = formula_dependencies(formula)
+        values = ctx._values
+        key = (
+            id(formula),
+            tuple(net.version(p) for p in preds),
+            tuple(values.get(n, _UNSET) for n in names),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None  # нехешируемое значение переменной — без кеша
+        return key
+
+    def evaluate(self, formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
+        key = self._key(formula, net, ctx)
+        if key is not None:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] is formula:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return entry[1]
+        self.misses += 1
+        if _info(formula)[2] > MAX_NESTING:
+            # Глубокая формула — итеративно, подформулы без кеша.
+            value = evaluate(formula, net, ctx)
+        else:
+            value = self._compute(formula, net, ctx)
+        if key is not None:
+            self._data[key] = (formula, value)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def _compute(self, formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
+        if isinstance(formula, (FactAtom, EqAtom)):
+            return compiled(formula)(net, ctx)
+
+        if isinstance(formula, Not):
+            v = self.evaluate(formula.inner, net, ctx)
+            if v is TriBool.UNKNOWN:
+                return TriBool.UNKNOWN
+            return TriBool.FALSE if v is TriBool.TRUE else TriBool.TRUE
+
+        if isinstance(formula, And):
+            any_unknown = False
+            for it in formula.items:
+                v = self.evaluate(it, net, ctx)
+                if v is TriBool.FALSE:
+                    return TriBool.FALSE
+                if v is TriBool.UNKNOWN:
+                    any_unknown = True
+            return TriBool.UNKNOWN if any_unknown else TriBool.TRUE
+
+        if isinstance(formula, Or):
+            any_unknown = False
+            for it in formula.items:
+                v = self.evaluate(it, net, ctx)
+                if v is TriBool.TRUE:
+                    return TriBool.TRUE
+                if v is TriBool.UNKNOWN:
+                    any_unknown = True
+            return TriBool.UNKNOWN if any_unknown else TriBool.FALSE
+
+        if isinstance(formula, Implies):
+            l = self.evaluate(formula.left, net, ctx)
+            r = self.evaluate(formula.right, net, ctx)
+            if l is TriBool.FALSE:
+                return TriBool.TRUE
+            if l is TriBool.TRUE:
+                return r
+            if r is TriBool.TRUE:
+                return TriBool.TRUE
+            return TriBool.UNKNOWN
+
+        raise TypeError(f"Unsupported formula type: {type(formula)}")
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._data),
+            maxsize=self.maxsize,
+        )
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
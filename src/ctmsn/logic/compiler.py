@@ -0,0 +1,255 @@
+"""Компиляция формул в замыкания Python.
+
+compile_formula(formula, net_schema) обходит дерево один раз и возвращает
+функцию (net, ctx) -> TriBool с той же семантикой, что и evaluate: разбор
+термов (переменная или константа), замена lacks_X на отрицание has_X и выбор
+ветки по типу узла происходят при компиляции, а не при каждом вызове.
+Атом с константными аргументами сводится к одной проверке net.contains по
+заранее построенному Statement.
+
+net_schema — сеть или словарь предикатов (name -> Predicate), для которых
+компилируется формула. Атомы с необъявленным в схеме предикатом или с
+несовпадающей арностью сворачиваются в константу (фактов у них быть не
+может); такая функция верна, пока набор предикатов схемы не меняется. Без
+схемы результат годится для любой сети; compiled(formula) кеширует его в
+слабой таблице по идентичности узла (logic.memo).
+
+Замыкания вложены так же, как узлы формулы, и вызывают друг друга
+рекурсивно; формула глубже MAX_NESTING компилируется в вызов итеративного
+evaluate (атомы при этом интерпретируются, схема не учитывается).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, List, Mapping, Tuple, Union
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.statement import CoreTerm, Statement
+from ctmsn.logic.evaluator import _positive_form, evaluate
+from ctmsn.logic.formula import MAX_NESTING, And, EqAtom, FactAtom, Formula, Implies, Not, Or, formula_depth
+from ctmsn.logic.memo import IdentityMemo
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.variable import Variable
+
+__all__ = ["CompiledFormula", "compile_formula", "compiled"]
+
+CompiledFormula = Callable[[SemanticNetwork, Context], TriBool]
+NetSchema = Union[SemanticNetwork, Mapping[str, Predicate], None]
+
+_T, _F, _U = TriBool.TRUE, TriBool.FALSE, TriBool.UNKNOWN
+
+
+def _const(value: TriBool) -> CompiledFormula:
+    def run(net: SemanticNetwork, ctx: Context) -> TriBool:
+        return value
+
+    return run
+
+
+def _compile_fact(f: FactAtom, schema: Mapping[str, Predicate] | None) -> CompiledFormula:
+    predicate, negate = _positive_form(f.predicate)
+    hit, miss = (_F, _T) if negate else (_T, _F)
+    var_slots = tuple((i, a.name) for i, a in enumerate(f.args) if isinstance(a, Variable))
+
+    if schema is not None:
+        pred = schema.get(predicate)
+        if pred is None or pred.arity != len(f.args):
+            if not var_slots:
+                return _const(miss)
+            names = tuple(name for _i, name in var_slots)
+
+            def run_absent(net: SemanticNetwork, ctx: Context) -> TriBool:
+                values = ctx._values
+                for name in names:
+                    if name not in values:
+                        return _U
+                return miss
+
+            return run_absent
+
+    if not f.args or any(a is None for a in f.args):
+        # None в evaluate — подстановочный знак шаблона: такие атомы идут
+        # через net.match, как в интерпретаторе.
+        return _compile_fact_match(predicate, f.args, var_slots, hit, miss)
+
+    if not var_slots:
+        ground: Tuple[CoreTerm, ...] = tuple(a for a in f.args if not isinstance(a, Variable))
+        st = Statement(predicate, ground)
+
+        def run_ground(net: SemanticNetwork, ctx: Context) -> TriBool:
+            return hit if net.store.contains(st) else miss
+
+        return run_ground
+
+    # На месте переменных при вызове оказываются их значения.
+    template: List[Any] = list(f.args)
+
+    def run(net: SemanticNetwork, ctx: Context) -> TriBool:
+        values = ctx._values
+        args = template[:]
+        for i, name in var_slots:
+            if name not in values:
+                return _U
+            v = args[i] = values[name]
+            if v is None:
+                return hit if next(net.match(predicate, args), None) is not None else miss
+        return hit if net.store.contains(Statement(predicate, tuple(args))) else miss
+
+    return run
+
+
+def _compile_fact_match(
+    predicate: str,
+    args: Tuple[Any, ...],
+    var_slots: Tuple[Tuple[int, str], ...],
+    hit: TriBool,
+    miss: TriBool,
+) -> CompiledFormula:
+    template = list(args)
+
+    def run_match(net: SemanticNetwork, ctx: Context) -> TriBool:
+        values = ctx._values
+        pattern = template[:]
+        for i, name in var_slots:
+            if name not in values:
+                return _U
+            pattern[i] = values[name]
+        return hit if next(net.match(predicate, pattern), None) is not None else miss
+
+    return run_match
+
+
+def _compile_term(term: Any) -> Tuple[bool, Any]:
+    """(переменная ли, имя переменной или константа)."""
+    if isinstance(term, Variable):
+        return True, term.name
+    return False, term
+
+
+def _compile_eq(f: EqAtom) -> CompiledFormula:
+    l_var, l = _compile_term(f.left)
+    r_var, r = _compile_term(f.right)
+    if not l_var and not r_var:
+        return _const(_T if l == r else _F)
+
+    def run(net: SemanticNetwork, ctx: Context) -> TriBool:
+        values = ctx._values
+        if l_var:
+            if l not in values:
+                return _U
+            lv = values[l]
+        else:
+            lv = l
+        if r_var:
+            if r not in values:
+                return _U
+            rv = values[r]
+        else:
+            rv = r
+        return _T if lv == rv else _F
+
+    return run
+
+
+def _compile(f: Formula, schema: Mapping[str, Predicate] | None) -> CompiledFormula:
+    if isinstance(f, FactAtom):
+        return _compile_fact(f, schema)
+
+    if isinstance(f, EqAtom):
+        return _compile_eq(f)
+
+    if isinstance(f, Not):
+        inner = _compile(f.inner, schema)
+
+        def run_not(net: SemanticNetwork, ctx: Context) -> TriBool:
+            v = inner(net, ctx)
+            if v is _U:
+                return _U
+            return _F if v is _T else _T
+
+        return run_not
+
+    if isinstance(f, And):
+        items = tuple(_compile(it, schema) for it in f.items)
+
+        def run_and(net: SemanticNetwork, ctx: Context) -> TriBool:
+            any_unknown = False
+            for it in items:
+                v = it(net, ctx)
+                if v is _F:
+                    return _F
+                if v is _U:
+                    any_unknown = True
+            return _U if any_unknown else _T
+
+        return run_and
+
+    if isinstance(f, Or):
+        items = tuple(_compile(it, schema) for it in f.items)
+
+        def run_or(net: SemanticNetwork, ctx: Context) -> TriBool:
+            any_unknown = False
+            for it in items:
+                v = it(net, ctx)
+                if v is _T:
+                    return _T
+                if v is _U:
+                    any_unknown = True
+            return _U if any_unknown else _F
+
+        return run_or
+
+    if isinstance(f, Implies):
+        left = _compile(f.left, schema)
+        right = _compile(f.right, schema)
+
+        def run_implies(net: SemanticNetwork, ctx: Context) -> TriBool:
+            l = left(net, ctx)
+            r = right(net, ctx)
+            if l is _F:
+                return _T
+            if l is _T:
+                return r
+            if r is _T:
+                return _T
+            return _U
+
+        return run_implies
+
+    raise TypeError(f"Unsupported formula type: {type(f)}")
+
+
+def _interpreted(formula: Formula) -> CompiledFormula:
+    def run_deep(net: SemanticNetwork, ctx: Context) -> TriBool:
+        return evaluate(formula, net, ctx)
+
+    return run_deep
+
+
+def compile_formula(formula: Formula, net_schema: NetSchema = None) -> CompiledFormula:
+    """Скомпилировать формулу в функцию (net, ctx) -> TriBool."""
+    if formula_depth(formula) > MAX_NESTING:
+        return _interpreted(formula)
+    if isinstance(net_schema, SemanticNetwork):
+        schema: Mapping[str, Predicate] | None = dict(net_schema.predicates)
+    elif net_schema is not None:
+        schema = dict(net_schema)
+    else:
+        schema = None
+    return _compile(formula, schema)
+
+
+_COMPILED: "IdentityMemo[CompiledFormula]" = IdentityMemo()
+
+
+def compiled(formula: Formula) -> CompiledFormula:
+    """Скомпилированная без схемы функция, закешированная для узла formula."""
+    fn = _COMPILED.get(formula)
+    if fn is None:
+        if formula_depth(formula) > MAX_NESTING:
+            # Не кешируется: замыкание держит формулу и не дало бы её собрать.
+            return _interpreted(formula)
+        fn = _COMPILED[formula] = _compile(formula, None)
+    return fn
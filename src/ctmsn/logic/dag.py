@@ -0,0 +1,187 @@
+"""Хеш-консинг формул и вычисление формул как DAG.
+
+FormulaFactory возвращает для структурно равных узлов один и тот же объект:
+атомы и связки строятся через фабрику (или intern() переводит готовое дерево)
+и общие подформулы разных целей, гвардов и инвариантов становятся общими
+узлами. Таблица фабрики слабая — узлы, на которые никто не ссылается,
+освобождаются. Модульная фабрика по умолчанию — formulas.
+
+DagEvaluator вычисляет набор корней за один проход: узел, достижимый более
+чем одним путём, считается один раз за вызов (для данной сети и контекста).
+Корни глубже MAX_NESTING вычисляются итеративным evaluate, без общего счёта.
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import Dict, FrozenSet, Hashable, List, Sequence, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import MAX_NESTING, And, EqAtom, FactAtom, Formula, Implies, Not, Or, children, formula_depth
+from ctmsn.logic.terms import Term
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+
+__all__ = ["FormulaFactory", "formulas", "intern_formula", "DagEvaluator", "evaluate_dag"]
+
+
+class FormulaFactory:
+    """Фабрика хеш-консинга узлов Formula.
+
+    Ключ узла — его тип и поля, где дочерние формулы представлены своими
+    (уже канонизированными) объектами по id; поэтому поиск стоит O(арности),
+    а не O(размера поддерева).
+    """
+
+    def __init__(self) -> None:
+        self._table: "weakref.WeakValueDictionary[Hashable, Formula]" = weakref.WeakValueDictionary()
+
+    def _get(self, key: Hashable, build) -> Formula:
+        node = self._table.get(key)
+        if node is None:
+            node = build()
+            self._table[key] = node
+        return node
+
+    def fact(self, predicate: str, *args: Term) -> FactAtom:
+        return self._get(("fact", predicate, args), lambda: FactAtom(predicate, args))  # type: ignore[return-value]
+
+    def eq(self, left: Term, right: Term) -> EqAtom:
+        return self._get(("eq", left, right), lambda: EqAtom(left, right))  # type: ignore[return-value]
+
+    def not_(self, inner: Formula) -> Not:
+        inner = self.intern(inner)
+        return self._get(("not", id(inner)), lambda: Not(inner))  # type: ignore[return-value]
+
+    def and_(self, *items: Formula) -> And:
+        items = tuple(self.intern(it) for it in items)
+        return self._get(("and", tuple(map(id, items))), lambda: And(items))  # type: ignore[return-value]
+
+    def or_(self, *items: Formula) -> Or:
+        items = tuple(self.intern(it) for it in items)
+        return self._get(("or", tuple(map(id, items))), lambda: Or(items))  # type: ignore[return-value]
+
+    def implies(self, left: Formula, right: Formula) -> Implies:
+        left, right = self.intern(left), self.intern(right)
+        return self._get(("implies", id(left), id(right)), lambda: Implies(left, right))  # type: ignore[return-value]
+
+    def intern(self, formula: Formula) -> Formula:
+        """Канонический узел, структурно равный formula (поддерево тоже канонизируется)."""
+        if isinstance(formula, FactAtom):
+            return self.fact(formula.predicate, *formula.args)
+        if isinstance(formula, EqAtom):
+            return self.eq(formula.left, formula.right)
+        if isinstance(formula, Not):
+            return self.not_(formula.inner)
+        if isinstance(formula, And):
+            return self.and_(*formula.items)
+        if isinstance(formula, Or):
+            return self.or_(*formula.items)
+        if isinstance(formula, Implies):
+            return self.implies(formula.left, formula.right)
+        raise TypeError(f"Unsupported formula type: {type(formula)}")
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+formulas = FormulaFactory()
+
+
+def intern_formula(formula: Formula) -> Formula:
+    """intern() через модульную фабрику formulas."""
+    return formulas.intern(formula)
+
+
+def _shared_nodes(roots: Sequence[Formula]) -> FrozenSet[int]:
+    """id узлов, в которые ведёт больше одного ребра (или корня)."""
+    seen: Dict[int, int] = {}
+    stack: List[Formula] = list(roots)
+    while stack:
+        f = stack.pop()
+        k = id(f)
+        n = seen.get(k, 0)
+        seen[k] = n + 1
+        if n == 0:
+            stack.extend(children(f))
+    return frozenset(k for k, n in seen.items() if n > 1)
+
+
+class DagEvaluator:
+    """Вычислитель набора корней с однократным счётом общих узлов.
+
+    Структура DAG (какие узлы общие) определяется один раз в конструкторе;
+    evaluate() заводит память только под общие узлы и только на время вызова.
+    """
+
+    def __init__(self, roots: Sequence[Formula]) -> None:
+        self.roots: Tuple[Formula, ...] = tuple(roots)
+        self.shared: FrozenSet[int] = _shared_nodes(self.roots)
+        self.deep: FrozenSet[int] = frozenset(id(r) for r in self.roots if formula_depth(r) > MAX_NESTING)
+
+    def evaluate(self, net: SemanticNetwork, ctx: Context) -> Tuple[TriBool, ...]:
+        memo: Dict[int, TriBool] = {}
+        deep = self.deep
+        return tuple(
+            evaluate(r, net, ctx) if deep and id(r) in deep else self._eval(r, net, ctx, memo)
+            for r in self.roots
+        )
+
+    def _eval(self, f: Formula, net: SemanticNetwork, ctx: Context, memo: Dict[int, TriBool]) -> TriBool:
+        k = id(f)
+        if k in self.shared:
+            v = memo.get(k)
+            if v is None:
+                v = memo[k] = self._compute(f, net, ctx, memo)
+            return v
+        return self._compute(f, net, ctx, memo)
+
+    def _compute(self, f: Formula, net: SemanticNetwork, ctx: Context, memo: Dict[int, TriBool]) -> TriBool:
+        if isinstance(f, (FactAtom, EqAtom)):
+            return compiled(f)(net, ctx)
+
+        if isinstance(f, Not):
+            v = self._eval(f.inner, net, ctx, memo)
+            if v is TriBool.UNKNOWN:
+                return TriBool.UNKNOWN
+            return TriBool.FALSE if v is TriBool.TRUE else TriBool.TRUE
+
+        if isinstance(f, And):
+            any_unknown = False
+            for it in f.items:
+                v = self._eval(it, net, ctx, memo)
+                if v is TriBool.FALSE:
+                    return TriBool.FALSE
+                if v is TriBool.UNKNOWN:
+                    any_unknown = True
+            return TriBool.UNKNOWN if any_unknown else TriBool.TRUE
+
+        if isinstance(f, Or):
+            any_unknown = False
+            for it in f.items:
+                v = self._eval(it, net, ctx, memo)
+                if v is TriBool.TRUE:
+                    return TriBool.TRUE
+                if v is TriBool.UNKNOWN:
+                    any_unknown = True
+            return TriBool.UNKNOWN if any_unknown else TriBool.FALSE
+
+        if isinstance(f, Implies):
+            l = self._eval(f.left, net, ctx, memo)
+            r = self._eval(f.right, net, ctx, memo)
+            if l is TriBool.FALSE:
+                return TriBool.TRUE
+            if l is TriBool.TRUE:
+                return r
+            if r is TriBool.TRUE:
+                return TriBool.TRUE
+            return TriBool.UNKNOWN
+
+        raise TypeError(f"Unsupported formula type: {type(f)}")
+
+
+def evaluate_dag(formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
+    """Вычислить одну формулу, считая общие подформулы один раз."""
+    return DagEvaluator((formula,)).evaluate(net, ctx)[0]
@@ -1,8 +1,8 @@
 from __future__ import annotations
-from typing import Any
+from functools import lru_cache
+from typing import Any, Dict
 
-from ctmsn.core.network import SemanticNetwork
-from ctmsn.core.concept import Concept
+from ctmsn.core.network import SemanticNetwork, complement_of
 from ctmsn.param.context import Context
 from ctmsn.param.variable import Variable
 from ctmsn.logic.tribool import TriBool
@@ -17,7 +17,15 @@ def _resolve_term(term: Any, ctx: Context) -> tuple[TriBool, Any]:
         return (TriBool.TRUE, ctx.get(term))
     return (TriBool.TRUE, term)
 
-def evaluate(formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
+@lru_cache(maxsize=None)
+def _positive_form(predicate: str) -> tuple[str, bool]:
+    """(предикат для поиска, инвертировать ли результат): lacks_X -> (has_X, True)."""
+    if predicate.startswith("lacks_"):
+        return complement_of(predicate), True  # type: ignore[return-value]
+    return predicate, False
+
+
+def _eval_atom(formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
     if isinstance(formula, FactAtom):
         resolved_args = []
         for a in formula.args:
@@ -27,71 +35,96 @@ def evaluate(formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
             resolved_args.append(v)
 
         # "lacks_X" predicates are evaluated as negation of "has_X"
-        predicate = formula.predicate
-        negate = False
-        if predicate.startswith("lacks_"):
-            predicate = "has_" + predicate[len("lacks_"):]
-            negate = True
-
-        for f in net.facts(predicate):
-            if len(f.args) != len(resolved_args):
-                continue
-            ok = True
-            for fa, ra in zip(f.args, resolved_args):
-                if isinstance(fa, Concept) and isinstance(ra, Concept):
-                    if fa.id != ra.id:
-                        ok = False
-                        break
-                else:
-                    if fa != ra:
-                        ok = False
-                        break
-            if ok:
-                return TriBool.FALSE if negate else TriBool.TRUE
+        predicate, negate = _positive_form(formula.predicate)
+
+        # Аргументы уже разрешены (ground) — поиск идёт по позиционному индексу.
+        if next(net.match(predicate, resolved_args), None) is not None:
+            return TriBool.FALSE if negate else TriBool.TRUE
         return TriBool.TRUE if negate else TriBool.FALSE
 
-    if isinstance(formula, EqAtom):
-        l_s, l = _resolve_term(formula.left, ctx)
-        r_s, r = _resolve_term(formula.right, ctx)
-        if TriBool.UNKNOWN in (l_s, r_s):
-            return TriBool.UNKNOWN
-        return TriBool.TRUE if l == r else TriBool.FALSE
-
-    if isinstance(formula, Not):
-        v = evaluate(formula.inner, net, ctx)
-        if v is TriBool.UNKNOWN:
-            return TriBool.UNKNOWN
-        return TriBool.FALSE if v is TriBool.TRUE else TriBool.TRUE
-
-    if isinstance(formula, And):
-        any_unknown = False
-        for it in formula.items:
-            v = evaluate(it, net, ctx)
-            if v is TriBool.FALSE:
-                return TriBool.FALSE
-            if v is TriBool.UNKNOWN:
-                any_unknown = True
-        return TriBool.UNKNOWN if any_unknown else TriBool.TRUE
-
-    if isinstance(formula, Or):
-        any_unknown = False
-        for it in formula.items:
-            v = evaluate(it, net, ctx)
-            if v is TriBool.TRUE:
-                return TriBool.TRUE
-            if v is TriBool.UNKNOWN:
-                any_unknown = True
-        return TriBool.UNKNOWN if any_unknown else TriBool.FALSE
-
-    if isinstance(formula, Implies):
-        l = evaluate(formula.left, net, ctx)
-        r = evaluate(formula.right, net, ctx)
-        if l is TriBool.FALSE:
-            return TriBool.TRUE
-        if l is TriBool.TRUE:
-            return r
-        if r is TriBool.TRUE:
-            return TriBool.TRUE
+    l_s, l = _resolve_term(formula.left, ctx)  # type: ignore[attr-defined]
+    r_s, r = _resolve_term(formula.right, ctx)  # type: ignore[attr-defined]
+    if TriBool.UNKNOWN in (l_s, r_s):
         return TriBool.UNKNOWN
+    return TriBool.TRUE if l == r else TriBool.FALSE
+
+
+def _kind(f: Formula) -> type:
+    # Подклассы узлов (если есть) приводятся к базовому типу.
+    for cls in (FactAtom, EqAtom, Not, And, Or, Implies):
+        if isinstance(f, cls):
+            return cls
+    raise TypeError(f"Unsupported formula type: {type(f)}")
+
+
+_KINDS: Dict[type, type] = {cls: cls for cls in (FactAtom, EqAtom, Not, And, Or, Implies)}
+
+
+def evaluate(formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
+    """Значение формулы в логике Клини.
+
+    Обход — явным стеком, без рекурсии: глубина формулы ограничена только
+    памятью. And/Or останавливаются на первом FALSE/TRUE.
+    """
+    T, F, U = TriBool.TRUE, TriBool.FALSE, TriBool.UNKNOWN
+    kinds = _KINDS
+    # Кадр: [узел, вид узла, номер следующего операнда, флаг UNKNOWN / значение left].
+    stack: list = []
+    f = formula
+    while True:
+        # Спуск до атома или пустой связки.
+        k = kinds.get(type(f)) or _kind(f)
+        if k is FactAtom or k is EqAtom:
+            v = _eval_atom(f, net, ctx)
+        elif k is And or k is Or:
+            items = f.items  # type: ignore[attr-defined]
+            if not items:
+                v = T if k is And else F
+            else:
+                stack.append([f, k, 1, False])
+                f = items[0]
+                continue
+        elif k is Not:
+            stack.append([f, k, 0, None])
+            f = f.inner  # type: ignore[attr-defined]
+            continue
+        else:
+            stack.append([f, k, 0, None])
+            f = f.left  # type: ignore[attr-defined]
+            continue
 
-    raise TypeError(f"Unsupported formula type: {type(formula)}")
+        # Подъём: передать значение v родителям, пока не понадобится следующий операнд.
+        while stack:
+            frame = stack[-1]
+            k = frame[1]
+            if k is And or k is Or:
+                if v is (F if k is And else T):
+                    stack.pop()
+                    continue
+                if v is U:
+                    frame[3] = True
+                items = frame[0].items
+                i = frame[2]
+                if i < len(items):
+                    frame[2] = i + 1
+                    f = items[i]
+                    break
+                stack.pop()
+                v = U if frame[3] else (T if k is And else F)
+            elif k is Not:
+                stack.pop()
+                v = U if v is U else (F if v is T else T)
+            else:  # Implies: оба операнда вычисляются всегда
+                if frame[2] == 0:
+                    frame[2] = 1
+                    frame[3] = v
+                    f = frame[0].right
+                    break
+                stack.pop()
+                l = frame[3]
+                if l is F:
+                    v = T
+                elif l is not T and v is not T:
+                    v = U
+        else:
+            return v
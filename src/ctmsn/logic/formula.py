@@ -1,9 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Callable, Dict, List, Tuple, TypeVar
 
 from ctmsn.logic.terms import Term
 
+R = TypeVar("R")
+
+# Глубина, до которой вычислители с рекурсией по дереву (compiled,
+# EvalCache, DagEvaluator) работают как есть; глубже они переходят на
+# итеративный evaluate, чтобы не упереться в предел рекурсии Python.
+MAX_NESTING = 128
+
 
 class Formula:
     pass
@@ -46,8 +53,9 @@ def collect_variables(f: Formula) -> frozenset:
     from ctmsn.param.variable import Variable
 
     result: set[Variable] = set()
-
-    def _collect(formula: Formula) -> None:
+    stack = [f]
+    while stack:
+        formula = stack.pop()
         if isinstance(formula, FactAtom):
             for a in formula.args:
                 if isinstance(a, Variable):
@@ -58,13 +66,46 @@ def collect_variables(f: Formula) -> frozenset:
             if isinstance(formula.right, Variable):
                 result.add(formula.right)
         elif isinstance(formula, Not):
-            _collect(formula.inner)
+            stack.append(formula.inner)
         elif isinstance(formula, (And, Or)):
-            for item in formula.items:
-                _collect(item)
+            stack.extend(formula.items)
         elif isinstance(formula, Implies):
-            _collect(formula.left)
-            _collect(formula.right)
-
-    _collect(f)
+            stack.append(formula.left)
+            stack.append(formula.right)
     return frozenset(result)
+
+
+def children(f: Formula) -> Tuple[Formula, ...]:
+    """Непосредственные подформулы узла (у атомов — пустой кортеж)."""
+    if isinstance(f, Not):
+        return (f.inner,)
+    if isinstance(f, (And, Or)):
+        return f.items
+    if isinstance(f, Implies):
+        return (f.left, f.right)
+    return ()
+
+
+def fold(formula: Formula, combine: Callable[[Formula, List[R]], R]) -> R:
+    """Свёртка снизу вверх без рекурсии: combine(узел, значения его детей).
+
+    Узел, входящий в дерево несколько раз (один объект), сворачивается один раз.
+    """
+    done: Dict[int, R] = {}
+    stack: List[Tuple[Formula, bool]] = [(formula, False)]
+    while stack:
+        f, expanded = stack.pop()
+        if id(f) in done:
+            continue
+        kids = children(f)
+        if expanded or not kids:
+            done[id(f)] = combine(f, [done[id(c)] for c in kids])
+        else:
+            stack.append((f, True))
+            stack.extend((c, False) for c in reversed(kids))
+    return done[id(formula)]
+
+
+def formula_depth(f: Formula) -> int:
+    """Высота дерева формулы (у атома — 1)."""
+    return fold(f, lambda _node, depths: 1 + max(depths, default=0))
@@ -0,0 +1,273 @@
+"""Инкрементальное перевычисление формул при изменении фактов (в духе RETE).
+
+IncrementalEvaluator держит значения набора формул для сети и контекста.
+Каждый атом индексируется по предикату (для lacks_X — по has_X) и шаблону
+аргументов: ground-атомы — по готовому Statement, остальные — списком с
+проверкой констант и текущих значений переменных. Сеть сообщает о каждом
+добавлении/удалении факта (SemanticNetwork.subscribe); затронутые атомы
+помечаются грязными, а при запросе значения перевычисляются только они и
+их предки — снизу вверх, пока значение узла меняется. Смена значений
+переменных контекста обнаруживается сравнением со снимком при запросе.
+
+Формулы, которых изменения не коснулись, ничего не стоят: value() для них —
+обращение к словарю.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Any, Dict, Iterable, List, Set, Tuple, cast
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import CoreTerm, Statement
+from ctmsn.core.transaction import ADD, REMOVE
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.evaluator import _positive_form
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Formula, Implies, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.variable import Variable
+
+__all__ = ["IncrementalEvaluator"]
+
+_UNSET: Any = object()
+_T, _F, _U = TriBool.TRUE, TriBool.FALSE, TriBool.UNKNOWN
+
+
+class _Node:
+    __slots__ = ("formula", "children", "parents", "height", "value", "seq")
+
+    def __init__(self, formula: Formula, children: Tuple["_Node", ...], seq: int) -> None:
+        self.formula = formula
+        self.children = children
+        self.parents: List[_Node] = []
+        self.height: int = 1 + max((c.height for c in children), default=0)
+        self.value: TriBool = _U
+        self.seq = seq
+
+
+def _combine(node: _Node) -> TriBool:
+    f = node.formula
+    if isinstance(f, Not):
+        v = node.children[0].value
+        return _U if v is _U else (_F if v is _T else _T)
+    if isinstance(f, And):
+        any_unknown = False
+        for c in node.children:
+            if c.value is _F:
+                return _F
+            if c.value is _U:
+                any_unknown = True
+        return _U if any_unknown else _T
+    if isinstance(f, Or):
+        any_unknown = False
+        for c in node.children:
+            if c.value is _T:
+                return _T
+            if c.value is _U:
+                any_unknown = True
+        return _U if any_unknown else _F
+    if isinstance(f, Implies):
+        l, r = node.children[0].value, node.children[1].value
+        if l is _F:
+            return _T
+        if l is _T:
+            return r
+        return _T if r is _T else _U
+    raise TypeError(f"Unsupported formula type: {type(f)}")
+
+
+class IncrementalEvaluator:
+    """Значения отслеживаемых формул, поддерживаемые по изменениям сети.
+
+    watch(formula) — начать отслеживать; value(formula) — текущее значение
+    (как у evaluate). bind() переключает на другую сеть/контекст, например
+    на копию сети после перехода, с известной дельтой фактов. recomputed —
+    счётчик перевычисленных узлов (для диагностики). close() отписывает
+    вычислитель от сети.
+    """
+
+    def __init__(self, net: SemanticNetwork, ctx: Context | None = None) -> None:
+        self.net = net
+        self.ctx = ctx if ctx is not None else Context()
+        self.recomputed = 0
+        self._nodes: Dict[int, _Node] = {}
+        # Положительный предикат -> ground Statement -> атомы; и атомы с переменными.
+        self._ground: Dict[str, Dict[Statement, List[_Node]]] = {}
+        self._open: Dict[str, List[_Node]] = {}
+        self._by_var: Dict[str, List[_Node]] = {}
+        self._seen: Dict[str, Any] = {}
+        self._dirty: Set[_Node] = set()
+        self._unsubscribe = net.subscribe(self._on_fact)
+
+    # ── регистрация ──────────────────────────────────────────
+
+    def watch(self, formula: Formula) -> Formula:
+        """Отслеживать формулу (повторный вызов ничего не делает)."""
+        self._flush()
+        self._node(formula)
+        return formula
+
+    def _node(self, f: Formula) -> _Node:
+        node = self._nodes.get(id(f))
+        if node is not None:
+            return node
+        if isinstance(f, Not):
+            children: Tuple[_Node, ...] = (self._node(f.inner),)
+        elif isinstance(f, (And, Or)):
+            children = tuple(self._node(it) for it in f.items)
+        elif isinstance(f, Implies):
+            children = (self._node(f.left), self._node(f.right))
+        elif isinstance(f, (FactAtom, EqAtom)):
+            children = ()
+        else:
+            raise TypeError(f"Unsupported formula type: {type(f)}")
+        node = _Node(f, children, len(self._nodes))
+        self._nodes[id(f)] = node
+        for c in children:
+            c.parents.append(node)
+        if children:
+            node.value = _combine(node)
+        else:
+            self._register_leaf(node)
+            node.value = compiled(f)(self.net, self.ctx)
+        self.recomputed += 1
+        return node
+
+    def _register_leaf(self, node: _Node) -> None:
+        f = node.formula
+        if isinstance(f, FactAtom):
+            terms: Tuple[Any, ...] = f.args
+        elif isinstance(f, EqAtom):
+            terms = (f.left, f.right)
+        else:
+            raise TypeError(f"Unsupported formula type: {type(f)}")
+        values = self.ctx._values
+        for t in terms:
+            if isinstance(t, Variable):
+                self._by_var.setdefault(t.name, []).append(node)
+                self._seen.setdefault(t.name, values.get(t.name, _UNSET))
+        if isinstance(f, EqAtom):
+            return
+        predicate = _positive_form(f.predicate)[0]
+        if f.args and not any(a is None or isinstance(a, Variable) for a in f.args):
+            try:
+                key = Statement(predicate, cast(Tuple[CoreTerm, ...], f.args))
+                self._ground.setdefault(predicate, {}).setdefault(key, []).append(node)
+                return
+            except TypeError:  # нехешируемая константа
+                pass
+        self._open.setdefault(predicate, []).append(node)
+
+    # ── изменения ────────────────────────────────────────────
+
+    def _on_fact(self, kind: str, st: Statement) -> None:
+        ground = self._ground.get(st.predicate)
+        if ground:
+            self._dirty.update(ground.get(st, ()))
+        for node in self._open.get(st.predicate, ()):
+            # В _open только атомы FactAtom (см. _register_leaf).
+            if node not in self._dirty and self._may_match(cast(FactAtom, node.formula), st):
+                self._dirty.add(node)
+
+    def _may_match(self, f: FactAtom, st: Statement) -> bool:
+        if not f.args:
+            return True
+        if len(f.args) != len(st.args):
+            return False
+        values = self.ctx._values
+        for a, v in zip(f.args, st.args):
+            if a is None:
+                continue
+            if isinstance(a, Variable):
+                if a.name not in values:
+                    return False  # атом и так UNKNOWN
+                a = values[a.name]
+                if a is None:
+                    continue
+            if a != v:
+                return False
+        return True
+
+    def bind(
+        self,
+        net: SemanticNetwork | None = None,
+        ctx: Context | None = None,
+        *,
+        added: Iterable[Statement] | None = None,
+        removed: Iterable[Statement] | None = None,
+    ) -> None:
+        """Перейти к другой сети и/или контексту.
+
+        Для новой сети added/removed — её дельта фактов относительно текущей
+        (например, Transaction.added/removed после копии); без дельты все
+        атомы перевычисляются.
+        """
+        if ctx is not None:
+            self.ctx = ctx
+        if net is not None and net is not self.net:
+            self._unsubscribe()
+            self.net = net
+            self._unsubscribe = net.subscribe(self._on_fact)
+            if added is None and removed is None:
+                self._dirty.update(n for n in self._nodes.values() if not n.children)
+        for st in added or ():
+            self._on_fact(ADD, st)
+        for st in removed or ():
+            self._on_fact(REMOVE, st)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def __enter__(self) -> "IncrementalEvaluator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ── значения ─────────────────────────────────────────────
+
+    def value(self, formula: Formula) -> TriBool:
+        """Значение формулы в текущей сети и контексте."""
+        self._flush()
+        node = self._nodes.get(id(formula))
+        if node is None:
+            node = self._node(formula)
+        return node.value
+
+    def _flush(self) -> None:
+        values = self.ctx._values
+        seen = self._seen
+        for name, leaves in self._by_var.items():
+            cur = values.get(name, _UNSET)
+            old = seen[name]
+            if cur is old or (cur is not _UNSET and old is not _UNSET and cur == old):
+                continue
+            seen[name] = cur
+            self._dirty.update(leaves)
+        if not self._dirty:
+            return
+
+        net, ctx = self.net, self.ctx
+        heap: List[Tuple[int, int, _Node]] = []
+        queued: Set[_Node] = set()
+        for leaf in self._dirty:
+            self.recomputed += 1
+            v = compiled(leaf.formula)(net, ctx)
+            if v is not leaf.value:
+                leaf.value = v
+                for p in leaf.parents:
+                    if p not in queued:
+                        queued.add(p)
+                        heapq.heappush(heap, (p.height, p.seq, p))
+        self._dirty.clear()
+        while heap:
+            _h, _s, node = heapq.heappop(heap)
+            self.recomputed += 1
+            v = _combine(node)
+            if v is not node.value:
+                node.value = v
+                for p in node.parents:
+                    if p not in queued:
+                        queued.add(p)
+                        heapq.heappush(heap, (p.height, p.seq, p))
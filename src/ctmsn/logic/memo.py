@@ -0,0 +1,48 @@
+"""Слабые таблицы значений, привязанных к объектам по идентичности.
+
+Формулы и Conditions — frozen-датаклассы: производные данные (скомпилированные
+функции, зависимости, DAG условий) на них не записываются, а хранятся здесь.
+Ключ — id(объекта), а не его хеш: dataclass-хеш формулы пересчитывается по
+всему поддереву при каждом обращении (и рекурсивен), а структурно равные, но
+разные узлы всё равно получат одинаковые значения. Запись удаляется
+weakref-колбэком, когда объект собран, поэтому id не достанется чужому
+объекту.
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+__all__ = ["IdentityMemo"]
+
+V = TypeVar("V")
+
+
+class IdentityMemo(Generic[V]):
+    """Отображение объект -> значение по id; не удерживает объекты-ключи.
+
+    Значение не должно ссылаться на свой ключ — иначе ключ не будет собран.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self) -> None:
+        self._data: Dict[int, Tuple["weakref.ref[Any]", V]] = {}
+
+    def get(self, obj: Any) -> Optional[V]:
+        entry = self._data.get(id(obj))
+        if entry is not None and entry[0]() is obj:
+            return entry[1]
+        return None
+
+    def __setitem__(self, obj: Any, value: V) -> None:
+        key = id(obj)
+        data = self._data
+        data[key] = (weakref.ref(obj, lambda _ref: data.pop(key, None)), value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -0,0 +1,191 @@
+"""Частичное вычисление формулы при фиксированной сети.
+
+specialize(formula, net, ctx) возвращает остаточную формулу, равную исходной
+(в смысле Клини) для любого расширения ctx, пока факты сети не меняются:
+
+* ground-атомы FactAtom и EqAtom с константами сворачиваются в константы;
+* атом с переменными заменяется конечным множеством удовлетворяющих его
+  значений: p(x, c) -> x = a1 ∨ x = a2 ∨ ...; значения переменных, заданные
+  в ctx, подставляются заранее;
+* And/Or/Not/Implies упрощаются по законам Клини.
+
+Константы — TRUE_FORMULA (And(())) и FALSE_FORMULA (Or(())); их понимают
+evaluate, compiled и прочие вычислители. Остаток обычно состоит из
+нескольких сравнений переменных, и перебор кандидатов в ForcingEngine.force
+не обращается к фактам.
+
+Ограничение: значение None у переменной (шаблон для net.match) в остатке
+сравнивается как обычное значение.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.evaluator import _positive_form
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Formula, Implies, Not, Or, fold
+from ctmsn.param.context import Context
+from ctmsn.param.variable import Variable
+
+__all__ = ["TRUE_FORMULA", "FALSE_FORMULA", "specialize"]
+
+TRUE_FORMULA: Formula = And(())
+FALSE_FORMULA: Formula = Or(())
+
+# Больше удовлетворяющих значений — атом остаётся как есть.
+MAX_BINDINGS = 64
+
+
+def _is_true(f: Formula) -> bool:
+    return isinstance(f, And) and not f.items
+
+
+def _is_false(f: Formula) -> bool:
+    return isinstance(f, Or) and not f.items
+
+
+def _not(f: Formula) -> Formula:
+    if _is_true(f):
+        return FALSE_FORMULA
+    if _is_false(f):
+        return TRUE_FORMULA
+    if isinstance(f, Not):
+        return f.inner
+    return Not(f)
+
+
+def _and(items: List[Formula]) -> Formula:
+    out: List[Formula] = []
+    for it in items:
+        if _is_false(it):
+            return FALSE_FORMULA
+        if isinstance(it, And):
+            out.extend(it.items)
+        else:
+            out.append(it)
+    return out[0] if len(out) == 1 else And(tuple(out))
+
+
+def _or(items: List[Formula]) -> Formula:
+    out: List[Formula] = []
+    for it in items:
+        if _is_true(it):
+            return TRUE_FORMULA
+        if isinstance(it, Or):
+            out.extend(it.items)
+        else:
+            out.append(it)
+    return out[0] if len(out) == 1 else Or(tuple(out))
+
+
+def _implies(left: Formula, right: Formula) -> Formula:
+    if _is_false(left) or _is_true(right):
+        return TRUE_FORMULA
+    if _is_true(left):
+        return right
+    if _is_false(right):
+        return _not(left)
+    return Implies(left, right)
+
+
+def _defined(names: List[Variable]) -> Formula:
+    """TRUE, если все переменные заданы, иначе UNKNOWN."""
+    return _and([EqAtom(v, v) for v in names])
+
+
+def _fact(f: FactAtom, net: SemanticNetwork, values: Dict[str, Any], max_bindings: int) -> Formula:
+    predicate, negate = _positive_form(f.predicate)
+    pattern: List[Any] = []
+    slots: Dict[str, List[int]] = {}
+    free: List[Variable] = []
+    for i, a in enumerate(f.args):
+        if isinstance(a, Variable):
+            if a.name in values:
+                pattern.append(values[a.name])
+                continue
+            if a.name not in slots:
+                free.append(a)
+            slots.setdefault(a.name, []).append(i)
+            pattern.append(None)
+        else:
+            pattern.append(a)
+
+    if not free:
+        hit = next(net.match(predicate, pattern), None) is not None
+        return TRUE_FORMULA if hit != negate else FALSE_FORMULA
+
+    bindings: Dict[Tuple[Any, ...], None] = {}
+    for st in net.match(predicate, pattern):
+        row = []
+        for v in free:
+            first, *rest = slots[v.name]
+            value = st.args[first]
+            if any(st.args[j] != value for j in rest):
+                break
+            row.append(value)
+        else:
+            bindings[tuple(row)] = None
+            if len(bindings) > max_bindings:
+                return f
+
+    if not bindings:
+        # FALSE при заданных переменных, UNKNOWN — иначе.
+        residual = _not(_defined(free))
+        return _not(residual) if negate else residual
+    residual = _or([_and([EqAtom(v, val) for v, val in zip(free, row)]) for row in bindings])
+    if len(free) > 1:
+        # При частично заданных переменных атом — UNKNOWN, а дизъюнкция
+        # сравнений могла бы дать FALSE: (D ∧ r) ∨ ¬D.
+        d = _defined(free)
+        residual = Or((And((d, residual)), Not(d)))
+    return _not(residual) if negate else residual
+
+
+def _term(t: Any, values: Dict[str, Any]) -> Tuple[bool, Any]:
+    if isinstance(t, Variable):
+        if t.name in values:
+            return True, values[t.name]
+        return False, t
+    return True, t
+
+
+def _specialize(f: Formula, net: SemanticNetwork, values: Dict[str, Any], max_bindings: int) -> Formula:
+    def combine(node: Formula, kids: List[Formula]) -> Formula:
+        if isinstance(node, FactAtom):
+            return _fact(node, net, values, max_bindings)
+        if isinstance(node, EqAtom):
+            l_const, l = _term(node.left, values)
+            r_const, r = _term(node.right, values)
+            if l_const and r_const:
+                return TRUE_FORMULA if l == r else FALSE_FORMULA
+            if l is node.left and r is node.right:
+                return node
+            return EqAtom(l, r)
+        if isinstance(node, Not):
+            return _not(kids[0])
+        if isinstance(node, And):
+            return _and(kids)
+        if isinstance(node, Or):
+            return _or(kids)
+        if isinstance(node, Implies):
+            return _implies(kids[0], kids[1])
+        raise TypeError(f"Unsupported formula type: {type(node)}")
+
+    return fold(f, combine)
+
+
+def specialize(
+    formula: Formula,
+    net: SemanticNetwork,
+    ctx: Optional[Context] = None,
+    *,
+    max_bindings: int = MAX_BINDINGS,
+) -> Formula:
+    """Остаточная формула: факты сети и значения ctx подставлены заранее.
+
+    Атом с переменными, у которого больше max_bindings удовлетворяющих
+    значений, остаётся без изменений.
+    """
+    values = ctx._values if ctx is not None else {}
+    return _specialize(formula, net, values, max_bindings)
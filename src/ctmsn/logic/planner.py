@@ -0,0 +1,187 @@
+"""Стоимостное упорядочивание операндов And/Or.
+
+And и Or в логике Клини коммутативны (результат — минимум/максимум по
+операндам), поэтому порядок операндов влияет только на то, когда вычисление
+остановится: And — на первом FALSE, Or — на первом TRUE. Planner оценивает
+для каждого операнда стоимость (сколько фактов придётся просмотреть) и
+вероятность TRUE и сортирует операнды по возрастанию
+стоимость / P(остановки): дешёвые и решающие — вперёд.
+
+Оценки берутся из числа фактов предикатов (net.count) и, если накоплено
+достаточно наблюдений (observe), из наблюдаемой доли TRUE у атомов
+предиката. Implies не переставляется.
+
+Переупорядочение включается явно — ForcingEngine(net, reorder=True) или
+plan(formula, net); исходная формула остаётся для вывода и объяснений.
+Наблюдения копит ForcingEngine(reorder=True): первые кандидаты каждого
+поиска передаются в observe его планировщика, и следующие поиски того же
+движка упорядочиваются с учётом наблюдённых долей. plan() — разовый план
+только по числу фактов.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.evaluator import _positive_form
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Formula, Implies, Not, Or, children, fold
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.variable import Variable
+
+__all__ = ["Estimate", "Planner", "plan"]
+
+# Стоимость сравнения в единицах "просмотренный факт".
+EQ_COST = 0.1
+# Нижняя граница вероятности остановки (чтобы не делить на ноль).
+_EPS = 1e-6
+# Размер домена считается не дальше этого значения.
+_MAX_DOMAIN = 1024
+
+
+@dataclass(frozen=True)
+class Estimate:
+    cost: float
+    p_true: float
+
+
+class Planner:
+    """Оценщик и переупорядочиватель формул для данной сети.
+
+    min_samples — сколько наблюдений атомов предиката нужно, чтобы
+    наблюдаемая доля TRUE заменила оценку по числу фактов.
+    """
+
+    def __init__(self, net: SemanticNetwork, *, min_samples: int = 20) -> None:
+        self.net = net
+        self.min_samples = min_samples
+        # предикат (положительная форма) -> (наблюдений, из них TRUE)
+        self._observed: Dict[str, Tuple[int, int]] = {}
+
+    # ── наблюдения ───────────────────────────────────────────
+
+    def observe(self, formula: Formula, ctx: Context) -> None:
+        """Вычислить все атомы формулы в ctx и учесть их исходы."""
+        stack = [formula]
+        while stack:
+            f = stack.pop()
+            if not isinstance(f, FactAtom):
+                stack.extend(children(f))
+                continue
+            v = compiled(f)(self.net, ctx)
+            if v is TriBool.UNKNOWN:
+                continue
+            predicate, negate = _positive_form(f.predicate)
+            n, hits = self._observed.get(predicate, (0, 0))
+            self._observed[predicate] = (n + 1, hits + ((v is TriBool.TRUE) != negate))
+
+    def hit_rate(self, predicate: str) -> Optional[float]:
+        """Наблюдаемая доля TRUE у атомов предиката или None, если данных мало."""
+        n, hits = self._observed.get(predicate, (0, 0))
+        return hits / n if n >= self.min_samples else None
+
+    # ── оценки ───────────────────────────────────────────────
+
+    def _fact(self, f: FactAtom) -> Estimate:
+        predicate, negate = _positive_form(f.predicate)
+        n = self.net.count(predicate)
+        universe = max(1, len(self.net.concepts))
+        bound = [a for a in f.args if a is not None]
+        # match() снимает копию наименьшей позиционной корзины (в среднем
+        # n / universe фактов), а без связанных позиций — всей корзины
+        # предиката (n фактов), даже если нужен только первый факт.
+        cost = 1.0 + (n / universe if bound else n)
+        p = self.hit_rate(predicate)
+        if p is None:
+            if bound:
+                p = min(1.0, n / universe ** len(bound))
+            else:
+                p = 1.0 if n else 0.0
+        return Estimate(cost, 1.0 - p if negate else p)
+
+    @staticmethod
+    def _eq(f: EqAtom) -> Estimate:
+        sizes = []
+        for t in (f.left, f.right):
+            if isinstance(t, Variable):
+                try:
+                    sizes.append(sum(1 for _ in islice(t.domain.enumerate_values(), _MAX_DOMAIN)))
+                except TypeError:  # неперечислимый домен
+                    pass
+        if not isinstance(f.left, Variable) and not isinstance(f.right, Variable):
+            return Estimate(EQ_COST, 1.0 if f.left == f.right else 0.0)
+        size = max(sizes, default=2)
+        return Estimate(EQ_COST, 1.0 / max(1, size))
+
+    def estimate(self, f: Formula) -> Estimate:
+        """Ожидаемая стоимость вычисления формулы (в исходном порядке) и P(TRUE)."""
+        return fold(f, self._estimate_node)
+
+    def _estimate_node(self, f: Formula, kids: List[Estimate]) -> Estimate:
+        if isinstance(f, FactAtom):
+            return self._fact(f)
+        if isinstance(f, EqAtom):
+            return self._eq(f)
+        if isinstance(f, Not):
+            e = kids[0]
+            return Estimate(e.cost, 1.0 - e.p_true)
+        if isinstance(f, (And, Or)):
+            return self._chain(f, kids)
+        if isinstance(f, Implies):
+            l, r = kids
+            return Estimate(l.cost + r.cost, 1.0 - l.p_true * (1.0 - r.p_true))
+        raise TypeError(f"Unsupported formula type: {type(f)}")
+
+    @staticmethod
+    def _chain(f: Formula, estimates: List[Estimate]) -> Estimate:
+        conj = isinstance(f, And)
+        cost, reach = 0.0, 1.0
+        for e in estimates:
+            cost += reach * e.cost
+            # Следующий операнд вычисляется, если этот не остановил цепочку.
+            reach *= e.p_true if conj else 1.0 - e.p_true
+        return Estimate(cost, reach if conj else 1.0 - reach)
+
+    # ── план ─────────────────────────────────────────────────
+
+    def plan(self, formula: Formula) -> Formula:
+        """Формула с переставленными операндами And/Or (узлы без перестановок
+        сохраняются как есть)."""
+        return self._plan(formula)[0]
+
+    def _plan(self, f: Formula) -> Tuple[Formula, Estimate]:
+        return fold(f, self._plan_node)
+
+    def _plan_node(self, f: Formula, kids: List[Tuple[Formula, Estimate]]) -> Tuple[Formula, Estimate]:
+        if isinstance(f, (FactAtom, EqAtom)):
+            return f, self._estimate_node(f, [])
+        if isinstance(f, Not):
+            inner, e = kids[0]
+            return (f if inner is f.inner else Not(inner)), Estimate(e.cost, 1.0 - e.p_true)
+        if isinstance(f, Implies):
+            (l, le), (r, re) = kids
+            node: Formula = f if (l is f.left and r is f.right) else Implies(l, r)
+            return node, Estimate(le.cost + re.cost, 1.0 - le.p_true * (1.0 - re.p_true))
+        if isinstance(f, (And, Or)):
+            conj = isinstance(f, And)
+
+            def rank(item: Tuple[Formula, Estimate]) -> float:
+                e = item[1]
+                stop = 1.0 - e.p_true if conj else e.p_true
+                return e.cost / max(stop, _EPS)
+
+            ordered = sorted(kids, key=rank)  # устойчивая сортировка: равные — в исходном порядке
+            items = tuple(it for it, _e in ordered)
+            changed = any(a is not b for a, b in zip(items, f.items))
+            node = (And(items) if conj else Or(items)) if changed else f
+            return node, self._chain(f, [e for _it, e in ordered])
+        raise TypeError(f"Unsupported formula type: {type(f)}")
+
+
+def plan(formula: Formula, net: SemanticNetwork) -> Formula:
+    """Переупорядочить операнды And/Or по оценкам из числа фактов сети."""
+    return Planner(net).plan(formula)
@@ -0,0 +1,231 @@
+"""Профилирование вычисления формул.
+
+Profiler.evaluate вычисляет формулу так же, как logic.evaluator.evaluate
+(логика Клини, остановка And/Or на первом FALSE/TRUE), и попутно учитывает
+для каждого узла формулы: число вычислений, суммарное время (вместе с
+поддеревом), число просмотренных фактов у FactAtom (SemanticNetwork.scan_size)
+и число остановок And/Or до последнего операнда.
+
+Профилирование включается явно: ForcingEngine(net, profiler=p),
+TransitionEngine(..., profiler=p), run_case(case, profile=True). Без профайлера
+движки его не касаются. report() сводит накопленное в ProfileReport с
+самыми дорогими атомами и предикатами.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.evaluator import _eval_atom, _positive_form, _resolve_term
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Formula, Implies, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.variable import Variable
+
+__all__ = ["NodeProfile", "PredicateProfile", "ProfileReport", "Profiler"]
+
+
+@dataclass(frozen=True)
+class NodeProfile:
+    """Накопленная статистика одного узла формулы (время — в секундах)."""
+
+    formula: Formula
+    calls: int
+    time: float
+    facts_scanned: int = 0
+    short_circuits: int = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.time / self.calls if self.calls else 0.0
+
+
+@dataclass(frozen=True)
+class PredicateProfile:
+    """Сумма по всем атомам FactAtom одного предиката."""
+
+    predicate: str
+    atoms: int
+    calls: int
+    time: float
+    facts_scanned: int
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    """Снимок профиля: узлы по убыванию суммарного времени."""
+
+    evaluations: int
+    total_time: float
+    nodes: Tuple[NodeProfile, ...]
+
+    def atoms(self) -> Tuple[NodeProfile, ...]:
+        return tuple(n for n in self.nodes if isinstance(n.formula, (FactAtom, EqAtom)))
+
+    def hot_atoms(self, n: int = 10) -> Tuple[NodeProfile, ...]:
+        return self.atoms()[:n]
+
+    def predicates(self) -> Tuple[PredicateProfile, ...]:
+        acc: Dict[str, List[float]] = {}
+        for node in self.nodes:
+            if isinstance(node.formula, FactAtom):
+                a = acc.setdefault(node.formula.predicate, [0, 0, 0.0, 0])
+                a[0] += 1
+                a[1] += node.calls
+                a[2] += node.time
+                a[3] += node.facts_scanned
+        out = [PredicateProfile(p, int(a[0]), int(a[1]), a[2], int(a[3])) for p, a in acc.items()]
+        out.sort(key=lambda p: p.time, reverse=True)
+        return tuple(out)
+
+    def hot_predicates(self, n: int = 10) -> Tuple[PredicateProfile, ...]:
+        return self.predicates()[:n]
+
+    def format(self, n: int = 10) -> str:
+        """Текстовый отчёт для вывода в консоль/протокол."""
+        lines = [f"вычислений: {self.evaluations}, время: {self.total_time * 1000.0:.3f} мс", "", "атомы:"]
+        for node in self.hot_atoms(n):
+            lines.append(
+                f"  {node.time * 1000.0:9.3f} мс  {node.calls:7d} выч.  "
+                f"{node.facts_scanned:8d} факт.  {_label(node.formula)}"
+            )
+        lines += ["", "предикаты:"]
+        for p in self.hot_predicates(n):
+            lines.append(
+                f"  {p.time * 1000.0:9.3f} мс  {p.calls:7d} выч.  "
+                f"{p.facts_scanned:8d} факт.  {p.predicate} ({p.atoms} атом.)"
+            )
+        return "\n".join(lines)
+
+
+def _term_label(t: Any) -> str:
+    if isinstance(t, Concept):
+        return t.id
+    if isinstance(t, Variable):
+        return "?" + t.name
+    return repr(t)
+
+
+def _label(f: Formula) -> str:
+    if isinstance(f, FactAtom):
+        return f"{f.predicate}({', '.join(_term_label(a) for a in f.args)})"
+    if isinstance(f, EqAtom):
+        return f"{_term_label(f.left)} = {_term_label(f.right)}"
+    return type(f).__name__
+
+
+class Profiler:
+    """Накопитель статистики вычислений формул.
+
+    Узлы различаются по идентичности объекта (id): одинаковые по структуре
+    подформулы в разных местах учитываются отдельно. Профайлер держит ссылки
+    на узлы, поэтому id не переиспользуются до reset().
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        # id узла -> [формула, вычислений, время, фактов, остановок]
+        self._nodes: Dict[int, list] = {}
+        self.evaluations = 0
+        self.total_time = 0.0
+
+    def _stats(self, f: Formula) -> list:
+        s = self._nodes.get(id(f))
+        if s is None:
+            s = self._nodes[id(f)] = [f, 0, 0.0, 0, 0]
+        return s
+
+    def _atom(self, f: Formula, net: SemanticNetwork, ctx: Context, clock) -> TriBool:
+        s = self._stats(f)
+        t0 = clock()
+        v = _eval_atom(f, net, ctx)
+        s[2] += clock() - t0
+        s[1] += 1
+        if isinstance(f, FactAtom):
+            args = []
+            for a in f.args:
+                st, val = _resolve_term(a, ctx)
+                if st is TriBool.UNKNOWN:
+                    return v
+                args.append(val)
+            s[3] += net.scan_size(_positive_form(f.predicate)[0], args)
+        return v
+
+    def evaluate(self, formula: Formula, net: SemanticNetwork, ctx: Context) -> TriBool:
+        """Значение формулы (как evaluate) с учётом статистики по узлам."""
+        T, F, U = TriBool.TRUE, TriBool.FALSE, TriBool.UNKNOWN
+        clock = time.perf_counter
+        start = clock()
+        # Кадр: [узел, статистика, время входа, номер следующего операнда,
+        #        флаг UNKNOWN / значение left]. Обход явным стеком, как в evaluate.
+        stack: list = []
+        f = formula
+        while True:
+            if isinstance(f, (FactAtom, EqAtom)):
+                v = self._atom(f, net, ctx, clock)
+            elif isinstance(f, (And, Or)) and not f.items:
+                s = self._stats(f)
+                s[1] += 1
+                v = T if isinstance(f, And) else F
+            elif isinstance(f, (And, Or, Not, Implies)):
+                stack.append([f, self._stats(f), clock(), 0, False])
+                if isinstance(f, (And, Or)):
+                    stack[-1][3] = 1
+                    f = f.items[0]
+                else:
+                    f = f.inner if isinstance(f, Not) else f.left
+                continue
+            else:
+                raise TypeError(f"Unsupported formula type: {type(f)}")
+
+            while stack:
+                frame = stack[-1]
+                node = frame[0]
+                if isinstance(node, (And, Or)):
+                    conj = isinstance(node, And)
+                    i = frame[3]
+                    if v is (F if conj else T):
+                        if i < len(node.items):
+                            frame[1][4] += 1
+                    elif i < len(node.items):
+                        if v is U:
+                            frame[4] = True
+                        frame[3] = i + 1
+                        f = node.items[i]
+                        break
+                    elif v is U or frame[4]:
+                        v = U
+                    else:
+                        v = T if conj else F
+                elif isinstance(node, Not):
+                    v = U if v is U else (F if v is T else T)
+                else:
+                    if frame[3] == 0:
+                        frame[3] = 1
+                        frame[4] = v
+                        f = node.right
+                        break
+                    l = frame[4]
+                    if l is F:
+                        v = T
+                    elif l is not T and v is not T:
+                        v = U
+                stack.pop()
+                s = frame[1]
+                s[1] += 1
+                s[2] += clock() - frame[2]
+            else:
+                self.evaluations += 1
+                self.total_time += clock() - start
+                return v
+
+    def report(self) -> ProfileReport:
+        nodes = [NodeProfile(f, calls, t, scanned, stops) for f, calls, t, scanned, stops in self._nodes.values()]
+        nodes.sort(key=lambda n: n.time, reverse=True)
+        return ProfileReport(self.evaluations, self.total_time, tuple(nodes))
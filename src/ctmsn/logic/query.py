@@ -0,0 +1,165 @@
+"""Конъюнктивные запросы к сети: все значения переменных, делающие формулу истинной.
+
+query(net, formula, ctx) принимает FactAtom или And (вложенные And
+раскрываются) и возвращает поток словарей Variable -> значение. Положительные
+атомы с переменными — источники: их факты выбираются по индексу
+(net.match по константам и значениям из ctx) и соединяются хеш-соединением;
+порядок соединения жадный — сначала наименьшее отношение, далее атом,
+связанный с уже связанными переменными, с наименьшим отношением. Прочие
+конъюнкты (EqAtom, Not, Or, lacks_X, ...) — фильтры: проверяются, как только
+все их переменные связаны, и должны быть истинны.
+
+Значения проверяются доменом переменной, поэтому запрос отвечает и для
+PredicateDomain, которые перебором не перечислить.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.cache import formula_dependencies
+from ctmsn.logic.compiler import compiled
+from ctmsn.logic.formula import And, FactAtom, Formula
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.variable import Variable
+
+__all__ = ["conjuncts", "query"]
+
+Binding = Dict[Variable, Any]
+
+
+def conjuncts(formula: Formula) -> List[Formula]:
+    """Конъюнкты формулы верхнего уровня (вложенные And раскрываются)."""
+    out: List[Formula] = []
+    stack = [formula]
+    while stack:
+        f = stack.pop()
+        if isinstance(f, And):
+            stack.extend(reversed(f.items))
+        else:
+            out.append(f)
+    return out
+
+
+def _is_source(f: Formula, values: Dict[str, Any]) -> bool:
+    return (
+        isinstance(f, FactAtom)
+        and not f.predicate.startswith("lacks_")
+        and all(a is not None for a in f.args)
+        and any(isinstance(a, Variable) and a.name not in values for a in f.args)
+    )
+
+
+class _Relation:
+    """Факты атома-источника, спроецированные на его свободные переменные."""
+
+    def __init__(self, atom: FactAtom, net: SemanticNetwork, values: Dict[str, Any]) -> None:
+        pattern: List[Any] = []
+        slots: Dict[Variable, List[int]] = {}
+        for i, a in enumerate(atom.args):
+            if isinstance(a, Variable):
+                if a.name in values:
+                    pattern.append(values[a.name])
+                    continue
+                slots.setdefault(a, []).append(i)
+                pattern.append(None)
+            else:
+                pattern.append(a)
+        self.vars: Tuple[Variable, ...] = tuple(slots)
+        rows: Dict[Tuple[Any, ...], None] = {}
+        for st in net.match(atom.predicate, pattern):
+            row = []
+            for var, positions in slots.items():
+                value = st.args[positions[0]]
+                if any(st.args[j] != value for j in positions[1:]) or not var.domain.contains(value):
+                    break
+                row.append(value)
+            else:
+                rows[tuple(row)] = None
+        self.rows: List[Tuple[Any, ...]] = list(rows)
+
+    def index(self, key_vars: Sequence[Variable]) -> Tuple[Tuple[Variable, ...], Dict[Tuple[Any, ...], List[Tuple[Any, ...]]]]:
+        """Хеш-таблица: значения key_vars -> значения остальных переменных."""
+        key_pos = [self.vars.index(v) for v in key_vars]
+        rest_pos = [i for i, v in enumerate(self.vars) if v not in key_vars]
+        table: Dict[Tuple[Any, ...], List[Tuple[Any, ...]]] = {}
+        for row in self.rows:
+            table.setdefault(tuple(row[i] for i in key_pos), []).append(tuple(row[i] for i in rest_pos))
+        return tuple(self.vars[i] for i in rest_pos), table
+
+
+def _order(relations: List[_Relation]) -> List[_Relation]:
+    remaining = sorted(relations, key=lambda r: len(r.rows))
+    ordered: List[_Relation] = []
+    bound: set = set()
+    while remaining:
+        connected = [r for r in remaining if bound.intersection(r.vars)]
+        best = min(connected or remaining, key=lambda r: len(r.rows))
+        remaining.remove(best)
+        ordered.append(best)
+        bound.update(best.vars)
+    return ordered
+
+
+def query(net: SemanticNetwork, formula: Formula, ctx: Optional[Context] = None) -> Iterator[Binding]:
+    """Все связывания свободных переменных, при которых formula истинна.
+
+    Переменные, заданные в ctx, считаются константами и в ответ не входят.
+    ValueError — если переменную фильтра не связывает ни один атом-источник.
+    """
+    base = ctx if ctx is not None else Context()
+    values = base._values
+    sources: List[_Relation] = []
+    filters: List[Formula] = []
+    for f in conjuncts(formula):
+        if _is_source(f, values):
+            sources.append(_Relation(f, net, values))  # type: ignore[arg-type]
+        else:
+            filters.append(f)
+
+    bound_names = {v.name for r in sources for v in r.vars}
+    free = {n for f in filters for n in formula_dependencies(f)[1]} - values.keys() - bound_names
+    if free:
+        raise ValueError(f"Variables not bound by any fact atom: {', '.join(sorted(free))}")
+
+    # Фильтры без свободных переменных проверяются до соединения.
+    pending: List[Formula] = []
+    for f in filters:
+        if set(formula_dependencies(f)[1]) <= values.keys():
+            if compiled(f)(net, base) is not TriBool.TRUE:
+                return
+        else:
+            pending.append(f)
+
+    # Шаги соединения: (ключевые переменные, новые переменные, хеш-таблица,
+    # фильтры, которые становятся проверяемыми после шага).
+    steps = []
+    seen: List[Variable] = []
+    for rel in _order(sources):
+        key_vars = [v for v in rel.vars if v in seen]
+        new_vars, table = rel.index(key_vars)
+        seen.extend(new_vars)
+        names = {v.name for v in seen} | values.keys()
+        ready = [f for f in pending if set(formula_dependencies(f)[1]) <= names]
+        pending = [f for f in pending if f not in ready]
+        steps.append((tuple(key_vars), new_vars, table, [compiled(f) for f in ready]))
+
+    def run(i: int, binding: Binding, ctx_values: Dict[str, Any]) -> Iterator[Binding]:
+        if i == len(steps):
+            yield dict(binding)
+            return
+        key_vars, new_vars, table, checks = steps[i]
+        for rest in table.get(tuple(binding[v] for v in key_vars), ()):
+            for var, value in zip(new_vars, rest):
+                binding[var] = value
+                ctx_values[var.name] = value
+            step_ctx = Context(_values=ctx_values)
+            if all(check(net, step_ctx) is TriBool.TRUE for check in checks):
+                yield from run(i + 1, binding, ctx_values)
+        for var in new_vars:
+            binding.pop(var, None)
+            ctx_values.pop(var.name, None)
+
+    yield from run(0, {}, dict(values))
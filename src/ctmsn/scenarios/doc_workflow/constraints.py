@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from ctmsn.core.network import SemanticNetwork
 from ctmsn.forcing.conditions import Conditions
-from ctmsn.logic.formula import FactAtom, Not
+from ctmsn.logic.dag import formulas
 
 
 def build_conditions(net: SemanticNetwork) -> Conditions:
@@ -11,7 +11,7 @@ def build_conditions(net: SemanticNetwork) -> Conditions:
     rejected = net.concepts["rejected"]
     alice = net.concepts["alice"]
 
-    c1 = Not(FactAtom("status", (doc, rejected)))
-    c2 = FactAtom("assigned", (doc, alice))
+    c1 = formulas.not_(formulas.fact("status", doc, rejected))
+    c2 = formulas.fact("assigned", doc, alice)
 
     return Conditions().add(c1, c2)
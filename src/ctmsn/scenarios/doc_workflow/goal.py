@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from ctmsn.core.network import SemanticNetwork
-from ctmsn.logic.formula import And, FactAtom
+from ctmsn.logic.dag import formulas
+from ctmsn.logic.formula import And
 from ctmsn.scenarios.doc_workflow.params import build_variables
 
 
@@ -15,7 +16,7 @@ def build_goal(net: SemanticNetwork) -> And:
     published = net.concepts["published"]
     v, _ = build_variables(net)
 
-    return And((
-        FactAtom("status", (doc, published)),
-        FactAtom("assigned", (doc, v.reviewer)),
-    ))
+    return formulas.and_(
+        formulas.fact("status", doc, published),
+        formulas.fact("assigned", doc, v.reviewer),
+    )
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from ctmsn.core.network import SemanticNetwork
 from ctmsn.forcing.conditions import Conditions
-from ctmsn.logic.formula import FactAtom, Or
+from ctmsn.logic.dag import formulas
+from ctmsn.logic.formula import FactAtom
 from ctmsn.scenarios.doc_workflow.model import STATUSES
 from ctmsn.transition.invariant import invariants
 from ctmsn.transition.rule import AddFact, RetractFact, TransitionRule
@@ -18,7 +19,7 @@ def build_rules(net: SemanticNetwork) -> list[TransitionRule]:
     doc = net.concepts["doc"]
 
     def g(stage: str) -> FactAtom:
-        return FactAtom("status", (doc, net.concepts[stage]))
+        return formulas.fact("status", doc, net.concepts[stage])
 
     def move(src: str, dst: str):
         return (RetractFact("status", ("doc", src)), AddFact("status", ("doc", dst)))
@@ -37,5 +38,5 @@ def build_invariants(net: SemanticNetwork) -> Conditions:
     """Денотационный инвариант: документ всегда находится в одном из известных статусов."""
     doc = net.concepts["doc"]
     return invariants(
-        Or(tuple(FactAtom("status", (doc, net.concepts[s])) for s in STATUSES))
+        formulas.or_(*(formulas.fact("status", doc, net.concepts[s]) for s in STATUSES))
     )
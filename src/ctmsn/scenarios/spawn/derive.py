@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+import itertools
 from typing import Dict, List, Tuple
 
 from ctmsn.core.concept import Concept
 from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.formula import And, FactAtom
+from ctmsn.logic.query import query
+from ctmsn.param.domain import PredicateDomain
+from ctmsn.param.variable import Variable
+
+_EDGE_PREDICATES = ("edge", "derived_edge")
+_ANY = PredicateDomain(lambda _v: True, "Any")
+_LEFT, _RIGHT, _RESULT, _X, _MID, _Z = (
+    Variable(name, _ANY) for name in ("left", "right", "result", "X", "mid", "Z")
+)
 
 
 def _all_edges(net: SemanticNetwork) -> list[tuple[str, Concept, Concept, str]]:
     out = []
-    for st in net.facts("edge"):
+    for st in net.view("edge"):
         lab, s, d = st.args  # type: ignore[misc]
         out.append((lab, s, d, "edge"))
-    for st in net.facts("derived_edge"):
+    for st in net.view("derived_edge"):
         lab, s, d = st.args  # type: ignore[misc]
         out.append((lab, s, d, "derived_edge"))
     return out
@@ -70,30 +81,27 @@ def derive_comp2(net: SemanticNetwork) -> int:
     """
     D2.1: derive comp2(left,right,result) if 2-step path matches and named result arrow exists.
     """
-    edges = _all_edges(net)
-
-    by_pair: Dict[Tuple[str, str], List[str]] = {}
-    for lab, s, d, _k in edges:
-        by_pair.setdefault((s.id, d.id), []).append(lab)
-
-    before = len(list(net.facts("comp2")))
-    before_expl = len(list(net.facts("comp2_expl")))
-
-    seen = set()
-    for left, X, mid, _k1 in edges:
-        for right, mid2, Z, _k2 in edges:
-            if mid2.id != mid.id:
-                continue
-            for result in by_pair.get((X.id, Z.id), []):
-                key = (left, right, result, mid.id)
-                if key in seen:
-                    continue
-                seen.add(key)
-                net.assert_fact("comp2", (left, right, result))
-                net.assert_fact("comp2_expl", (left, right, result, mid.id))
-
-    after = len(list(net.facts("comp2")))
-    after_expl = len(list(net.facts("comp2_expl")))
+    # X -left-> mid -right-> Z и X -result-> Z: соединение трёх атомов вместо
+    # перебора всех пар рёбер; рёбра — из edge и derived_edge.
+    found = set()
+    for p1, p2, p3 in itertools.product(_EDGE_PREDICATES, repeat=3):
+        goal = And((
+            FactAtom(p1, (_LEFT, _X, _MID)),
+            FactAtom(p2, (_RIGHT, _MID, _Z)),
+            FactAtom(p3, (_RESULT, _X, _Z)),
+        ))
+        for b in query(net, goal):
+            found.add((b[_LEFT], b[_RIGHT], b[_RESULT], b[_MID].id))
+
+    before = net.count("comp2")
+    before_expl = net.count("comp2_expl")
+
+    for left, right, result, mid_id in found:
+        net.assert_fact("comp2", (left, right, result))
+        net.assert_fact("comp2_expl", (left, right, result, mid_id))
+
+    after = net.count("comp2")
+    after_expl = net.count("comp2_expl")
     return (after - before) + (after_expl - before_expl)
 
 
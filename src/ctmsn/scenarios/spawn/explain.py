@@ -5,7 +5,7 @@ from ctmsn.core.network import SemanticNetwork
 
 def explain_comp2(net: SemanticNetwork, left: str, right: str, result: str) -> list[str]:
     lines = []
-    for st in net.facts("comp2_expl"):
+    for st in net.view("comp2_expl"):
         l, r, res, mid = st.args  # type: ignore[misc]
         if l == left and r == right and res == result:
             lines.append(f"{res} = {right} ∘ {left} (через {mid})")
@@ -16,7 +16,7 @@ def explain_comp2(net: SemanticNetwork, left: str, right: str, result: str) -> l
 
 def explain_compN(net: SemanticNetwork, chain: str, result: str) -> list[str]:
     lines = []
-    for st in net.facts("compN_expl"):
+    for st in net.view("compN_expl"):
         ch, res, trace = st.args  # type: ignore[misc]
         if ch == chain and res == result:
             lines.append(f"{result} = {chain} (trace: {trace})")
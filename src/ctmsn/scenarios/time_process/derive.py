@@ -22,10 +22,10 @@ def _all_edges(net: SemanticNetwork) -> list[tuple[str, Concept, Concept, str]]:
     kind ∈ {"edge","derived_edge"}
     """
     out = []
-    for st in net.facts("edge"):
+    for st in net.view("edge"):
         label, src, dst = st.args
         out.append((label, src, dst, "edge"))
-    for st in net.facts("derived_edge"):
+    for st in net.view("derived_edge"):
         label, src, dst = st.args
         out.append((label, src, dst, "derived_edge"))
     return out
@@ -50,7 +50,7 @@ def derive_context_edges(net: SemanticNetwork, mode: str) -> int:
         for l, ss, dd in base:
             if l == label and ss.id == s.id and dd.id == d.id:
                 return True
-        for st in net.facts("derived_edge"):
+        for st in net.view("derived_edge"):
             l2, ss2, dd2 = st.args
             if l2 == label and ss2.id == s.id and dd2.id == d.id:
                 return True
@@ -134,15 +134,15 @@ def apply(net: SemanticNetwork, mode: str) -> dict[str, int]:
     """
     added_edges = derive_context_edges(net, mode=mode)
 
-    before_comp = len(list(net.facts("comp")))
-    before_expl = len(list(net.facts("comp_expl")))
+    before_comp = net.count("comp")
+    before_expl = net.count("comp_expl")
 
     for d in derive_comp(net):
         net.assert_fact("comp", (d.left, d.right, d.result))
         net.assert_fact("comp_expl", (d.left, d.right, d.result, d.mid))
 
-    after_comp = len(list(net.facts("comp")))
-    after_expl = len(list(net.facts("comp_expl")))
+    after_comp = net.count("comp")
+    after_expl = net.count("comp_expl")
 
     return {
         "derived_edges_added": added_edges,
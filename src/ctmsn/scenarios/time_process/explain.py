@@ -8,7 +8,7 @@ def explain_composition(net: SemanticNetwork, left: str, right: str, result: str
     Reads comp_expl facts and formats short explanations.
     """
     lines: list[str] = []
-    for st in net.facts("comp_expl"):
+    for st in net.view("comp_expl"):
         l, r, res, mid = st.args
         if l == left and r == right and res == result:
             lines.append(f"{res} = {right} ∘ {left} (через узел {mid})")
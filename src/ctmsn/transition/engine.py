@@ -7,6 +7,11 @@ from ctmsn.core.concept import Concept
 from ctmsn.core.statement import Statement
 from ctmsn.forcing.conditions import Conditions
 from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.cache import EvalCache
+from ctmsn.logic.incremental import IncrementalEvaluator
+from ctmsn.logic.profile import Profiler
+from ctmsn.logic.tribool import TriBool
+from ctmsn.forcing.result import CheckResult
 from ctmsn.transition.event import Event
 from ctmsn.transition.rule import TransitionRule
 from ctmsn.transition.state import State, StateMode, copy_context, make_state
@@ -34,25 +39,78 @@ class TransitionEngine:
     rules — набор правил перехода.
     invariants — инварианты стабилизации (Conditions); проверяются на каждом шаге.
     max_steps — лимит шагов автономной стабилизации (защита от циклов/тупиков).
+    cache — необязательный EvalCache для гвардов и инвариантов: неизменённые
+    шагом предикаты и переменные не вычисляются заново.
+    incremental — держать гварды и инварианты в IncrementalEvaluator и
+    после шага перевычислять только атомы, затронутые его дельтой фактов.
+    profiler — необязательный logic.profile.Profiler: гварды и инварианты
+    вычисляются через него полностью (cache и incremental не используются).
     """
 
     rules: Sequence[TransitionRule]
     invariants: Conditions = field(default_factory=Conditions)
     max_steps: int = 100
+    cache: EvalCache | None = field(default=None, compare=False)
+    incremental: bool = field(default=False, compare=False)
+    profiler: Profiler | None = field(default=None, compare=False)
+    _inc: IncrementalEvaluator | None = field(default=None, init=False, repr=False, compare=False)
 
     def _ordered(self) -> list[TransitionRule]:
         return sorted(self.rules, key=lambda r: r.priority, reverse=True)
 
+    def _evaluator(self, net, context) -> IncrementalEvaluator:
+        inc = self._inc
+        if inc is None:
+            inc = self._inc = IncrementalEvaluator(net, context)
+            for r in self.rules:
+                inc.watch(r.guard)
+            for c in self.invariants.items:
+                inc.watch(c)
+        elif inc.net is not net or inc.ctx is not context:
+            inc.bind(net, context)
+        return inc
+
     def _first_applicable(
         self, net, context, event: Event | None
     ) -> Optional[TransitionRule]:
+        if self.profiler is not None:
+            for r in self._ordered():
+                if r.on_event is not None and (event is None or event.name != r.on_event):
+                    continue
+                if self.profiler.evaluate(r.guard, net, context) is TriBool.TRUE:
+                    return r
+            return None
+        if self.incremental:
+            inc = self._evaluator(net, context)
+            for r in self._ordered():
+                if r.on_event is not None and (event is None or event.name != r.on_event):
+                    continue
+                if inc.value(r.guard) is TriBool.TRUE:
+                    return r
+            return None
         for r in self._ordered():
-            if r.applies(net, context, event):
+            if r.applies(net, context, event, self.cache):
                 return r
         return None
 
+    def _check(self, net, context) -> CheckResult:
+        if self.profiler is not None:
+            return ForcingEngine(net, profiler=self.profiler).check(context, self.invariants)
+        if not self.incremental:
+            return ForcingEngine(net, self.cache).check(context, self.invariants)
+        inc = self._evaluator(net, context)
+        violated: list[str] = []
+        unknown: list[str] = []
+        for i, c in enumerate(self.invariants.items):
+            v = inc.value(c)
+            if v is TriBool.FALSE:
+                violated.append(f"cond[{i}]")
+            elif v is TriBool.UNKNOWN:
+                unknown.append(f"cond[{i}]")
+        return CheckResult(ok=(not violated), violated=violated, unknown=unknown)
+
     def _classify(self, net, context) -> StateMode:
-        chk = ForcingEngine(net).check(context, self.invariants)
+        chk = self._check(net, context)
         stuck = self._first_applicable(net, context, None) is not None
         if chk.ok and not stuck:
             return StateMode.STABLE
@@ -71,18 +129,20 @@ class TransitionEngine:
             return None
 
         new_net = state.net.copy()
-        before = set(new_net.facts())
-        rule.apply(new_net)
-        after = set(new_net.facts())
+        # Дельта берётся из журнала транзакции — без снимков всех фактов.
+        with new_net.begin() as tx:
+            rule.apply(new_net)
 
-        added_facts = after - before
-        removed_facts = before - after
+        added_facts = tx.added
+        removed_facts = tx.removed
         if not added_facts and not removed_facts:
             # Гвард истинен, но эффект ничего не изменил — неподвижная точка.
             return None
 
-        chk = ForcingEngine(new_net).check(state.context, self.invariants)
         new_context = copy_context(state.context)
+        if self.incremental and self._inc is not None and self._inc.net is state.net:
+            self._inc.bind(new_net, new_context, added=added_facts, removed=removed_facts)
+        chk = self._check(new_net, new_context)
         stuck = self._first_applicable(new_net, new_context, None) is not None
         mode = StateMode.STABLE if (chk.ok and not stuck) else StateMode.TRANSIENT
 
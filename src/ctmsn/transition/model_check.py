@@ -11,11 +11,12 @@ from __future__ import annotations
 
 from collections import deque
 from dataclasses import dataclass
-from typing import Sequence
+from typing import Dict, List, Sequence
 
 from ctmsn.core.network import SemanticNetwork
 from ctmsn.forcing.conditions import Conditions
 from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.cache import EvalCache
 from ctmsn.param.context import Context
 from ctmsn.transition.rule import TransitionRule
 
@@ -38,10 +39,28 @@ class VerifyResult:
     truncated: bool
 
 
-def _state_key(net: SemanticNetwork) -> frozenset:
-    return frozenset(
-        (f.predicate, tuple(getattr(a, "id", a) for a in f.args)) for f in net.facts()
-    )
+class _VisitedStates:
+    """Множество посещённых состояний с ключом по SemanticNetwork.fingerprint().
+
+    Отпечаток обновляется инкрементально, поэтому проверка состояния стоит
+    O(1), а не O(фактов). Коллизии отпечатков разрешаются точным сравнением
+    фактов с состояниями той же корзины.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[int, List[SemanticNetwork]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, net: SemanticNetwork) -> bool:
+        bucket = self._buckets.get(net.fingerprint())
+        return bucket is not None and any(net.view() == other.view() for other in bucket)
+
+    def add(self, net: SemanticNetwork) -> None:
+        self._buckets.setdefault(net.fingerprint(), []).append(net)
+        self._size += 1
 
 
 def check_model(
@@ -51,16 +70,20 @@ def check_model(
     *,
     context: Context | None = None,
     max_states: int = 10000,
+    cache: EvalCache | None = None,
 ) -> VerifyResult:
     """Проверить инварианты во всех достижимых состояниях переходной системы.
 
     Из каждого состояния применяется КАЖДОЕ применимое правило (полный обход
     недетерминизма), что строже одношагового выбора движка. Возвращает первый
-    найденный контрпример (BFS — кратчайший путь).
+    найденный контрпример (BFS — кратчайший путь). cache — необязательный
+    EvalCache: состояния-копии разделяют версии нетронутых предикатов, и
+    гварды/инварианты по ним не вычисляются повторно.
     """
     ctx = context if context is not None else Context()
     start = net.copy()
-    visited: set = {_state_key(start)}
+    visited = _VisitedStates()
+    visited.add(start)
     queue: deque = deque([(start, ())])
     explored = 0
     terminals = 0
@@ -70,7 +93,7 @@ def check_model(
         cur, path = queue.popleft()
         explored += 1
 
-        if not ForcingEngine(cur).check(ctx, invariants).ok:
+        if not ForcingEngine(cur, cache).check(ctx, invariants).ok:
             return VerifyResult(
                 invariant_holds=False,
                 states_explored=explored,
@@ -81,24 +104,23 @@ def check_model(
 
         had_successor = False
         for rule in rules:
-            if not rule.applies(cur, ctx, None):
+            if not rule.applies(cur, ctx, None, cache):
                 continue
             nxt = cur.copy()
-            before = _state_key(nxt)
             try:
-                rule.apply(nxt)
+                with nxt.begin() as tx:
+                    rule.apply(nxt)
             except ValueError:
                 continue  # противоречие при применении — недопустимый переход
-            key = _state_key(nxt)
-            if key == before:
+            if not tx.added and not tx.removed:
                 continue  # неподвижная точка для этого правила
             had_successor = True
-            if key in visited:
+            if nxt in visited:
                 continue
             if len(visited) >= max_states:
                 truncated = True
                 continue
-            visited.add(key)
+            visited.add(nxt)
             queue.append((nxt, path + (rule.name,)))
 
         if not had_successor:
@@ -7,7 +7,8 @@ from ctmsn.core.network import SemanticNetwork
 from ctmsn.core.statement import Statement
 from ctmsn.param.context import Context
 from ctmsn.logic.formula import Formula
-from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.cache import EvalCache
+from ctmsn.logic.compiler import compiled
 from ctmsn.logic.tribool import TriBool
 from ctmsn.transition.event import Event
 
@@ -63,11 +64,14 @@ class TransitionRule:
         net: SemanticNetwork,
         context: Context,
         event: Event | None = None,
+        cache: EvalCache | None = None,
     ) -> bool:
         if self.on_event is not None:
             if event is None or event.name != self.on_event:
                 return False
-        return evaluate(self.guard, net, context) is TriBool.TRUE
+        if cache is not None:
+            return cache.evaluate(self.guard, net, context) is TriBool.TRUE
+        return compiled(self.guard)(net, context) is TriBool.TRUE
 
     def apply(self, net: SemanticNetwork) -> None:
         """Применить эффект к сети (мутирует переданную сеть-копию)."""
@@ -77,5 +81,5 @@ class TransitionRule:
                 net.assert_fact(op.predicate, resolved)
             elif isinstance(op, RetractFact):
                 target = Statement(predicate=op.predicate, args=resolved)
-                if target in net.facts(op.predicate):
+                if net.contains(target):
                     net.remove_fact(target)
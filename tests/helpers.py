@@ -0,0 +1,49 @@
+"""Построители сетей и переменных для тестов.
+
+Общий шаблон тестов: несколько концептов, предикаты с арностями и факты
+над концептами. Файлы с особыми данными (метки, роли, литералы в
+аргументах) собирают сеть сами.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Mapping, Sequence, Tuple
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.store import FactStore
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+
+Fact = Tuple[str, Sequence[str]]
+
+
+def numbered(n: int, prefix: str = "c") -> Tuple[str, ...]:
+    """Идентификаторы c0, c1, ..., c{n-1}."""
+    return tuple(f"{prefix}{i}" for i in range(n))
+
+
+def make_net(
+    concepts: Iterable[str],
+    predicates: Mapping[str, int],
+    facts: Iterable[Fact] = (),
+    *,
+    store: FactStore | None = None,
+) -> SemanticNetwork:
+    """Сеть с концептами (по id), предикатами {имя: арность} и фактами
+    (предикат, id концептов-аргументов)."""
+    net = SemanticNetwork() if store is None else SemanticNetwork(store=store)
+    for cid in concepts:
+        net.add_concept(Concept(id=cid))
+    for name, arity in predicates.items():
+        net.add_predicate(Predicate(name=name, arity=arity))
+    c = net.concepts
+    net.assert_facts((pred, tuple(c[a] for a in args)) for pred, args in facts)
+    return net
+
+
+def concept_vars(net: SemanticNetwork, names: Iterable[str]) -> Tuple[Variable, ...]:
+    """Переменные с доменом из всех концептов сети (в порядке добавления)."""
+    dom = EnumDomain(tuple(net.concepts.values()))
+    return tuple(Variable(n, dom) for n in names)
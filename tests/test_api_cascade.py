@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("fastapi", reason="требует зависимостей apps/api: pip install -r apps/api/requirements.txt")
+pytest.importorskip("sqlalchemy", reason="требует зависимостей apps/api: pip install -r apps/api/requirements.txt")
+
+from ctmsn.core.concept import Concept  # noqa: E402
+from ctmsn.core.predicate import Predicate  # noqa: E402
+from ctmsn.core.network import SemanticNetwork  # noqa: E402
+from ctmsn_api import app as api  # noqa: E402
+from ctmsn_api.sessions import SessionState  # noqa: E402
+
+
+def _state() -> SessionState:
+    net = SemanticNetwork()
+    for cid in ("bird", "penguin", "fly"):
+        net.add_concept(Concept(id=cid))
+    net.add_predicate(Predicate(name="isa", arity=2))
+    net.add_predicate(Predicate(name="has_ability", arity=2))
+    c = net.concepts
+    net.assert_fact("isa", (c["penguin"], c["bird"]))
+    net.assert_fact("has_ability", (c["bird"], c["fly"]))
+    return SessionState(scenario="", mode=None, net=net)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    st = _state()
+    monkeypatch.setattr(api, "check_workspace_access", lambda *a, **kw: None)
+    monkeypatch.setattr(api, "get_session", lambda sid, db: st if sid == "s1" else None)
+    return st
+
+
+def test_cascade_concept(session):
+    res = api.cascade_concept("s1", "bird", user=None, db=None)
+    assert res["count"] == 2
+    assert sorted((f["predicate"], tuple(f["args"])) for f in res["affected_facts"]) == [
+        ("has_ability", ("bird", "fly")),
+        ("isa", ("penguin", "bird")),
+    ]
+    assert api.cascade_concept("s1", "missing", user=None, db=None) == {"count": 0, "affected_facts": []}
+    assert "error" in api.cascade_concept("other", "bird", user=None, db=None)
+
+
+def test_cascade_predicate(session):
+    res = api.cascade_predicate("s1", "isa", user=None, db=None)
+    assert res == {"count": 1, "affected_facts": [{"predicate": "isa", "args": ["penguin", "bird"]}]}
+    assert api.cascade_predicate("s1", "unknown", user=None, db=None) == {"count": 0, "affected_facts": []}
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing import BacktrackingStrategy, BruteEnumStrategy
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net
+
+COLORS = EnumDomain(("r", "g", "b"))
+
+
+def _make_net() -> SemanticNetwork:
+    return make_net("abc", {"has_p": 1}, [("has_p", "b")])
+
+
+def _coloring(n: int, edges):
+    xs = [Variable(f"x{i}", COLORS) for i in range(n)]
+    conds = Conditions(tuple(Not(EqAtom(xs[i], xs[j])) for i, j in edges))
+    phi = And(tuple(Or(tuple(EqAtom(x, c) for c in ("r", "g", "b"))) for x in xs))
+    return xs, phi, conds
+
+
+def test_finds_solution_beyond_max_branch():
+    net = _make_net()
+    n = 8
+    xs, phi, conds = _coloring(n, [(i, (i + 1) % n) for i in range(n)])
+    eng = ForcingEngine(net)
+    assert eng.force(Context(), phi, conds, BruteEnumStrategy()).status is TriBool.UNKNOWN
+    for mrv in (True, False):
+        res = eng.force(Context(), phi, conds, BacktrackingStrategy(mrv=mrv))
+        assert res.status is TriBool.TRUE
+        values = [res.context.get(x) for x in xs]
+        assert all(values[i] != values[(i + 1) % n] for i in range(n))
+
+
+def test_infeasible_is_refuted_early():
+    net = _make_net()
+    xs, phi, conds = _coloring(4, list(itertools.combinations(range(4), 2)))
+    strategy = BacktrackingStrategy()
+    res = ForcingEngine(net).force(Context(), phi, conds, strategy)
+    assert res.status is TriBool.FALSE
+    assert res.nodes is not None and res.nodes < 3 ** 4
+    assert strategy.nodes == 0  # считается копия для задачи, а не сама стратегия
+
+
+def test_mrv_assigns_most_constrained_first():
+    net = _make_net()
+    xs = list(concept_vars(net, [f"v{i}" for i in range(6)]))
+    # v5 ограничена фактом, остальные цепочкой равенств от неё
+    phi = FactAtom("has_p", (xs[5],))
+    conds = Conditions(tuple(EqAtom(xs[i], xs[i + 1]) for i in range(5)))
+    res = ForcingEngine(net).force(Context(), phi, conds, BacktrackingStrategy())
+    b = net.concepts["b"]
+    assert res.status is TriBool.TRUE
+    assert res.context.as_dict() == {x.name: b for x in xs}
+    assert res.nodes == 6
+
+
+def test_without_goal_enumerates_like_brute():
+    xs = [Variable(f"x{i}", COLORS) for i in range(3)]
+    brute = list(BruteEnumStrategy().candidates(Context(), xs))
+    static = list(BacktrackingStrategy(mrv=False).candidates(Context(), xs))
+    assert static == brute
+    assert sorted(map(repr, BacktrackingStrategy().candidates(Context(), xs))) == sorted(map(repr, brute))
+
+
+def test_agrees_with_brute_force():
+    net = _make_net()
+    rng = random.Random(21)
+    for _ in range(40):
+        n = rng.randint(2, 4)
+        pairs = list(itertools.combinations(range(n), 2))
+        edges = rng.sample(pairs, rng.randint(1, len(pairs)))
+        xs, phi, conds = _coloring(n, edges)
+        ctx = Context()
+        if rng.random() < 0.5:
+            ctx.set(xs[0], "g")
+        eng = ForcingEngine(net)
+        brute = eng.force(ctx, phi, conds, BruteEnumStrategy())
+        back = eng.force(ctx, phi, conds, BacktrackingStrategy())
+        assert back.status is brute.status
+        if back.status is TriBool.TRUE:
+            assert eng.forces(back.context, phi, conds) is TriBool.TRUE
+
+
+def test_max_nodes_gives_unknown():
+    net = _make_net()
+    xs, phi, conds = _coloring(6, list(itertools.combinations(range(6), 2)))
+    res = ForcingEngine(net).force(Context(), phi, conds, BacktrackingStrategy(max_nodes=5, mrv=False))
+    assert res.status is TriBool.UNKNOWN
+    assert "max_nodes=5" in res.explanation
+    assert res.nodes == 6
+    assert ForcingEngine(net).force(Context(), phi, conds, BruteEnumStrategy(max_branch=None)).nodes is None
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import pytest
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+from ctmsn.core.store import CompactFactStore, IndexedFactStore
+from ctmsn.io.serializer import dump_network, load_network
+
+from helpers import make_net
+
+
+def _make_net(store_cls=IndexedFactStore) -> SemanticNetwork:
+    predicates = {"has_ability": 2, "lacks_ability": 2, "isa": 2}
+    return make_net(("penguin", "fly", "swim"), predicates, store=store_cls())
+
+
+@pytest.mark.parametrize("store_cls", [IndexedFactStore, CompactFactStore])
+def test_bulk_matches_sequential(store_cls):
+    net = _make_net(store_cls)
+    p, fly, swim = (net.concepts[i] for i in ("penguin", "fly", "swim"))
+    added = net.assert_facts([
+        ("has_ability", (p, swim)),
+        Statement("lacks_ability", (p, fly)),
+        ("isa", [p, fly]),
+        ("has_ability", (p, swim)),  # повтор внутри пачки
+    ])
+    assert len(added) == 3
+    assert net.store.count() == 3
+    assert list(net.match("isa", (p, None))) == [Statement("isa", (p, fly))]
+    # Повтор уже существующего факта ничего не добавляет.
+    assert net.assert_facts([("isa", (p, fly))]) == []
+
+
+def test_contradiction_in_batch_raises_atomically():
+    net = _make_net()
+    p, fly = net.concepts["penguin"], net.concepts["fly"]
+    with pytest.raises(ValueError, match="Противоречие"):
+        net.assert_facts([("has_ability", (p, fly)), ("lacks_ability", (p, fly))])
+    assert net.store.count() == 0
+
+
+def test_contradiction_with_existing_fact():
+    net = _make_net()
+    p, fly = net.concepts["penguin"], net.concepts["fly"]
+    net.assert_fact("lacks_ability", (p, fly))
+    with pytest.raises(ValueError, match="lacks_ability"):
+        net.assert_facts([("has_ability", (p, fly))])
+
+
+def test_errors_list_collects_and_skips():
+    net = _make_net()
+    p, fly, swim = (net.concepts[i] for i in ("penguin", "fly", "swim"))
+    errors: list[str] = []
+    added = net.assert_facts(
+        [
+            ("has_ability", (p, fly)),
+            ("lacks_ability", (p, fly)),
+            ("isa", (p,)),
+            ("lacks_ability", (p, swim)),
+        ],
+        errors=errors,
+    )
+    assert [st.predicate for st in added] == ["has_ability", "lacks_ability"]
+    assert len(errors) == 2
+    assert errors[0].startswith("Противоречие")
+    assert errors[1].startswith("Arity mismatch")
+
+
+def test_check_contradictions_disabled():
+    net = _make_net()
+    p, fly = net.concepts["penguin"], net.concepts["fly"]
+    net.assert_facts([("has_ability", (p, fly)), ("lacks_ability", (p, fly))], check_contradictions=False)
+    assert net.store.count() == 2
+
+
+def test_unknown_predicate_raises_key_error():
+    net = _make_net()
+    with pytest.raises(KeyError):
+        net.assert_facts([("missing", ("x",))])
+
+
+def test_bulk_is_journaled():
+    net = _make_net()
+    p, fly = net.concepts["penguin"], net.concepts["fly"]
+    tx = net.begin()
+    net.assert_facts([("isa", (p, fly))])
+    tx.rollback()
+    assert net.store.count() == 0
+
+
+def test_load_network_non_strict_skips_contradictions():
+    net = _make_net()
+    p, fly = net.concepts["penguin"], net.concepts["fly"]
+    net.assert_fact("has_ability", (p, fly))
+    data = dump_network(net)
+    data["facts"].append({"predicate": "lacks_ability", "args": ["penguin", "fly"]})
+    with pytest.raises(ValueError):
+        load_network(data, strict=True)
+    loaded = load_network(data, strict=False)
+    assert {s.predicate for s in loaded.facts()} == {"has_ability"}
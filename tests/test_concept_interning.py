@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import copy
+import pickle
+
+import pytest
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+
+
+def _make_net() -> SemanticNetwork:
+    net = SemanticNetwork()
+    net.add_concept(Concept(id="a", label="A", meta={"k": 1}))
+    net.add_predicate(Predicate(name="p", arity=2))
+    return net
+
+
+class TestValueObjects:
+    def test_concept_equality_by_id(self):
+        assert Concept("a", "A", meta={"x": 1}) == Concept("a", "other")
+        assert Concept("a") != Concept("b")
+        assert Concept("a") != "a"
+        assert hash(Concept("a", "A")) == hash(Concept("a"))
+
+    @pytest.mark.parametrize(
+        "obj",
+        [Concept("a", "A"), Predicate("p", 2), Statement("p", (Concept("a"), 1))],
+    )
+    def test_slots_and_frozen(self, obj):
+        assert not hasattr(obj, "__dict__")
+        with pytest.raises(AttributeError):
+            obj.extra = 1  # type: ignore[attr-defined]
+        with pytest.raises(AttributeError):
+            setattr(obj, obj.__slots__[0], "x")
+
+    @pytest.mark.parametrize(
+        "obj",
+        [Concept("a", "A", tags=frozenset({"t"})), Predicate("p", 2, ("x", "y")),
+         Statement("p", (Concept("a"), 1))],
+    )
+    def test_pickle_and_copy(self, obj):
+        restored = pickle.loads(pickle.dumps(obj))
+        assert restored == obj
+        assert hash(restored) == hash(obj)
+        assert copy.deepcopy(obj) == obj
+
+    def test_statement_equality(self):
+        a = Concept("a")
+        assert Statement("p", (a, 1)) == Statement("p", (Concept("a", "A"), 1))
+        assert Statement("p", (a, 1)) != Statement("p", (a, 2))
+        assert Statement("p", (a, 1)) != Statement("q", (a, 1))
+
+
+class TestInterning:
+    def test_assert_fact_uses_canonical_concept(self):
+        net = _make_net()
+        canonical = net.concepts["a"]
+        st = net.assert_fact("p", (Concept("a"), 1))
+        assert st.args[0] is canonical
+        stored = next(iter(net.view("p")))
+        assert stored.args[0] is canonical
+
+    def test_assert_facts_interns(self):
+        net = _make_net()
+        added = net.assert_facts([Statement("p", (Concept("a"), 1)), ("p", (Concept("a"), 2))])
+        assert all(st.args[0] is net.concepts["a"] for st in added)
+
+    def test_intern(self):
+        net = _make_net()
+        assert net.intern(Concept("a")) is net.concepts["a"]
+        unknown = Concept("zzz")
+        assert net.intern(unknown) is unknown
+        assert net.intern("a") == "a"
+
+    def test_duplicate_by_id_is_not_added_twice(self):
+        net = _make_net()
+        net.assert_fact("p", (Concept("a"), 1))
+        net.assert_fact("p", (Concept("a", "different label"), 1))
+        assert net.count("p") == 1
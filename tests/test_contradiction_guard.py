@@ -51,3 +51,56 @@ def test_non_has_lacks_no_conflict():
     fly = net.concepts["ability_fly"]
     net.assert_fact("isa", (penguin, fly))
     # no counterpart predicate — should not raise
+
+
+def test_complement_table_follows_predicates():
+    net = _make_net()
+    assert net.complement("has_ability") == "lacks_ability"
+    assert net.complement("lacks_ability") == "has_ability"
+    assert net.complement("isa") is None
+    net.remove_predicate("lacks_ability")
+    assert net.complement("has_ability") is None
+    net.add_predicate(Predicate(name="lacks_ability", arity=2))
+    assert net.complement("has_ability") == "lacks_ability"
+
+
+def test_complement_table_restored_on_rollback():
+    net = _make_net()
+    with net.begin() as tx:
+        net.remove_predicate("lacks_ability")
+        tx.rollback()
+    assert net.complement("has_ability") == "lacks_ability"
+    assert net.copy().complement("lacks_ability") == "has_ability"
+
+
+def test_complement_requires_both_declared():
+    net = SemanticNetwork()
+    net.add_concept(Concept(id="a"))
+    net.add_predicate(Predicate(name="has_x", arity=1))
+    net.assert_fact("has_x", (net.concepts["a"],))
+    assert net.complement("has_x") is None
+    net.add_predicate(Predicate(name="lacks_x", arity=1))
+    with pytest.raises(ValueError, match="Противоречие"):
+        net.assert_fact("lacks_x", (net.concepts["a"],))
+
+
+def test_find_contradictions():
+    net = _make_net()
+    penguin = net.concepts["penguin"]
+    fly = net.concepts["ability_fly"]
+    swim = net.concepts["ability_swim"]
+    assert net.find_contradictions() == []
+    net.assert_facts(
+        [
+            ("has_ability", (penguin, fly)),
+            ("lacks_ability", (penguin, fly)),
+            ("lacks_ability", (penguin, swim)),
+            ("has_ability", (fly, swim)),
+        ],
+        check_contradictions=False,
+    )
+    pairs = net.find_contradictions()
+    assert len(pairs) == 1
+    has, lacks = pairs[0]
+    assert has.predicate == "has_ability" and lacks.predicate == "lacks_ability"
+    assert has.args == lacks.args == (penguin, fly)
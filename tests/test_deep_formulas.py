@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import random
+import sys
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.io.formula_io import formula_from_dict, formula_to_dict
+from ctmsn.logic.cache import EvalCache
+from ctmsn.logic.compiler import compile_formula, compiled
+from ctmsn.logic.dag import DagEvaluator
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import (
+    And,
+    EqAtom,
+    FactAtom,
+    Formula,
+    Implies,
+    Not,
+    Or,
+    collect_variables,
+    formula_depth,
+)
+from ctmsn.logic.planner import plan
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+
+from helpers import make_net
+
+DEPTH = sys.getrecursionlimit() * 20
+
+
+def _make_net() -> SemanticNetwork:
+    return make_net("ab", {"has_p": 1}, [("has_p", "a")])
+
+
+def _not_chain(inner: Formula, depth: int) -> Formula:
+    f = inner
+    for _ in range(depth):
+        f = Not(f)
+    return f
+
+
+def test_deep_not_chain():
+    net = _make_net()
+    a = net.concepts["a"]
+    atom = FactAtom("has_p", (a,))
+    assert evaluate(_not_chain(atom, DEPTH), net, Context()) is TriBool.TRUE
+    assert evaluate(_not_chain(atom, DEPTH + 1), net, Context()) is TriBool.FALSE
+
+
+def test_deep_implies_chain_with_unknown():
+    net = _make_net()
+    a = net.concepts["a"]
+    x = Variable("x", EnumDomain((a,)))
+    f: Formula = FactAtom("has_p", (x,))
+    for _ in range(DEPTH):
+        f = Implies(FactAtom("has_p", (a,)), f)
+    assert evaluate(f, net, Context()) is TriBool.UNKNOWN
+    ctx = Context()
+    ctx.set(x, a)
+    assert evaluate(f, net, ctx) is TriBool.TRUE
+    assert collect_variables(f) == frozenset({x})
+
+
+def test_deep_nested_and_or():
+    net = _make_net()
+    a, b = net.concepts["a"], net.concepts["b"]
+    f: Formula = FactAtom("has_p", (a,))
+    for i in range(DEPTH):
+        f = And((f, EqAtom(a, a))) if i % 2 else Or((FactAtom("has_p", (b,)), f))
+    assert evaluate(f, net, Context()) is TriBool.TRUE
+
+
+def test_wide_and_short_circuits():
+    net = _make_net()
+    a, b = net.concepts["a"], net.concepts["b"]
+    items = [FactAtom("has_p", (a,))] * 5000
+    assert evaluate(And(tuple(items)), net, Context()) is TriBool.TRUE
+    # FALSE после UNKNOWN: ответ FALSE, остальные операнды не нужны
+    x = Variable("x", EnumDomain((a,)))
+    f = And((FactAtom("has_p", (x,)), FactAtom("has_p", (b,))) + tuple(items))
+    assert evaluate(f, net, Context()) is TriBool.FALSE
+    assert evaluate(Or((FactAtom("has_p", (x,)),) + tuple(items)), net, Context()) is TriBool.TRUE
+    assert evaluate(And(()), net, Context()) is TriBool.TRUE
+    assert evaluate(Or(()), net, Context()) is TriBool.FALSE
+
+
+def test_dict_round_trip_deep():
+    net = _make_net()
+    a = net.concepts["a"]
+    x = Variable("x", EnumDomain((a,)))
+    f: Formula = FactAtom("has_p", (x,))
+    for i in range(DEPTH):
+        f = Implies(EqAtom(x, a), f) if i % 3 == 0 else (Not(f) if i % 3 == 1 else Or((f, And(()))))
+    data = formula_to_dict(f)
+    back = formula_from_dict(data, net, {"x": x})
+    # Сравнение dict/dataclass рекурсивно, поэтому структуру сверяем вдоль цепочки.
+    node, orig = back, f
+    for _ in range(DEPTH):
+        assert type(node) is type(orig)
+        if isinstance(node, Implies):
+            assert node.left == orig.left
+            node, orig = node.right, orig.right
+        elif isinstance(node, Not):
+            node, orig = node.inner, orig.inner
+        else:
+            assert node.items[1] == And(())
+            node, orig = node.items[0], orig.items[0]
+    assert node == orig
+    ctx = Context()
+    ctx.set(x, a)
+    assert evaluate(back, net, ctx) is evaluate(f, net, ctx)
+
+
+def _random_formula(rng: random.Random, terms, depth: int) -> Formula:
+    if depth == 0 or rng.random() < 0.25:
+        if rng.random() < 0.5:
+            return FactAtom("has_p", (rng.choice(terms),))
+        return EqAtom(rng.choice(terms), rng.choice(terms))
+    kind = rng.choice(("not", "and", "or", "implies"))
+    if kind == "not":
+        return Not(_random_formula(rng, terms, depth - 1))
+    if kind == "implies":
+        return Implies(_random_formula(rng, terms, depth - 1), _random_formula(rng, terms, depth - 1))
+    items = tuple(_random_formula(rng, terms, depth - 1) for _ in range(rng.randint(0, 3)))
+    return And(items) if kind == "and" else Or(items)
+
+
+def test_matches_compiled_on_random_formulas():
+    net = _make_net()
+    a, b = net.concepts["a"], net.concepts["b"]
+    x = Variable("x", EnumDomain((a, b)))
+    y = Variable("y", EnumDomain((a, b)))
+    rng = random.Random(19)
+    contexts = [Context()]
+    for vx, vy in ((a, None), (b, a), (None, b)):
+        ctx = Context()
+        if vx is not None:
+            ctx.set(x, vx)
+        if vy is not None:
+            ctx.set(y, vy)
+        contexts.append(ctx)
+    for _ in range(300):
+        f = _random_formula(rng, [a, b, x, y], 5)
+        for ctx in contexts:
+            assert evaluate(f, net, ctx) is compiled(f)(net, ctx)
+
+
+def _deep_goal(net: SemanticNetwork):
+    a, b = net.concepts["a"], net.concepts["b"]
+    x = Variable("x", EnumDomain((b, a)))
+    # Чётное число отрицаний: цепочка равна has_p(x), истинной только при x = a.
+    return x, _not_chain(FactAtom("has_p", (x,)), 5000)
+
+
+def test_forcing_engine_on_deep_formulas():
+    net = _make_net()
+    x, deep = _deep_goal(net)
+    a = net.concepts["a"]
+    ctx = Context()
+    ctx.set(x, a)
+    assert ForcingEngine(net).check(ctx, Conditions((deep,))).ok
+    for eng in (ForcingEngine(net), ForcingEngine(net, cache=EvalCache()), ForcingEngine(net, reorder=True)):
+        res = eng.force(Context(), deep, Conditions((EqAtom(x, x),)))
+        assert res.status is TriBool.TRUE
+        assert res.context.get(x) == a
+
+
+def test_plan_and_compile_deep_formulas():
+    net = _make_net()
+    x, deep = _deep_goal(net)
+    a, b = net.concepts["a"], net.concepts["b"]
+    planned = plan(deep, net)
+    assert formula_depth(planned) == formula_depth(deep)
+    for value, expected in ((a, TriBool.TRUE), (b, TriBool.FALSE)):
+        ctx = Context()
+        ctx.set(x, value)
+        assert evaluate(planned, net, ctx) is expected
+        assert compiled(deep)(net, ctx) is expected
+        assert compile_formula(deep)(net, ctx) is expected
+        assert EvalCache().evaluate(deep, net, ctx) is expected
+        assert DagEvaluator((deep, Not(deep))).evaluate(net, ctx) == (expected, evaluate(Not(deep), net, ctx))
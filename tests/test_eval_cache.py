@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import pytest
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.cache import EvalCache, formula_dependencies
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+from ctmsn.transition import (
+    AddFact,
+    RetractFact,
+    TransitionEngine,
+    TransitionRule,
+    check_model,
+    invariants,
+    make_state,
+)
+
+from helpers import concept_vars, make_net
+
+
+def _make_net() -> SemanticNetwork:
+    return make_net("abc", {"knows": 2, "mark": 1}, [("knows", "ab")])
+
+
+class TestVersions:
+    def test_version_changes_only_for_touched_predicate(self):
+        net = _make_net()
+        k, m = net.version("knows"), net.version("mark")
+        net.assert_fact("mark", (net.concepts["a"],))
+        assert net.version("knows") == k
+        assert net.version("mark") != m
+
+    def test_copies_share_versions_until_mutated(self):
+        net = _make_net()
+        cp = net.copy()
+        assert cp.version("knows") == net.version("knows")
+        cp.assert_fact("knows", (net.concepts["b"], net.concepts["c"]))
+        assert cp.version("knows") != net.version("knows")
+
+    def test_unrelated_networks_never_share_versions(self):
+        assert _make_net().version("mark") != _make_net().version("mark")
+
+
+class TestEvalCache:
+    def test_repeat_is_hit(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        f = And((FactAtom("knows", (x, y)), Not(EqAtom(x, y))))
+        ctx = Context()
+        ctx.set(x, net.concepts["a"])
+        ctx.set(y, net.concepts["b"])
+        cache = EvalCache()
+        assert cache.evaluate(f, net, ctx) is TriBool.TRUE
+        misses = cache.stats().misses
+        assert cache.evaluate(f, net, ctx) is TriBool.TRUE
+        assert cache.stats().misses == misses
+        assert cache.stats().hits == 1
+
+    def test_only_relevant_variables_invalidate(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        atom = FactAtom("mark", (x,))
+        f = And((atom, FactAtom("knows", (x, y))))
+        cache = EvalCache()
+        ctx = Context()
+        ctx.set(x, net.concepts["a"])
+        ctx.set(y, net.concepts["b"])
+        cache.evaluate(f, net, ctx)
+        ctx2 = ctx.extend({y: net.concepts["c"]})
+        hits = cache.hits
+        cache.evaluate(f, net, ctx2)
+        # Атом mark(x) не зависит от y — взят из кеша.
+        assert cache.hits == hits + 1
+
+    def test_fact_change_invalidates(self):
+        net = _make_net()
+        f = FactAtom("mark", (net.concepts["a"],))
+        cache = EvalCache()
+        assert cache.evaluate(f, net, Context()) is TriBool.FALSE
+        net.assert_fact("mark", (net.concepts["a"],))
+        assert cache.evaluate(f, net, Context()) is TriBool.TRUE
+        net.remove_fact(next(iter(net.view("mark"))))
+        assert cache.evaluate(f, net, Context()) is TriBool.FALSE
+
+    def test_lacks_reads_has_version(self):
+        net = SemanticNetwork()
+        net.add_concept(Concept(id="a"))
+        net.add_predicate(Predicate(name="has_x", arity=1))
+        f = FactAtom("lacks_x", (net.concepts["a"],))
+        cache = EvalCache()
+        assert cache.evaluate(f, net, Context()) is TriBool.TRUE
+        net.assert_fact("has_x", (net.concepts["a"],))
+        assert cache.evaluate(f, net, Context()) is TriBool.FALSE
+
+    def test_lru_eviction(self):
+        net = _make_net()
+        cache = EvalCache(maxsize=2)
+        atoms = [FactAtom("mark", (c,)) for c in net.concepts.values()]
+        for a in atoms:
+            cache.evaluate(a, net, Context())
+        st = cache.stats()
+        assert st.size == 2 and st.evictions == 1
+        with pytest.raises(ValueError):
+            EvalCache(maxsize=0)
+
+    def test_unhashable_values_bypass_cache(self):
+        net = _make_net()
+        v = Variable("v", EnumDomain(([1],)))
+        f = EqAtom(v, v)
+        ctx = Context(_values={"v": [1]})
+        cache = EvalCache()
+        assert cache.evaluate(f, net, ctx) is evaluate(f, net, ctx)
+        assert len(cache) == 0
+
+
+def test_formula_dependencies():
+    net = _make_net()
+    x, y = concept_vars(net, "xy")
+    f = Or((FactAtom("knows", (x, None)), Not(FactAtom("lacks_mark", (y,))), EqAtom(x, net.concepts["a"])))
+    assert formula_dependencies(f) == (("knows", "has_mark"), ("x", "y"))
+    assert formula_dependencies(EqAtom(net.concepts["a"], net.concepts["b"])) == ((), ())
+    with pytest.raises(TypeError):
+        formula_dependencies(object())  # type: ignore[arg-type]
+
+
+def test_forcing_engine_with_cache_matches():
+    net = _make_net()
+    x, y = concept_vars(net, "xy")
+    phi = FactAtom("knows", (x, y))
+    conds = Conditions((Not(EqAtom(x, y)),))
+    cache = EvalCache()
+    plain = ForcingEngine(net).force(Context(), phi, conds)
+    cached = ForcingEngine(net, cache=cache).force(Context(), phi, conds)
+    assert plain.status is cached.status is TriBool.TRUE
+    assert cached.context.as_dict() == plain.context.as_dict()
+    misses = cache.stats().misses
+    again = ForcingEngine(net, cache=cache).force(Context(), phi, conds)
+    assert again.context.as_dict() == plain.context.as_dict()
+    assert cache.stats().misses == misses
+
+
+def test_transition_engine_and_model_checker_with_cache():
+    net = SemanticNetwork()
+    for cid in ("obj", "a", "b", "c"):
+        net.add_concept(Concept(id=cid))
+    net.add_predicate(Predicate(name="at", arity=2))
+    obj, a, b, c = (net.concepts[i] for i in ("obj", "a", "b", "c"))
+    net.assert_fact("at", (obj, a))
+    rules = [
+        TransitionRule(
+            name=f"{src.id}->{dst.id}",
+            guard=FactAtom("at", (obj, src)),
+            effect=(RetractFact("at", ("obj", src.id)), AddFact("at", ("obj", dst.id))),
+        )
+        for src, dst in ((a, b), (b, c))
+    ]
+    inv = invariants(Or(tuple(FactAtom("at", (obj, s)) for s in (a, b, c))))
+    cache = EvalCache()
+    engine = TransitionEngine(rules=rules, invariants=inv, cache=cache)
+    trace = engine.run_to_fixpoint(make_state(net))
+    assert trace.convergence_steps == 2
+    assert cache.stats().hits > 0
+    res = check_model(net, rules, inv, cache=EvalCache())
+    assert res.invariant_holds and res.states_explored == 3
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.forcing.strategy import BruteEnumStrategy
+from ctmsn.logic.batch import evaluate_many, evaluate_product, first_true
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Implies, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+
+from helpers import concept_vars, make_net
+
+
+def _make_net() -> SemanticNetwork:
+    return make_net("abc", {"p": 1, "r": 2}, [("p", "a"), ("r", "ab"), ("r", "bc")])
+
+
+def _random_formula(rng, atoms, depth=3):
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(atoms)
+    kind = rng.choice(("not", "and", "or", "implies"))
+    if kind == "not":
+        return Not(_random_formula(rng, atoms, depth - 1))
+    if kind == "implies":
+        return Implies(_random_formula(rng, atoms, depth - 1), _random_formula(rng, atoms, depth - 1))
+    items = tuple(_random_formula(rng, atoms, depth - 1) for _ in range(rng.randint(0, 3)))
+    return And(items) if kind == "and" else Or(items)
+
+
+def _contexts(net, x, y):
+    values = [None] + list(net.concepts.values())
+    out = []
+    for vx, vy in itertools.product(values, repeat=2):
+        ctx = Context()
+        if vx is not None:
+            ctx.set(x, vx)
+        if vy is not None:
+            ctx.set(y, vy)
+        out.append(ctx)
+    return out
+
+
+class TestEvaluateMany:
+    def test_matches_evaluate_on_random_formulas(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        a = net.concepts["a"]
+        atoms = [
+            FactAtom("p", (x,)),
+            FactAtom("lacks_p", (y,)),
+            FactAtom("r", (x, y)),
+            FactAtom("r", (a, y)),
+            EqAtom(x, y),
+            EqAtom(x, a),
+        ]
+        contexts = _contexts(net, x, y)
+        rng = random.Random(7)
+        for _ in range(200):
+            f = _random_formula(rng, atoms)
+            expected = [evaluate(f, net, ctx) for ctx in contexts]
+            assert evaluate_many(f, net, contexts, use_numpy=False) == expected
+
+    def test_atom_evaluated_once_per_binding(self, monkeypatch):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        calls = []
+        contains = net.store.contains
+        monkeypatch.setattr(net.store, "contains", lambda st: calls.append(st) or contains(st))
+        contexts = [Context(_values={"x": net.concepts["a"], "y": c}) for c in net.concepts.values()] * 10
+        res = evaluate_many(FactAtom("p", (x,)), net, contexts, use_numpy=False)
+        assert res == [TriBool.TRUE] * 30
+        assert len(calls) == 1
+
+    def test_empty_and_unhashable(self):
+        net = _make_net()
+        x, _y = concept_vars(net, "xy")
+        assert evaluate_many(FactAtom("p", (x,)), net, []) == []
+        ctx = Context(_values={"x": ["unhashable"]})
+        assert evaluate_many(EqAtom(x, "z"), net, [ctx]) == [TriBool.FALSE]
+
+    def test_product_order_matches_itertools(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        f = FactAtom("r", (x, y))
+        dom = list(net.concepts.values())
+        codes = evaluate_product(f, net, Context(), [("x", dom), ("y", dom)], use_numpy=False)
+        expected = [
+            evaluate(f, net, Context(_values={"x": vx, "y": vy}))
+            for vx, vy in itertools.product(dom, dom)
+        ]
+        assert [(TriBool.FALSE, TriBool.UNKNOWN, TriBool.TRUE)[c] for c in codes] == expected
+        assert first_true(codes) == 1  # (a, b)
+
+
+class TestBatchForce:
+    def test_same_result_as_sequential(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        phi = FactAtom("r", (x, y))
+        conds = Conditions().add(Not(FactAtom("p", (x,))))
+        eng = ForcingEngine(net)
+        seq = eng.force(Context(), phi, conds)
+        bat = eng.force(Context(), phi, conds, batch=True)
+        assert bat.status is seq.status is TriBool.TRUE
+        assert bat.context.as_dict() == seq.context.as_dict()
+        assert bat.explanation == seq.explanation
+
+    def test_no_solution_and_max_branch(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        eng = ForcingEngine(net)
+        phi = And((FactAtom("r", (x, y)), FactAtom("r", (y, x))))
+        assert eng.force(Context(), phi, Conditions(), batch=True).status is TriBool.FALSE
+        res = eng.force(Context(), phi, Conditions(), BruteEnumStrategy(max_branch=4), batch=True)
+        assert res.status is TriBool.UNKNOWN
+        assert "max_branch" in res.explanation
+
+
+class TestNumpyPath:
+    def test_numpy_matches_python(self):
+        pytest.importorskip("numpy", reason="требует extras: pip install -e '.[experiment]'")
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        atoms = [FactAtom("p", (x,)), FactAtom("r", (x, y)), EqAtom(x, y)]
+        contexts = _contexts(net, x, y)
+        rng = random.Random(11)
+        for _ in range(50):
+            f = _random_formula(rng, atoms)
+            assert evaluate_many(f, net, contexts, use_numpy=True) == evaluate_many(f, net, contexts, use_numpy=False)
+
+    def test_use_numpy_without_numpy_raises(self, monkeypatch):
+        import ctmsn.logic.batch as batch
+
+        monkeypatch.setattr(batch, "HAS_NUMPY", False)
+        with pytest.raises(ImportError, match="experiment"):
+            evaluate_many(FactAtom("p", ()), _make_net(), [Context()], use_numpy=True)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import pytest
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+from ctmsn.core.store import CompactFactStore, IndexedFactStore
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import FactAtom
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+
+STORES = [IndexedFactStore, CompactFactStore]
+
+
+def _make_net(store_cls) -> SemanticNetwork:
+    net = SemanticNetwork(store=store_cls())
+    for cid in ("a", "b", "c"):
+        net.add_concept(Concept(id=cid, label=cid.upper()))
+    net.add_predicate(Predicate(name="edge", arity=3))
+    net.add_predicate(Predicate(name="mark", arity=1))
+    a, b, c = (net.concepts[i] for i in ("a", "b", "c"))
+    net.assert_fact("edge", ("f", a, b))
+    net.assert_fact("edge", ("g", a, c))
+    net.assert_fact("edge", ("f", b, c))
+    net.assert_fact("mark", (7,))
+    return net
+
+
+def _edges(net: SemanticNetwork) -> set:
+    return {(s.args[0], s.args[1].id, s.args[2].id) for s in net.facts("edge")}
+
+
+@pytest.mark.parametrize("store_cls", STORES)
+class TestFactStores:
+    def test_facts_and_count(self, store_cls):
+        net = _make_net(store_cls)
+        assert _edges(net) == {("f", "a", "b"), ("g", "a", "c"), ("f", "b", "c")}
+        assert net.store.count() == 4
+        assert net.store.count("edge") == 3
+        assert net.store.count("missing") == 0
+        # Повторный assert не дублирует факт.
+        net.assert_fact("edge", ("f", net.concepts["a"], net.concepts["b"]))
+        assert net.store.count("edge") == 3
+
+    def test_store_skips_duplicates(self, store_cls):
+        a, b = Concept(id="a"), Concept(id="b")
+        e1, e2 = Statement("edge", ("f", a, b)), Statement("edge", ("g", a, b))
+        flag = Statement("flag", (7,))
+        store = store_cls()
+        store.add(e1)
+        store.add(e1)
+        store.add_many([e1, e2, e2, flag, flag])
+        store.add(flag)
+        assert store.count() == 3
+        assert store.count("edge") == 2 and store.count("flag") == 1
+        assert sorted(st.args[0] for st in store.facts("edge")) == ["f", "g"]
+        store.discard(e2)
+        assert store.count() == 2 and not store.contains(e2)
+
+    def test_statements_materialize_with_concepts(self, store_cls):
+        net = _make_net(store_cls)
+        st = next(net.match("edge", ("g", None, None)))
+        assert st == Statement("edge", ("g", net.concepts["a"], net.concepts["c"]))
+        assert isinstance(st.args[1], Concept) and st.args[1].label == "A"
+        assert [s.args for s in net.facts("mark")] == [(7,)]
+
+    def test_match_and_evaluate(self, store_cls):
+        net = _make_net(store_cls)
+        a, b, c = (net.concepts[i] for i in ("a", "b", "c"))
+        assert {s.args[0] for s in net.match("edge", (None, a, None))} == {"f", "g"}
+        assert list(net.match("edge", ("g", b, None))) == []
+        assert list(net.match("edge", (None, "a", None))) == []
+        ctx = Context()
+        assert evaluate(FactAtom("edge", ("f", b, c)), net, ctx) is TriBool.TRUE
+        assert evaluate(FactAtom("edge", ("f", c, b)), net, ctx) is TriBool.FALSE
+
+    def test_removals_and_replace(self, store_cls):
+        net = _make_net(store_cls)
+        a, b = net.concepts["a"], net.concepts["b"]
+        net.remove_fact(Statement("edge", ("f", a, b)))
+        assert ("f", "a", "b") not in _edges(net)
+        net.replace_concept("c", Concept(id="c", label="new"))
+        labels = {s.args[2].label for s in net.match("edge", (None, None, net.concepts["c"]))}
+        assert labels == {"new"}
+        removed = net.remove_concept("a")
+        assert len(removed) == 1
+        assert _edges(net) == {("f", "b", "c")}
+        net.remove_predicate("edge")
+        assert net.store.count() == 1
+
+    def test_fork_is_independent(self, store_cls):
+        net = _make_net(store_cls)
+        cp = net.copy()
+        cp.remove_concept("b")
+        assert len(_edges(net)) == 3
+        assert len(_edges(cp)) == 1
+        assert type(cp.store) is store_cls
+
+    def test_transaction_rollback(self, store_cls):
+        net = _make_net(store_cls)
+        before = _edges(net)
+        tx = net.begin()
+        net.remove_concept("a")
+        net.assert_fact("mark", ("x",))
+        tx.rollback()
+        assert _edges(net) == before
+        assert net.store.count() == 4
+
+
+def test_compact_store_compacts_dead_rows():
+    net = SemanticNetwork(store=CompactFactStore())
+    net.add_predicate(Predicate(name="n", arity=2))
+    for i in range(3000):
+        net.assert_fact("n", (i, i + 1))
+    for i in range(2500):
+        net.remove_fact(Statement("n", (i, i + 1)))
+    assert net.store.count("n") == 500
+    assert len(net.store._pred) < 3000  # мёртвые строки убраны
+    assert list(net.match("n", (2999, None))) == [Statement("n", (2999, 3000))]
+    assert sorted(s.args[0] for s in net.facts("n")) == list(range(2500, 3000))
+
+
+def test_compact_store_predicate_redeclared_with_new_arity():
+    net = SemanticNetwork(store=CompactFactStore())
+    net.add_predicate(Predicate(name="p", arity=1))
+    net.assert_fact("p", (1,))
+    net.remove_predicate("p")
+    net.add_predicate(Predicate(name="p", arity=2))
+    net.assert_fact("p", (1, 2))
+    assert [s.args for s in net.facts("p")] == [(1, 2)]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from collections.abc import Set
+
+import pytest
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+from ctmsn.core.store import CompactFactStore, FactView, IndexedFactStore
+
+from helpers import make_net
+
+STORES = [IndexedFactStore, CompactFactStore]
+
+
+def _make_net(store_cls) -> SemanticNetwork:
+    return make_net("ab", {"p": 1, "q": 2}, [("p", "a"), ("p", "b"), ("q", "ab")], store=store_cls())
+
+
+@pytest.mark.parametrize("store_cls", STORES)
+class TestFactView:
+    def test_view_is_read_only_set(self, store_cls):
+        net = _make_net(store_cls)
+        view = net.view("p")
+        assert isinstance(view, Set)
+        assert isinstance(view, FactView)
+        assert not hasattr(view, "add")
+        assert len(view) == 2
+        assert view == net.facts("p")
+
+    def test_view_is_live(self, store_cls):
+        net = _make_net(store_cls)
+        view = net.view("p")
+        st = Statement("p", (net.concepts["a"],))
+        assert st in view
+        net.remove_fact(st)
+        assert st not in view
+        assert len(view) == 1
+
+    def test_contains_checks_predicate(self, store_cls):
+        net = _make_net(store_cls)
+        q = Statement("q", (net.concepts["a"], net.concepts["b"]))
+        assert q in net.view()
+        assert q not in net.view("p")
+        assert "q" not in net.view()
+
+    def test_set_operations_return_frozenset(self, store_cls):
+        net = _make_net(store_cls)
+        union = net.view("p") | net.view("q")
+        assert isinstance(union, frozenset)
+        assert union == net.facts()
+
+    def test_count_and_contains(self, store_cls):
+        net = _make_net(store_cls)
+        assert net.count() == 3
+        assert net.count("p") == 2
+        assert net.count("missing") == 0
+        assert net.contains(Statement("q", (net.concepts["a"], net.concepts["b"])))
+        assert not net.contains(Statement("q", (net.concepts["b"], net.concepts["a"])))
+
+    def test_facts_still_returns_copy(self, store_cls):
+        net = _make_net(store_cls)
+        snapshot = net.facts("p")
+        for st in snapshot:
+            net.remove_fact(st)
+        assert len(snapshot) == 2
+        assert net.count("p") == 0
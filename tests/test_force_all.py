@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import itertools
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.forcing.extensions import components, extensions
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import PredicateDomain, RangeDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net, numbered
+
+
+def _make_net() -> SemanticNetwork:
+    c = numbered(4)
+    return make_net(c, {"r": 2}, [("r", (c[i], c[j])) for i, j in ((0, 1), (1, 2), (2, 3), (3, 3))])
+
+
+def _full_count(eng, ctx, phi, conds, variables):
+    values = [tuple(v.domain.enumerate_values()) for v in variables]
+    return sum(
+        eng.forces(ctx.extend(dict(zip(variables, combo))), phi, conds) is TriBool.TRUE
+        for combo in itertools.product(*values)
+    )
+
+
+def test_full_assignments_match_brute_force():
+    net = _make_net()
+    x, y = concept_vars(net, "xy")
+    k = Variable("k", RangeDomain(0, 5))
+    phi = FactAtom("r", (x, y))
+    conds = Conditions((Or((EqAtom(k, 1), EqAtom(k, 4))),))
+    eng = ForcingEngine(net)
+    results = list(eng.force_all(Context(), phi, conds, minimal=False))
+    assert len(results) == 4 * 2 == _full_count(eng, Context(), phi, conds, [x, y, k])
+    assert all(eng.forces(r.context, phi, conds) is TriBool.TRUE for r in results)
+    assert len({tuple(sorted(r.context.as_dict().items())) for r in results}) == len(results)
+    assert eng.count_forcing(Context(), phi, conds, minimal=False) == 8
+
+
+def test_minimal_extensions_leave_variables_free():
+    net = _make_net()
+    x, y = concept_vars(net, "xy")
+    c0, c3 = net.concepts["c0"], net.concepts["c3"]
+    phi = Or((EqAtom(x, c0), EqAtom(y, c3)))
+    eng = ForcingEngine(net)
+    found = [r.context.as_dict() for r in eng.force_all(Context(), phi, Conditions())]
+    assert sorted(found, key=repr) == sorted([{"x": c0}, {"y": c3}], key=repr)
+    assert eng.count_forcing(Context(), phi, Conditions()) == 2
+    assert eng.count_forcing(Context(), phi, Conditions(), minimal=False) == 4 + 4 - 1
+
+    forced = list(eng.force_all(Context({"x": c0}), phi, Conditions()))
+    assert len(forced) == 1 and forced[0].explanation == "Already forced"
+
+
+def test_components_multiply():
+    xs = [Variable(f"x{i}", RangeDomain(0, 9)) for i in range(6)]
+    # Три независимые пары: x0<->x1, x2<->x3, x4<->x5, по 10 решений на пару.
+    phi = And(tuple(EqAtom(xs[i], xs[i + 1]) for i in range(0, 6, 2)))
+    comps, ground = components(Context(), phi, xs)
+    assert [tuple(v.name for v in c.variables) for c in comps] == [("x0", "x1"), ("x2", "x3"), ("x4", "x5")]
+    assert ground == []
+    eng = ForcingEngine(SemanticNetwork())
+    assert eng.count_forcing(Context(), phi, Conditions()) == 10**3
+    stream = eng.force_all(Context(), phi, Conditions())
+    first = next(stream)
+    assert first.context.as_dict() == {f"x{i}": 0 for i in range(6)}
+    assert sum(1 for _ in stream) == 10**3 - 1
+
+
+def test_extensions_stream_lazily():
+    xs = [Variable(f"x{i}", RangeDomain(0, 29)) for i in range(4)]
+    # Одна компонента на 30**4 полных присваиваний, из них 30 вынуждающих.
+    goal = And((EqAtom(xs[0], xs[1]), EqAtom(xs[1], xs[2]), EqAtom(xs[2], xs[3])))
+    calls = 0
+
+    def counting(f, ctx):
+        nonlocal calls
+        calls += 1
+        return ForcingEngine(SemanticNetwork())._eval(f, ctx)
+
+    stream = extensions(Context(), goal, xs, counting, minimal=False)
+    assert next(stream) == tuple((v, 0) for v in xs)
+    assert calls < 100
+    assert sum(1 for _ in stream) == 29
+
+    # Несколько компонент: порядок — как у произведения списков расширений.
+    ys = [Variable(f"y{i}", RangeDomain(0, 2)) for i in range(2)]
+    goal = And((Not(EqAtom(xs[0], 1)), Not(EqAtom(ys[0], ys[1]))))
+    eng = ForcingEngine(SemanticNetwork())
+    got = [dict((v.name, val) for v, val in a) for a in extensions(Context(), goal, [xs[0]] + ys, eng._eval)]
+    x_part = [{"x0": v} for v in range(30) if v != 1]
+    y_part = [{"y0": a, "y1": b} for a in range(3) for b in range(3) if a != b]
+    assert got == [{**px, **py} for px, py in itertools.product(x_part, y_part)]
+
+
+def test_false_ground_and_propagation():
+    net = _make_net()
+    x, y = concept_vars(net, "xy")
+    phi = FactAtom("r", (x, y))
+    eng = ForcingEngine(net)
+    assert eng.count_forcing(Context(), phi, Conditions((Not(EqAtom(x, x)),))) == 0
+    assert list(eng.force_all(Context(), phi, Conditions((EqAtom(1, 2),)))) == []
+    w = Variable("w", PredicateDomain(fn=lambda v: True))
+    assert eng.count_forcing(Context(), phi, Conditions((EqAtom(w, 1),))) == 0
+
+    conds = Conditions((Not(EqAtom(y, net.concepts["c3"])),))
+    plain = eng.count_forcing(Context(), phi, conds, minimal=False)
+    assert plain == 2  # (c0, c1), (c1, c2)
+    assert ForcingEngine(net, propagate=True).count_forcing(Context(), phi, conds, minimal=False) == plain
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing import BacktrackingStrategy, Budget
+from ctmsn.forcing.budget import lazy_product
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.formula import EqAtom, FactAtom, Not
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import RangeDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net, numbered
+
+
+def _make_net(n: int = 30) -> SemanticNetwork:
+    c = numbered(n)
+    return make_net(c, {"r": 3}, [("r", (c[-1], c[-2], c[-3]))])
+
+
+def _problem(net: SemanticNetwork):
+    x, y, z = concept_vars(net, "xyz")
+    return (x, y, z), FactAtom("r", (x, y, z))
+
+
+def test_lazy_product_matches_itertools():
+    import itertools
+
+    doms = [range(3), ("a", "b"), (), range(2)]
+    assert list(lazy_product(doms[:2])) == list(itertools.product(*doms[:2]))
+    assert list(lazy_product(doms)) == []
+    assert list(lazy_product([])) == [()]
+
+
+def test_budget_lifts_max_branch():
+    net = _make_net()
+    (x, y, z), phi = _problem(net)
+    eng = ForcingEngine(net)
+    assert eng.force(Context(), phi, Conditions()).status is TriBool.UNKNOWN  # 27000 > 2000
+    res = eng.force(Context(), phi, Conditions(), budget=Budget())
+    assert res.status is TriBool.TRUE and res.exhaustive
+    assert res.context.get(x) == net.concepts["c29"]
+
+
+def test_node_and_time_limits_truncate():
+    net = _make_net()
+    _vars, phi = _problem(net)
+    eng = ForcingEngine(net)
+    res = eng.force(Context(), phi, Conditions(), budget=Budget(max_nodes=10))
+    assert res.status is TriBool.UNKNOWN and not res.exhaustive
+    assert res.explanation == "Search truncated: node limit 10 reached after 10 candidates"
+    res = eng.force(Context(), phi, Conditions(), budget=Budget(time_limit=0.0))
+    assert res.status is TriBool.UNKNOWN and not res.exhaustive
+    assert "time limit" in res.explanation
+    conds = Conditions((Not(EqAtom(phi.args[0], phi.args[0])),))
+    res = eng.force(Context(), phi, conds, BacktrackingStrategy(), budget=Budget(time_limit=0.0))
+    assert res.status is TriBool.UNKNOWN and not res.exhaustive
+
+
+def test_strategy_limits_are_not_exhaustive():
+    net = _make_net()
+    (x, y, z), phi = _problem(net)
+    eng = ForcingEngine(net)
+    res = eng.force(Context(), phi, Conditions())
+    assert res.status is TriBool.UNKNOWN and not res.exhaustive
+    assert "exceeds max_branch" in res.explanation
+    res = eng.force(Context(), phi, Conditions(), BacktrackingStrategy(max_nodes=50))
+    assert res.status is TriBool.UNKNOWN and not res.exhaustive
+    assert res.explanation == "Search exceeded max_nodes=50"
+    # С бюджетом max_nodes стратегии не действует — поиск ограничен бюджетом.
+    res = eng.force(Context(), phi, Conditions(), BacktrackingStrategy(max_nodes=50), budget=Budget(time_limit=5))
+    assert res.status is TriBool.TRUE and res.exhaustive
+    assert res.context.get(x) == net.concepts["c29"]
+
+
+def test_progress_and_cancellation():
+    net = _make_net()
+    _vars, phi = _problem(net)
+    seen = []
+    cancel = threading.Event()
+
+    def on_progress(p):
+        seen.append(p)
+        if p.nodes >= 3000:
+            cancel.set()
+
+    budget = Budget(progress=on_progress, progress_every=1000, cancel=cancel)
+    res = ForcingEngine(net).force(Context(), phi, Conditions(), budget=budget)
+    assert res.status is TriBool.UNKNOWN and not res.exhaustive
+    assert "cancelled after 3000 candidates" in res.explanation
+    assert [p.nodes for p in seen] == [1000, 2000, 3000, 3000]
+    assert all(p.remaining == 27000 - p.nodes for p in seen)
+
+
+def test_exhaustive_false_and_huge_lazy_domain():
+    net = _make_net(5)
+    (x, y, z), phi = _problem(net)
+    conds = Conditions((EqAtom(x, net.concepts["c0"]),))
+    res = ForcingEngine(net).force(Context(), phi, conds, budget=Budget(time_limit=10.0))
+    assert res.status is TriBool.FALSE and res.exhaustive
+
+    k = Variable("k", RangeDomain(0, 10**12))
+    res = ForcingEngine(net).force(Context(), EqAtom(k, 5), Conditions(), budget=Budget(time_limit=10.0))
+    assert res.status is TriBool.TRUE and res.context.get(k) == 5
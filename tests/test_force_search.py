@@ -1,4 +1,9 @@
 from __future__ import annotations
+import os
+import subprocess
+import sys
+import textwrap
+
 import pytest
 
 from ctmsn.core.concept import Concept
@@ -152,3 +157,33 @@ class TestForceSearch:
 
         f3 = EqAtom(x, y)
         assert collect_variables(f3) == frozenset({x, y})
+
+
+_HASHSEED_SCRIPT = textwrap.dedent(
+    """
+    from ctmsn.core.network import SemanticNetwork
+    from ctmsn.forcing.conditions import Conditions
+    from ctmsn.forcing.engine import ForcingEngine
+    from ctmsn.logic.formula import EqAtom, Or
+    from ctmsn.param.context import Context
+    from ctmsn.param.domain import EnumDomain
+    from ctmsn.param.variable import Variable
+
+    vs = [Variable(f"v{i}", EnumDomain((0, 1))) for i in range(8)]
+    res = ForcingEngine(SemanticNetwork()).force(Context(), Or(tuple(EqAtom(v, 1) for v in vs)), Conditions())
+    print(sorted(res.context.as_dict().items()))
+    """
+)
+
+
+def test_force_does_not_depend_on_hash_seed():
+    """Первое найденное присваивание одинаково при любом PYTHONHASHSEED."""
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    outputs = set()
+    for seed in ("0", "1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=src)
+        proc = subprocess.run(
+            [sys.executable, "-c", _HASHSEED_SCRIPT], env=env, capture_output=True, text=True, check=True
+        )
+        outputs.add(proc.stdout)
+    assert len(outputs) == 1
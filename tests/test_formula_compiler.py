@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from ctmsn import logic
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.logic.compiler import compile_formula, compiled
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Implies, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+
+from helpers import make_net
+
+
+def _make_net() -> SemanticNetwork:
+    facts = [("knows", "ab"), ("knows", "bc"), ("has_wing", "a")]
+    return make_net("abc", {"knows": 2, "has_wing": 1, "lacks_wing": 1}, facts)
+
+
+NET = _make_net()
+DOMAIN = EnumDomain(tuple(NET.concepts.values()))
+X, Y = Variable("x", DOMAIN), Variable("y", DOMAIN)
+TERMS = [X, Y, *NET.concepts.values(), "a"]
+
+
+def _random_formula(rng: random.Random, depth: int):
+    if depth == 0 or rng.random() < 0.3:
+        kind = rng.choice(["knows", "wing", "lacks", "eq"])
+        if kind == "knows":
+            return FactAtom("knows", (rng.choice(TERMS), rng.choice(TERMS)))
+        if kind == "wing":
+            return FactAtom("has_wing", (rng.choice(TERMS),))
+        if kind == "lacks":
+            return FactAtom("lacks_wing", (rng.choice(TERMS),))
+        return EqAtom(rng.choice(TERMS), rng.choice(TERMS))
+    kind = rng.choice([Not, And, Or, Implies])
+    if kind is Not:
+        return Not(_random_formula(rng, depth - 1))
+    if kind is Implies:
+        return Implies(_random_formula(rng, depth - 1), _random_formula(rng, depth - 1))
+    return kind(tuple(_random_formula(rng, depth - 1) for _ in range(rng.randint(0, 3))))
+
+
+def _contexts():
+    values = [None, *NET.concepts.values()]
+    for xv, yv in itertools.product(values, values):
+        ctx = Context()
+        if xv is not None:
+            ctx.set(X, xv)
+        if yv is not None:
+            ctx.set(Y, yv)
+        yield ctx
+
+
+def test_matches_interpreter_on_random_formulas():
+    rng = random.Random(7)
+    contexts = list(_contexts())
+    for _ in range(300):
+        f = _random_formula(rng, 4)
+        fn = compile_formula(f)
+        fn_schema = compile_formula(f, NET)
+        for ctx in contexts:
+            expected = evaluate(f, NET, ctx)
+            assert fn(NET, ctx) is expected, f
+            assert fn_schema(NET, ctx) is expected, f
+
+
+def test_schema_folds_undeclared_predicates():
+    f = FactAtom("unknown", (X,))
+    fn = compile_formula(f, NET)
+    assert fn(NET, Context()) is TriBool.UNKNOWN
+    ctx = Context()
+    ctx.set(X, NET.concepts["a"])
+    assert fn(NET, ctx) is TriBool.FALSE
+    assert compile_formula(Not(FactAtom("unknown", ("a",))), NET.predicates)(NET, ctx) is TriBool.TRUE
+
+
+def test_wildcard_none_goes_through_match():
+    f = FactAtom("knows", (NET.concepts["a"], None))
+    assert compile_formula(f)(NET, Context()) is evaluate(f, NET, Context()) is TriBool.TRUE
+
+
+def test_compiled_is_cached_per_node():
+    import gc
+    import weakref
+
+    f = And((FactAtom("knows", (X, Y)),))
+    assert compiled(f) is compiled(f)
+    assert "_compiled" not in f.__dict__  # frozen-узел не меняется
+    assert f == And((FactAtom("knows", (X, Y)),))
+    assert hash(f) == hash(And((FactAtom("knows", (X, Y)),)))
+    ref = weakref.ref(f)
+    del f
+    gc.collect()
+    assert ref() is None  # кеш не удерживает формулу
+
+
+def test_logic_compile_alias():
+    assert logic.compile is compile_formula
+
+
+def test_unsupported_formula():
+    with pytest.raises(TypeError):
+        compile_formula(object())  # type: ignore[arg-type]
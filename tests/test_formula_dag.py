@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import gc
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.experiment.case import staged_process_case
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.dag import DagEvaluator, FormulaFactory, evaluate_dag
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, FactAtom, Not
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+
+from helpers import concept_vars, make_net
+
+
+def _make_net() -> SemanticNetwork:
+    return make_net("ab", {"p": 1}, [("p", "a")])
+
+
+class TestFormulaFactory:
+    def test_equal_nodes_are_identical(self):
+        F = FormulaFactory()
+        a = Concept("a")
+        assert F.fact("p", a) is F.fact("p", a)
+        assert F.or_(F.fact("p", a), F.eq(a, "x")) is F.or_(F.fact("p", a), F.eq(a, "x"))
+        assert F.not_(F.fact("p", a)) is not F.fact("p", a)
+
+    def test_intern_canonicalizes_subtrees(self):
+        F = FormulaFactory()
+        a = Concept("a")
+        t1 = And((FactAtom("p", (a,)), Not(FactAtom("p", (a,)))))
+        t2 = And((FactAtom("p", (a,)), Not(FactAtom("p", (a,)))))
+        c1, c2 = F.intern(t1), F.intern(t2)
+        assert c1 is c2 and c1 == t1
+        assert c1.items[0] is c1.items[1].inner
+
+    def test_unreferenced_nodes_are_released(self):
+        F = FormulaFactory()
+        F.fact("p", "tmp")
+        gc.collect()
+        assert len(F) == 0
+
+    def test_staged_case_shares_atoms(self):
+        case = staged_process_case("x", 5)
+        inv_atoms = case.invariants.items[0].items
+        for rule, atom in zip(case.rules, inv_atoms):
+            assert rule.guard is atom
+
+
+class TestDagEvaluator:
+    def test_matches_tree_evaluation(self):
+        net = _make_net()
+        (x,) = concept_vars(net, "x")
+        F = FormulaFactory()
+        px = F.fact("p", x)
+        shared = F.or_(px, F.eq(x, net.concepts["b"]))
+        roots = [F.and_(shared, F.not_(px)), F.implies(shared, px), shared]
+        dag = DagEvaluator(roots)
+        assert id(shared) in dag.shared and id(px) in dag.shared
+        for value in (None, *net.concepts.values()):
+            ctx = Context() if value is None else Context().extend({x: value})
+            assert dag.evaluate(net, ctx) == tuple(evaluate(r, net, ctx) for r in roots)
+        assert evaluate_dag(roots[1], net, Context()) is TriBool.UNKNOWN
+
+    def test_shared_node_computed_once(self):
+        net = _make_net()
+        calls = []
+        F = FormulaFactory()
+        atom = F.fact("p", net.concepts["a"])
+        roots = [F.or_(atom, atom), F.and_(atom)]
+        dag = DagEvaluator(roots)
+        original = dag._compute
+
+        def counting(f, *rest):
+            calls.append(f)
+            return original(f, *rest)
+
+        dag._compute = counting  # type: ignore[method-assign]
+        assert dag.evaluate(net, Context()) == (TriBool.TRUE, TriBool.TRUE)
+        assert sum(1 for f in calls if f is atom) == 1
+
+    def test_forcing_check_with_shared_conditions(self):
+        net = _make_net()
+        F = FormulaFactory()
+        atom = F.fact("p", net.concepts["a"])
+        conds = Conditions((F.or_(atom, F.fact("p", net.concepts["b"])), F.not_(atom)))
+        res = ForcingEngine(net).check(Context(), conds)
+        assert not res.ok and res.violated == ["cond[1]"]
+        assert "_dag" not in conds.__dict__  # frozen Conditions не меняется
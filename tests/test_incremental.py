@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import random
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+from ctmsn.core.transaction import ADD, REMOVE
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Implies, Not, Or
+from ctmsn.logic.incremental import IncrementalEvaluator
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+from ctmsn.transition import (
+    AddFact,
+    RetractFact,
+    TransitionEngine,
+    TransitionRule,
+    invariants,
+    make_state,
+)
+
+from helpers import make_net
+
+
+def _make_net() -> SemanticNetwork:
+    return make_net("abc", {"has_p": 1, "r": 2, "other": 1})
+
+
+class TestSubscribe:
+    def test_notifications_and_unsubscribe(self):
+        net = _make_net()
+        a = net.concepts["a"]
+        events = []
+        unsubscribe = net.subscribe(lambda kind, st: events.append((kind, st.predicate)))
+        net.assert_fact("has_p", (a,))
+        net.assert_facts([("r", (a, a))])
+        with net.begin() as tx:
+            net.remove_fact(Statement("has_p", (a,)))
+            tx.rollback()
+        unsubscribe()
+        net.assert_fact("other", (a,))
+        assert events == [(ADD, "has_p"), (ADD, "r"), (REMOVE, "has_p"), (ADD, "has_p")]
+
+    def test_copy_does_not_inherit_listeners(self):
+        net = _make_net()
+        events = []
+        net.subscribe(lambda kind, st: events.append(kind))
+        net.copy().assert_fact("other", (net.concepts["a"],))
+        assert events == []
+
+
+class TestIncrementalEvaluator:
+    def test_matches_evaluate_under_random_mutations(self):
+        net = _make_net()
+        concepts = list(net.concepts.values())
+        dom = EnumDomain(tuple(concepts))
+        x, y = Variable("x", dom), Variable("y", dom)
+        a = net.concepts["a"]
+        formulas = [
+            FactAtom("has_p", (x,)),
+            FactAtom("lacks_p", (a,)),
+            And((FactAtom("r", (x, y)), Not(EqAtom(x, y)))),
+            Or((FactAtom("r", (a, y)), FactAtom("has_p", (y,)))),
+            Implies(FactAtom("has_p", (x,)), FactAtom("r", (x, None))),
+        ]
+        ctx = Context()
+        inc = IncrementalEvaluator(net, ctx)
+        for f in formulas:
+            inc.watch(f)
+        rng = random.Random(3)
+        for _ in range(300):
+            op = rng.random()
+            if op < 0.2:
+                var = rng.choice((x, y))
+                if rng.random() < 0.2:
+                    ctx.unset(var)
+                else:
+                    ctx.set(var, rng.choice(concepts))
+            else:
+                pred = rng.choice(("has_p", "r", "other"))
+                arity = net.predicates[pred].arity
+                st = Statement(pred, tuple(rng.choice(concepts) for _ in range(arity)))
+                if net.contains(st):
+                    net.remove_fact(st)
+                else:
+                    net.assert_fact(pred, st.args)
+            for f in formulas:
+                assert inc.value(f) is evaluate(f, net, ctx)
+
+    def test_unrelated_changes_cost_nothing(self):
+        net = _make_net()
+        a, b = net.concepts["a"], net.concepts["b"]
+        f = And((FactAtom("has_p", (a,)), FactAtom("r", (a, b))))
+        inc = IncrementalEvaluator(net)
+        inc.watch(f)
+        before = inc.recomputed
+        net.assert_fact("other", (a,))
+        net.assert_fact("has_p", (b,))
+        net.assert_fact("r", (b, a))
+        assert inc.value(f) is TriBool.FALSE
+        assert inc.recomputed == before
+        net.assert_fact("has_p", (a,))
+        assert inc.value(f) is TriBool.FALSE
+        # Перевычислен только атом has_p(a): значение And не изменилось.
+        assert inc.recomputed == before + 2
+
+    def test_bind_with_delta(self):
+        net = _make_net()
+        a = net.concepts["a"]
+        f = Not(FactAtom("has_p", (a,)))
+        inc = IncrementalEvaluator(net)
+        assert inc.value(f) is TriBool.TRUE
+        new = net.copy()
+        with new.begin() as tx:
+            new.assert_fact("has_p", (a,))
+        inc.bind(new, added=tx.added, removed=tx.removed)
+        assert inc.value(f) is TriBool.FALSE
+        # Старая сеть больше не отслеживается.
+        net.remove_predicate("has_p")
+        assert inc.value(f) is TriBool.FALSE
+        inc.close()
+
+
+def test_transition_engine_incremental_matches_plain():
+    net = SemanticNetwork()
+    for cid in ("obj", "a", "b", "c"):
+        net.add_concept(Concept(id=cid))
+    net.add_predicate(Predicate(name="at", arity=2))
+    obj, a, b, c = (net.concepts[i] for i in ("obj", "a", "b", "c"))
+    net.assert_fact("at", (obj, a))
+    rules = [
+        TransitionRule(
+            name=f"{src.id}->{dst.id}",
+            guard=FactAtom("at", (obj, src)),
+            effect=(RetractFact("at", ("obj", src.id)), AddFact("at", ("obj", dst.id))),
+        )
+        for src, dst in ((a, b), (b, c))
+    ]
+    inv = invariants(Or(tuple(FactAtom("at", (obj, s)) for s in (a, b, c))))
+    plain = TransitionEngine(rules=rules, invariants=inv).run_to_fixpoint(make_state(net))
+    engine = TransitionEngine(rules=rules, invariants=inv, incremental=True)
+    trace = engine.run_to_fixpoint(make_state(net))
+    assert trace == plain
+    assert trace.convergence_steps == 2
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.cow import CowIndex
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+
+
+def _chain_network(n: int = 50) -> SemanticNetwork:
+    net = SemanticNetwork()
+    for i in range(n):
+        net.add_concept(Concept(id=f"n{i}"))
+    net.add_predicate(Predicate(name="next", arity=2))
+    net.add_predicate(Predicate(name="mark", arity=1))
+    for i in range(n - 1):
+        net.assert_fact("next", (net.concepts[f"n{i}"], net.concepts[f"n{i + 1}"]))
+    return net
+
+
+def _ids(net: SemanticNetwork, pred: str) -> set:
+    return {tuple(a.id for a in s.args) for s in net.facts(pred)}
+
+
+class TestCowIndex:
+    def test_fork_shares_until_write(self):
+        idx = CowIndex()
+        idx.add("k", 1)
+        idx.add("other", 2)
+        child = idx.fork()
+        assert child.get("k") is idx.get("k")
+        child.add("k", 3)
+        assert idx.get("k") == {1}
+        assert child.get("k") == {1, 3}
+        # Нетронутая корзина по-прежнему общая.
+        assert child.get("other") is idx.get("other")
+
+    def test_parent_write_does_not_leak_into_child(self):
+        idx = CowIndex()
+        idx.add("k", 1)
+        child = idx.fork()
+        idx.discard("k", 1)
+        idx.add("new", 5)
+        assert child.get("k") == {1}
+        assert "new" not in child
+        assert "k" not in idx
+
+    def test_pop_returns_private_bucket(self):
+        idx = CowIndex()
+        idx.add("k", 1)
+        child = idx.fork()
+        popped = child.pop("k")
+        popped.add(99)
+        assert idx.get("k") == {1}
+
+    def test_readd_after_emptying(self):
+        idx = CowIndex()
+        idx.add("k", 1)
+        idx.fork()
+        idx.discard("k", 1)
+        idx.add("k", 2)
+        assert idx.get("k") == {2}
+
+
+class TestNetworkCopy:
+    def test_copy_mutations_are_isolated_both_ways(self):
+        net = _chain_network()
+        cp = net.copy()
+        n0, n1 = net.concepts["n0"], net.concepts["n1"]
+        cp.remove_fact(Statement("next", (n0, n1)))
+        cp.assert_fact("mark", (n0,))
+        net.assert_fact("mark", (n1,))
+        assert ("n0", "n1") in _ids(net, "next")
+        assert ("n0", "n1") not in _ids(cp, "next")
+        assert _ids(net, "mark") == {("n1",)}
+        assert _ids(cp, "mark") == {("n0",)}
+
+    def test_copy_of_copy_and_concept_removal(self):
+        net = _chain_network()
+        a = net.copy()
+        b = a.copy()
+        b.remove_concept("n10")
+        assert len(_ids(b, "next")) == len(_ids(net, "next")) - 2
+        assert len(_ids(a, "next")) == len(_ids(net, "next"))
+        assert list(a.match("next", (a.concepts["n10"], None)))
+
+    def test_copy_is_equal_to_original(self):
+        net = _chain_network()
+        cp = net.copy()
+        assert cp == net
+        cp.assert_fact("mark", (cp.concepts["n3"],))
+        assert cp != net
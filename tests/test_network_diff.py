@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import pytest
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.diff import NetworkDiff, apply_diff, diff_networks, merge_networks
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+from ctmsn.core.store import CompactFactStore, IndexedFactStore
+from ctmsn.io.serializer import dump_diff, dump_network, load_diff
+
+
+def _base(store_cls=IndexedFactStore) -> SemanticNetwork:
+    net = SemanticNetwork(store=store_cls())
+    for cid in ("a", "b", "c"):
+        net.add_concept(Concept(id=cid, label=cid.upper()))
+    net.add_predicate(Predicate(name="edge", arity=2))
+    net.add_predicate(Predicate(name="has_x", arity=1))
+    net.add_predicate(Predicate(name="lacks_x", arity=1))
+    a, b, c = (net.concepts[i] for i in "abc")
+    net.assert_fact("edge", (a, b))
+    net.assert_fact("edge", (b, c))
+    return net
+
+
+def _same(n1: SemanticNetwork, n2: SemanticNetwork) -> bool:
+    d1, d2 = dump_network(n1), dump_network(n2)
+    d1["facts"] = sorted(map(repr, d1["facts"]))
+    d2["facts"] = sorted(map(repr, d2["facts"]))
+    return d1 == d2
+
+
+def _edit(net: SemanticNetwork) -> SemanticNetwork:
+    new = net.copy()
+    a, c = new.concepts["a"], new.concepts["c"]
+    new.remove_fact(Statement("edge", (a, new.concepts["b"])))
+    new.assert_fact("edge", (a, c))
+    new.replace_concept("c", Concept(id="c", label="Cee"))
+    new.add_concept(Concept(id="d"))
+    new.add_predicate(Predicate(name="mark", arity=1))
+    return new
+
+
+class TestDiff:
+    def test_identical_copy_is_empty(self):
+        net = _base()
+        assert diff_networks(net, net.copy()).is_empty()
+
+    @pytest.mark.parametrize("store_cls", [IndexedFactStore, CompactFactStore])
+    def test_deltas(self, store_cls):
+        old = _base(store_cls)
+        new = _edit(old)
+        d = diff_networks(old, new)
+        assert {(s.args[0].id, s.args[1].id) for s in d.added_facts} == {("a", "c")}
+        assert {(s.args[0].id, s.args[1].id) for s in d.removed_facts} == {("a", "b")}
+        assert set(d.concepts) == {"c", "d"}
+        assert d.concepts["c"][0].label == "C" and d.concepts["c"][1].label == "Cee"
+        assert d.concepts["d"][0] is None
+        assert d.predicates["mark"] == (None, new.predicates["mark"])
+
+    def test_unrelated_networks(self):
+        old, new = _base(), _base()
+        new.assert_fact("has_x", (new.concepts["a"],))
+        d = diff_networks(old, new)
+        assert len(d) == 1 and not d.removed_facts
+
+    def test_shared_history_skips_untouched_buckets(self):
+        old = _base()
+        old.add_predicate(Predicate(name="big", arity=1))
+        old.assert_facts(("big", (i,)) for i in range(2000))
+        new = old.copy()
+        new.assert_fact("has_x", (new.concepts["a"],))
+        changed = list(old.store._by_pred.changed(new.store._by_pred))
+        assert [key for key, _a, _b in changed] == ["has_x"]
+
+    def test_apply_and_inverse(self):
+        old = _base()
+        new = _edit(old)
+        d = diff_networks(old, new)
+        target = old.copy()
+        apply_diff(target, d)
+        assert _same(target, new)
+        assert target.concepts["c"].label == "Cee"
+        apply_diff(target, d.inverse())
+        assert _same(target, old)
+
+    def test_apply_is_atomic(self):
+        net = _base()
+        a = net.concepts["a"]
+        net.assert_fact("lacks_x", (a,))
+        before = dump_network(net)
+        bad = NetworkDiff(
+            concepts={"e": (None, Concept(id="e"))},
+            added_facts=frozenset({Statement("has_x", (a,))}),
+        )
+        with pytest.raises(ValueError):
+            apply_diff(net, bad)
+        assert dump_network(net) == before
+
+    def test_serialization_roundtrip(self):
+        old = _base()
+        new = _edit(old)
+        d = diff_networks(old, new)
+        restored = load_diff(dump_diff(d), old)
+        assert restored.added_facts == d.added_facts
+        assert restored.removed_facts == d.removed_facts
+        target = old.copy()
+        apply_diff(target, restored)
+        assert _same(target, new)
+
+
+class TestMerge:
+    def test_disjoint_changes_merge_cleanly(self):
+        base = _base()
+        ours, theirs = base.copy(), base.copy()
+        ours.assert_fact("has_x", (ours.concepts["a"],))
+        theirs.add_concept(Concept(id="z"))
+        theirs.assert_fact("edge", (theirs.concepts["c"], theirs.concepts["z"]))
+        res = merge_networks(base, ours, theirs)
+        assert res.clean
+        assert "z" in res.network.concepts
+        assert res.network.count("edge") == 3
+        assert res.network.count("has_x") == 1
+        assert ours.count("edge") == 2
+
+    def test_same_change_on_both_sides(self):
+        base = _base()
+        ours, theirs = base.copy(), base.copy()
+        for n in (ours, theirs):
+            n.replace_concept("a", Concept(id="a", label="Alpha"))
+        assert merge_networks(base, ours, theirs).clean
+
+    def test_concept_conflict_keeps_ours(self):
+        base = _base()
+        ours, theirs = base.copy(), base.copy()
+        ours.replace_concept("a", Concept(id="a", label="ours"))
+        theirs.replace_concept("a", Concept(id="a", label="theirs"))
+        res = merge_networks(base, ours, theirs)
+        assert [(c.kind, c.key) for c in res.conflicts] == [("concept", "a")]
+        assert res.network.concepts["a"].label == "ours"
+
+    def test_remove_vs_use_conflict(self):
+        base = _base()
+        ours, theirs = base.copy(), base.copy()
+        ours.assert_fact("has_x", (ours.concepts["c"],))
+        theirs.remove_concept("c")
+        res = merge_networks(base, ours, theirs)
+        assert ("concept", "c") in [(c.kind, c.key) for c in res.conflicts]
+        assert "c" in res.network.concepts
+        assert res.network.count("has_x") == 1
+
+    def test_contradiction_conflict(self):
+        base = _base()
+        ours, theirs = base.copy(), base.copy()
+        ours.assert_fact("has_x", (ours.concepts["a"],))
+        theirs.assert_fact("lacks_x", (theirs.concepts["a"],))
+        res = merge_networks(base, ours, theirs)
+        assert [(c.kind, c.key) for c in res.conflicts] == [("fact", "lacks_x(a)")]
+        assert res.network.count("lacks_x") == 0
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import pytest
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+from ctmsn.core.store import CompactFactStore, IndexedFactStore
+from ctmsn.transition.model_check import _VisitedStates
+
+from helpers import make_net
+
+STORES = [IndexedFactStore, CompactFactStore]
+
+
+def _make_net(store_cls=IndexedFactStore) -> SemanticNetwork:
+    return make_net("abc", {"at": 2, "has_x": 1, "lacks_x": 1}, store=store_cls())
+
+
+def _full_fingerprint(net: SemanticNetwork) -> int:
+    fresh = SemanticNetwork(store=net.store.fork())
+    return fresh.fingerprint()
+
+
+@pytest.mark.parametrize("store_cls", STORES)
+class TestFingerprint:
+    def test_empty_network(self, store_cls):
+        assert _make_net(store_cls).fingerprint() == 0
+
+    def test_order_independent(self, store_cls):
+        n1, n2 = _make_net(store_cls), _make_net(store_cls)
+        a, b = n1.concepts["a"], n1.concepts["b"]
+        n1.fingerprint()
+        n1.assert_fact("at", (a, b))
+        n1.assert_fact("has_x", (a,))
+        n2.assert_fact("has_x", (a,))
+        n2.assert_fact("at", (a, b))
+        assert n1.fingerprint() == n2.fingerprint()
+
+    def test_incremental_matches_full(self, store_cls):
+        net = _make_net(store_cls)
+        a, b, c = (net.concepts[i] for i in "abc")
+        net.fingerprint()
+        net.assert_fact("at", (a, b))
+        net.assert_facts([("at", (b, c)), ("has_x", (c,))])
+        net.remove_fact(Statement("at", (a, b)))
+        assert net.fingerprint() == _full_fingerprint(net)
+        net.remove_concept("c")
+        assert net.fingerprint() == _full_fingerprint(net)
+
+    def test_add_remove_restores(self, store_cls):
+        net = _make_net(store_cls)
+        a, b = net.concepts["a"], net.concepts["b"]
+        net.assert_fact("has_x", (a,))
+        before = net.fingerprint()
+        st = net.assert_fact("at", (a, b))
+        assert net.fingerprint() != before
+        net.remove_fact(st)
+        assert net.fingerprint() == before
+
+    def test_rollback_restores(self, store_cls):
+        net = _make_net(store_cls)
+        a, b = net.concepts["a"], net.concepts["b"]
+        before = net.fingerprint()
+        tx = net.begin()
+        net.assert_fact("at", (a, b))
+        tx.rollback()
+        assert net.fingerprint() == before
+
+    def test_copy_inherits_and_diverges(self, store_cls):
+        net = _make_net(store_cls)
+        a, b = net.concepts["a"], net.concepts["b"]
+        net.assert_fact("at", (a, b))
+        fp = net.fingerprint()
+        cp = net.copy()
+        assert cp.fingerprint() == fp
+        cp.assert_fact("has_x", (a,))
+        assert cp.fingerprint() != fp
+        assert net.fingerprint() == fp
+
+
+def test_concept_and_literal_differ():
+    net = _make_net()
+    other = _make_net()
+    net.assert_fact("has_x", (net.concepts["a"],))
+    other.assert_fact("has_x", ("a",))
+    assert net.fingerprint() != other.fingerprint()
+
+
+def test_visited_states_resolves_collisions():
+    n1, n2 = _make_net(), _make_net()
+    n1.assert_fact("has_x", (n1.concepts["a"],))
+    n2.assert_fact("has_x", (n2.concepts["b"],))
+    visited = _VisitedStates()
+    visited.add(n1)
+    # Подделанная коллизия: отпечатки равны, факты — нет.
+    n2._fingerprint = n1.fingerprint()
+    assert n2 not in visited
+    assert n1.copy() in visited
+    visited.add(n2)
+    assert len(visited) == 2
+    assert n2 in visited
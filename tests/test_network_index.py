@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import FactAtom
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+
+
+def _edge_network() -> SemanticNetwork:
+    net = SemanticNetwork()
+    for cid in ("a", "b", "c"):
+        net.add_concept(Concept(id=cid, label=cid.upper()))
+    net.add_predicate(Predicate(name="edge", arity=3))
+    a, b, c = (net.concepts[i] for i in ("a", "b", "c"))
+    net.assert_fact("edge", ("f", a, b))
+    net.assert_fact("edge", ("g", a, c))
+    net.assert_fact("edge", ("f", b, c))
+    return net
+
+
+def _labels(sts) -> set[str]:
+    return {f"{s.args[0]}:{s.args[1].id}->{s.args[2].id}" for s in sts}
+
+
+class TestMatch:
+    def test_wildcards(self):
+        net = _edge_network()
+        a = net.concepts["a"]
+        assert _labels(net.match("edge", (None, a, None))) == {"f:a->b", "g:a->c"}
+        assert _labels(net.match("edge", ("f", None, None))) == {"f:a->b", "f:b->c"}
+        assert _labels(net.match("edge", (None, None, None))) == _labels(net.facts("edge"))
+
+    def test_ground_lookup(self):
+        net = _edge_network()
+        a, b = net.concepts["a"], net.concepts["b"]
+        assert list(net.match("edge", ("f", a, b))) == [Statement("edge", ("f", a, b))]
+        assert list(net.match("edge", ("g", a, b))) == []
+
+    def test_concept_matched_by_id_not_literal(self):
+        net = _edge_network()
+        # Концепт с тем же id, но другими метаданными совпадает; строка "a" — нет.
+        assert len(list(net.match("edge", (None, Concept(id="a"), None)))) == 2
+        assert list(net.match("edge", (None, "a", None))) == []
+
+    def test_arity_mismatch_and_unknown_predicate(self):
+        net = _edge_network()
+        assert list(net.match("edge", (None, None))) == []
+        assert list(net.match("missing", (None,))) == []
+
+    def test_index_follows_removals(self):
+        net = _edge_network()
+        a, b = net.concepts["a"], net.concepts["b"]
+        net.remove_fact(Statement("edge", ("f", a, b)))
+        assert list(net.match("edge", ("f", a, None))) == []
+        net.remove_concept("c")
+        assert list(net.match("edge", (None, None, None))) == []
+
+    def test_iterator_survives_mutation(self):
+        net = _edge_network()
+        a = net.concepts["a"]
+        for st in net.match("edge", (None, a, None)):
+            net.remove_fact(st)
+        assert list(net.match("edge", (None, a, None))) == []
+
+    def test_copy_has_independent_index(self):
+        net = _edge_network()
+        a, b = net.concepts["a"], net.concepts["b"]
+        cp = net.copy()
+        cp.remove_fact(Statement("edge", ("f", a, b)))
+        assert len(list(net.match("edge", ("f", a, b)))) == 1
+        assert list(cp.match("edge", ("f", a, b))) == []
+
+
+def test_evaluator_uses_index_with_lacks():
+    net = SemanticNetwork()
+    p, fly = Concept("penguin"), Concept("fly")
+    net.add_concept(p)
+    net.add_concept(fly)
+    net.add_predicate(Predicate(name="has_ability", arity=2))
+    net.add_predicate(Predicate(name="lacks_ability", arity=2))
+    ctx = Context()
+    assert evaluate(FactAtom("lacks_ability", (p, fly)), net, ctx) is TriBool.TRUE
+    net.assert_fact("has_ability", (p, fly))
+    assert evaluate(FactAtom("has_ability", (p, fly)), net, ctx) is TriBool.TRUE
+    assert evaluate(FactAtom("lacks_ability", (p, fly)), net, ctx) is TriBool.FALSE
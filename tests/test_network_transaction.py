@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+
+from ctmsn.core.concept import Concept
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.statement import Statement
+
+from helpers import make_net
+
+
+def _make_net() -> SemanticNetwork:
+    return make_net("abc", {"link": 2}, [("link", "ab"), ("link", "bc")])
+
+
+def _links(net: SemanticNetwork) -> set:
+    return {tuple(a.id for a in s.args) for s in net.facts("link")}
+
+
+class TestTransaction:
+    def test_delta_is_exact(self):
+        net = _make_net()
+        a, b, c = (net.concepts[i] for i in ("a", "b", "c"))
+        tx = net.begin()
+        net.assert_fact("link", (a, c))
+        net.remove_fact(Statement("link", (a, b)))
+        net.assert_fact("link", (c, a))
+        net.remove_fact(Statement("link", (c, a)))  # добавлен и убран — сокращается
+        tx.commit()
+        assert tx.added == {Statement("link", (a, c))}
+        assert tx.removed == {Statement("link", (a, b))}
+        assert not tx.active
+
+    def test_rollback_restores_facts_concepts_predicates(self):
+        net = _make_net()
+        before_links = _links(net)
+        before_concepts = dict(net.concepts)
+        before_preds = dict(net.predicates)
+        tx = net.begin()
+        net.remove_concept("b")
+        net.replace_concept("a", Concept(id="a", label="changed"))
+        net.add_predicate(Predicate(name="mark", arity=1))
+        net.assert_fact("mark", (net.concepts["c"],))
+        net.remove_predicate("link")
+        tx.rollback()
+        assert _links(net) == before_links
+        assert net.concepts == before_concepts
+        assert net.predicates == before_preds
+        assert list(net.facts("mark")) == []
+        assert list(net.match("link", (net.concepts["a"], None)))
+
+    def test_context_manager_rolls_back_on_error(self):
+        net = _make_net()
+        a, c = net.concepts["a"], net.concepts["c"]
+        with pytest.raises(KeyError):
+            with net.begin():
+                net.assert_fact("link", (a, c))
+                net.remove_fact(Statement("link", (c, a)))  # нет такого факта
+        assert ("a", "c") not in _links(net)
+
+    def test_nested_commit_and_rollback(self):
+        net = _make_net()
+        a, c = net.concepts["a"], net.concepts["c"]
+        outer = net.begin()
+        net.assert_fact("link", (a, c))
+        inner = net.begin()
+        net.assert_fact("link", (c, a))
+        inner.rollback()
+        inner2 = net.begin()
+        net.remove_fact(Statement("link", (a, c)))
+        inner2.commit()
+        outer.commit()
+        assert outer.added == set()
+        assert outer.removed == set()
+        assert _links(net) == {("a", "b"), ("b", "c")}
+
+    def test_only_innermost_can_finish(self):
+        net = _make_net()
+        outer = net.begin()
+        net.begin()
+        with pytest.raises(RuntimeError):
+            outer.commit()
+
+    def test_copy_does_not_inherit_transaction(self):
+        net = _make_net()
+        tx = net.begin()
+        cp = net.copy()
+        cp.assert_fact("link", (cp.concepts["c"], cp.concepts["a"]))
+        tx.commit()
+        assert tx.added == set()
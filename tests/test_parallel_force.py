@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+
+import pytest
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing import BruteEnumStrategy, ParallelStrategy, parallel
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.forcing.strategy import JoinStrategy
+from ctmsn.logic.formula import EqAtom, FactAtom, Not, Or
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import PredicateDomain, RangeDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net, numbered
+
+
+def _make_net() -> SemanticNetwork:
+    c = numbered(12)
+    return make_net(c, {"r": 2}, [("r", (c[i], c[j])) for i, j in ((9, 4), (7, 7), (11, 2), (9, 8))])
+
+
+def _problem(net: SemanticNetwork):
+    x, y = concept_vars(net, "xy")
+    k = Variable("k", RangeDomain(0, 19))
+    phi = FactAtom("r", (x, y))
+    conds = Conditions((Or((EqAtom(k, 13), EqAtom(k, 17))), Not(EqAtom(x, net.concepts["c7"]))))
+    return x, y, k, phi, conds
+
+
+def test_deterministic_matches_serial_order():
+    net = _make_net()
+    x, y, k, phi, conds = _problem(net)
+    ctx = Context()
+    # 12 * 12 * 20 = 2880 > 2000: последовательному перебору нужен больший max_branch
+    serial = ForcingEngine(net).force(ctx, phi, conds, BruteEnumStrategy(max_branch=10_000))
+    assert serial.status is TriBool.TRUE
+    for chunk in (None, 7):
+        res = ForcingEngine(net).force(ctx, phi, conds, ParallelStrategy(workers=2, chunk_size=chunk))
+        assert res.status is TriBool.TRUE
+        assert res.context.as_dict() == serial.context.as_dict()
+        assert res.explanation == serial.explanation
+
+
+def test_unbounded_max_branch():
+    net = _make_net()
+    x, y, k, phi, conds = _problem(net)
+    serial = ForcingEngine(net).force(Context(), phi, conds, BruteEnumStrategy(max_branch=None))
+    assert serial.status is TriBool.TRUE
+    unbounded = ((ParallelStrategy(max_branch=None, workers=2), None), (BruteEnumStrategy(max_branch=None), 2))
+    for strategy, workers in unbounded:
+        res = ForcingEngine(net).force(Context(), phi, conds, strategy, workers=workers)
+        assert res.context.as_dict() == serial.context.as_dict()
+    bounded = ForcingEngine(net).force(Context(), phi, conds, ParallelStrategy(max_branch=100, workers=2))
+    assert bounded.status is TriBool.UNKNOWN and "exceeds max_branch" in bounded.explanation
+
+
+def test_any_solution_and_workers_keyword():
+    net = _make_net()
+    x, y, k, phi, conds = _problem(net)
+    eng = ForcingEngine(net)
+    res = eng.force(Context(), phi, conds, ParallelStrategy(workers=2, chunk_size=5, deterministic=False))
+    assert res.status is TriBool.TRUE
+    assert eng.forces(res.context, phi, conds) is TriBool.TRUE
+    assert eng.force(Context(), phi, conds, workers=2).status is TriBool.TRUE
+    with pytest.raises(ValueError):
+        eng.force(Context(), phi, conds, JoinStrategy(), workers=2)
+
+
+def test_no_solution():
+    net = _make_net()
+    x, y, k, phi, conds = _problem(net)
+    conds = conds.add(EqAtom(k, 3))
+    res = ForcingEngine(net).force(Context(), phi, conds, ParallelStrategy(workers=2))
+    assert res.status is TriBool.FALSE
+
+
+def test_unpicklable_task_falls_back_to_serial():
+    net = _make_net()
+    (x,) = concept_vars(net, "x")
+    odd = Variable("w", PredicateDomain(fn=lambda v: True))  # сериализуется через formula_io
+    marker = lambda: None  # noqa: E731 — литерал, который pickle не сериализует
+    phi = FactAtom("r", (x, net.concepts["c4"]))
+    conds = Conditions((Not(EqAtom(marker, x)), Or((EqAtom(odd, odd), EqAtom(x, x)))))
+    res = ForcingEngine(net).force(Context(), phi, conds, ParallelStrategy(workers=2))
+    assert res.status is TriBool.TRUE
+    assert res.context.get(x) == net.concepts["c9"]
+
+
+def test_rows_start_without_skipping():
+    domains = [range(3), ("a", "b"), (), range(4)]
+    assert list(parallel._rows(domains, 0, 5)) == []
+    domains = [range(3), ("a", "b"), range(4)]
+    full = list(itertools.product(*domains))
+    for start, stop in ((0, 24), (5, 11), (7, 8), (23, 30), (24, 30), (3, 3)):
+        assert list(parallel._rows(domains, start, stop)) == full[start:stop]
+    assert list(parallel._rows([], 0, 1)) == [()]
+
+
+def test_running_chunk_stops_when_cancelled():
+    net = _make_net()
+    x, y, k, phi, conds = _problem(net)
+    domains = [tuple(net.concepts.values())] * 2 + [range(20)]
+    blob = parallel.pack(net, Context(), phi, conds.items, ["x", "y", "k"], domains)
+    bound = multiprocessing.get_context().Value("q", 10)
+    parallel._init_worker(blob, bound)
+    try:
+        serial = ForcingEngine(net).force(Context(), phi, conds, BruteEnumStrategy(max_branch=None))
+        row = parallel._scan(3, 0, 2880)
+        assert row is not None
+        assert parallel._scan(3, row, 2880) == row
+        assert bound.value == 3  # найденный диапазон отменяет следующие
+        assert parallel._scan(4, 0, 2880) is None
+        assert ForcingEngine._found(Context(), [x, y, k], domains, row).context.as_dict() == serial.context.as_dict()
+    finally:
+        parallel._state.clear()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.cache import EvalCache
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Implies, Not, Or
+from ctmsn.logic.planner import Planner, plan
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net, numbered
+
+
+def _make_net(n_big: int = 200) -> SemanticNetwork:
+    c = numbered(20)
+    big = [("big", (c[i % 20], c[(i // 20) % 20])) for i in range(n_big)]
+    return make_net(c, {"big": 2, "small": 1}, big + [("small", (c[0],))])
+
+
+class TestPlanner:
+    def test_cheap_equality_goes_first(self):
+        net = _make_net()
+        (x,) = concept_vars(net, "x")
+        scan = FactAtom("big", (x, None))
+        eq = EqAtom(x, net.concepts["c1"])
+        planned = plan(And((scan, eq)), net)
+        assert planned.items == (eq, scan)
+        # Or: сначала операнд, который скорее всего даст TRUE дёшево.
+        assert plan(Or((scan, eq)), net).items[0] is eq
+
+    def test_unbound_atom_costs_whole_predicate(self):
+        net = _make_net()
+        planner = Planner(net)
+        # match() без связанных позиций копирует всю корзину предиката.
+        assert planner.estimate(FactAtom("big", (None, None))).cost == 1.0 + 200
+        assert planner.estimate(FactAtom("big", (net.concepts["c0"], None))).cost == 1.0 + 200 / 20
+
+    def test_unchanged_nodes_are_kept(self):
+        net = _make_net()
+        # Почти всегда истинная константа в And бесполезна для остановки — уже в конце.
+        f = And((FactAtom("small", (net.concepts["c0"],)), EqAtom(net.concepts["c1"], net.concepts["c1"])))
+        assert plan(f, net) is f
+
+    def test_observed_hit_rate_overrides_counts(self):
+        net = _make_net()
+        (x,) = concept_vars(net, "x")
+        planner = Planner(net, min_samples=5)
+        assert planner.hit_rate("small") is None
+        for c in list(net.concepts.values())[:10]:
+            planner.observe(FactAtom("small", (x,)), Context(_values={"x": c}))
+        assert planner.hit_rate("small") == 0.1
+
+    def test_reordering_preserves_semantics(self):
+        net = _make_net(60)
+        cs = list(net.concepts.values())[:4]
+        dom = EnumDomain(tuple(cs))
+        x, y = Variable("x", dom), Variable("y", dom)
+        atoms = [
+            FactAtom("big", (x, y)),
+            FactAtom("big", (x, None)),
+            FactAtom("small", (y,)),
+            EqAtom(x, y),
+            EqAtom(x, cs[0]),
+        ]
+        rng = random.Random(9)
+
+        def gen(depth):
+            if depth == 0 or rng.random() < 0.3:
+                return rng.choice(atoms)
+            kind = rng.choice(("not", "and", "or", "implies"))
+            if kind == "not":
+                return Not(gen(depth - 1))
+            if kind == "implies":
+                return Implies(gen(depth - 1), gen(depth - 1))
+            items = tuple(gen(depth - 1) for _ in range(rng.randint(1, 4)))
+            return And(items) if kind == "and" else Or(items)
+
+        values = [None] + cs
+        contexts = [
+            Context(_values={k: v for k, v in (("x", vx), ("y", vy)) if v is not None})
+            for vx, vy in itertools.product(values, repeat=2)
+        ]
+        for _ in range(100):
+            f = gen(3)
+            p = plan(f, net)
+            for ctx in contexts:
+                assert evaluate(p, net, ctx) is evaluate(f, net, ctx)
+
+
+def test_forcing_engine_reorder_option():
+    net = _make_net()
+    (x,) = concept_vars(net, "x")
+    phi = And((FactAtom("big", (x, None)), EqAtom(x, net.concepts["c3"])))
+    conds = Conditions((Not(FactAtom("small", (x,))),))
+    plain = ForcingEngine(net, cache=EvalCache()).force(Context(), phi, conds)
+    planned = ForcingEngine(net, cache=EvalCache(), reorder=True).force(Context(), phi, conds)
+    assert plain.status is planned.status is TriBool.TRUE
+    assert planned.context.as_dict() == plain.context.as_dict()
+    assert planned.explanation == plain.explanation
+
+
+def test_forcing_engine_feeds_observations():
+    net = _make_net()
+    (x,) = concept_vars(net, "x")
+    phi = FactAtom("big", (x, None))
+    conds = Conditions((Not(FactAtom("small", (x,))),))
+    eng = ForcingEngine(net, reorder=True, planner=Planner(net, min_samples=2))
+    res = eng.force(Context(), phi, conds)
+    assert res.context.get(x) == net.concepts["c1"]
+    planner = eng.planner
+    # Кандидаты c0 (small истинно) и c1.
+    assert planner is not None and planner.hit_rate("small") == 0.5
+    eng.force(Context(), phi, conds)
+    assert eng.planner is planner and planner.hit_rate("small") == 0.5
+    assert planner.hit_rate("big") == 1.0
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import random
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.core.store import CompactFactStore
+from ctmsn.experiment import run_case, staged_process_case
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Formula, Implies, Not, Or
+from ctmsn.logic.profile import Profiler
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+from ctmsn.transition.engine import TransitionEngine, make_state
+
+from helpers import concept_vars, make_net
+
+
+def _make_net(store=None) -> SemanticNetwork:
+    facts = [("has_p", "a"), ("r", "ab"), ("r", "ac"), ("r", "bc")]
+    return make_net("abc", {"has_p": 1, "r": 2}, facts, store=store)
+
+
+def test_counts_calls_and_short_circuits():
+    net = _make_net()
+    a, b = net.concepts["a"], net.concepts["b"]
+    pa, pb = FactAtom("has_p", (a,)), FactAtom("has_p", (b,))
+    f = And((pb, pa))
+    p = Profiler()
+    for _ in range(3):
+        assert p.evaluate(f, net, Context()) is TriBool.FALSE
+    rep = p.report()
+    by_node = {id(n.formula): n for n in rep.nodes}
+    assert rep.evaluations == 3
+    assert by_node[id(f)].calls == 3
+    assert by_node[id(f)].short_circuits == 3
+    assert by_node[id(pb)].calls == 3
+    assert id(pa) not in by_node  # после FALSE не вычислялся
+    assert by_node[id(f)].time >= by_node[id(pb)].time
+
+
+def test_facts_scanned_uses_index():
+    for store in (None, CompactFactStore()):
+        net = _make_net(store)
+        a, b = net.concepts["a"], net.concepts["b"]
+        (x,) = concept_vars(net, "x")
+        p = Profiler()
+        p.evaluate(FactAtom("r", (a, b)), net, Context())  # min(|r(a, _)|, |r(_, b)|) = 1
+        p.evaluate(FactAtom("r", (b, a)), net, Context())  # корзина r(_, a) пуста
+        p.evaluate(FactAtom("r", (x, b)), net, Context())  # x не задана — не ищем
+        scanned = {str(n.formula.args): n.facts_scanned for n in p.report().atoms()}
+        assert sorted(scanned.values()) == [0, 0, 1]
+        assert net.scan_size("r", (None, None)) == 3
+        assert net.scan_size("r", (a,)) == 0  # неверная арность
+
+
+def _random_formula(rng: random.Random, terms, depth: int) -> Formula:
+    if depth == 0 or rng.random() < 0.3:
+        if rng.random() < 0.6:
+            return FactAtom("has_p", (rng.choice(terms),))
+        return EqAtom(rng.choice(terms), rng.choice(terms))
+    kind = rng.choice(("not", "and", "or", "implies"))
+    if kind == "not":
+        return Not(_random_formula(rng, terms, depth - 1))
+    if kind == "implies":
+        return Implies(_random_formula(rng, terms, depth - 1), _random_formula(rng, terms, depth - 1))
+    items = tuple(_random_formula(rng, terms, depth - 1) for _ in range(rng.randint(0, 3)))
+    return And(items) if kind == "and" else Or(items)
+
+
+def test_same_values_as_evaluate():
+    net = _make_net()
+    a, b = net.concepts["a"], net.concepts["b"]
+    x = Variable("x", EnumDomain((a, b)))
+    rng = random.Random(20)
+    ctx_x = Context()
+    ctx_x.set(x, b)
+    p = Profiler()
+    for _ in range(200):
+        f = _random_formula(rng, [a, b, x], 4)
+        for ctx in (Context(), ctx_x):
+            assert p.evaluate(f, net, ctx) is evaluate(f, net, ctx)
+
+
+def test_report_hot_atoms_and_predicates():
+    net = _make_net()
+    a, b, c = (net.concepts[k] for k in "abc")
+    p = Profiler()
+    f = Or((FactAtom("r", (b, a)), FactAtom("r", (a, c)), FactAtom("has_p", (a,))))
+    for _ in range(5):
+        p.evaluate(f, net, Context())
+    rep = p.report()
+    assert {n.formula.predicate for n in rep.hot_atoms(2)} == {"r"}
+    preds = {pp.predicate: pp for pp in rep.predicates()}
+    assert preds["r"].atoms == 2 and preds["r"].calls == 10
+    assert "has_p" not in preds  # Or остановился на r(a, c)
+    text = rep.format()
+    assert "r(a, c)" in text and "предикаты" in text
+    p.reset()
+    assert p.report().nodes == ()
+
+
+def test_forcing_engine_profiles_user_formulas():
+    net = _make_net()
+    a = net.concepts["a"]
+    (x,) = concept_vars(net, "x")
+    phi = FactAtom("has_p", (x,))
+    cond = Not(EqAtom(x, net.concepts["c"]))
+    p = Profiler()
+    res = ForcingEngine(net, profiler=p).force(Context(), phi, Conditions((cond,)))
+    assert res.status is TriBool.TRUE and res.context.get(x) == a
+    by_node = {id(n.formula): n for n in p.report().nodes}
+    assert id(phi) in by_node and id(cond) in by_node
+
+
+def test_transition_engine_and_runner():
+    case = staged_process_case("s", 3)
+    p = Profiler()
+    engine = TransitionEngine(rules=list(case.rules), invariants=case.invariants, profiler=p)
+    trace = engine.run_to_fixpoint(make_state(case.net, case.context))
+    plain = TransitionEngine(rules=list(case.rules), invariants=case.invariants)
+    assert trace == plain.run_to_fixpoint(make_state(case.net, case.context))
+    guards = {id(r.guard) for r in case.rules}
+    assert guards <= {id(n.formula) for n in p.report().nodes}
+
+    result = run_case(case, profile=True)
+    assert result.profile is not None and result.profile.evaluations > 0
+    assert run_case(case).profile is None
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import random
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing import BacktrackingStrategy, BruteEnumStrategy
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.forcing.propagation import propagate
+from ctmsn.forcing.strategy import JoinStrategy, Strategy
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Not
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import PredicateDomain, RangeDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net, numbered
+
+
+def _make_net(n: int = 30) -> SemanticNetwork:
+    c = numbered(n)
+    chain = [("r", (c[i], c[i + 1])) for i in range(n - 1)]
+    return make_net(c, {"has_p": 1, "r": 2}, [("has_p", (c[3],)), ("has_p", (c[7],))] + chain)
+
+
+def _var(net: SemanticNetwork, name: str) -> Variable:
+    return concept_vars(net, [name])[0]
+
+
+def test_unary_and_binary_pruning():
+    net = _make_net()
+    x, y, z = _var(net, "x"), _var(net, "y"), _var(net, "z")
+    goal = And((FactAtom("has_p", (y,)), FactAtom("r", (x, y)), FactAtom("r", (y, z))))
+    prop = propagate(net, Context(), goal, [x, y, z])
+    c = net.concepts
+    assert prop.domains[y] == (c["c3"], c["c7"])
+    assert prop.domains[x] == (c["c2"], c["c6"])
+    assert prop.domains[z] == (c["c4"], c["c8"])
+    assert prop.sizes == {"x": (30, 2), "y": (30, 2), "z": (30, 2)}
+    assert prop.describe() == "pruned domains: x 30->2, y 30->2, z 30->2"
+    assert not prop.empty
+
+
+def test_context_values_and_skipped_variables():
+    net = _make_net()
+    x, y = _var(net, "x"), _var(net, "y")
+    anyv = Variable("w", PredicateDomain(fn=lambda _: True))
+    ctx = Context()
+    ctx.set(y, net.concepts["c5"])
+    goal = And((FactAtom("r", (x, y)), EqAtom(anyv, x)))
+    prop = propagate(net, ctx, goal, [x, y, anyv])
+    assert prop.domains == {x: (net.concepts["c4"],)}
+    k = Variable("k", RangeDomain(0, 9))
+    prop = propagate(net, Context(), And((Not(EqAtom(k, 3)), EqAtom(k, k))), [k])
+    assert prop.domains[k] == (0, 1, 2, 4, 5, 6, 7, 8, 9)
+
+
+def test_force_beyond_max_branch_and_explanation():
+    net = _make_net()
+    x, y, z = _var(net, "x"), _var(net, "y"), _var(net, "z")
+    phi = FactAtom("has_p", (y,))
+    conds = Conditions((FactAtom("r", (x, y)), FactAtom("r", (y, z))))
+    assert ForcingEngine(net).force(Context(), phi, conds).status is TriBool.UNKNOWN
+    res = ForcingEngine(net, propagate=True).force(Context(), phi, conds)
+    assert res.status is TriBool.TRUE
+    assert res.explanation.startswith("Found assignment")
+    assert "pruned domains: x 30->2, y 30->2, z 30->2" in res.explanation
+
+
+def test_empty_domain_is_false_without_search():
+    net = _make_net()
+    x = _var(net, "x")
+    conds = Conditions((FactAtom("has_p", (x,)), FactAtom("r", (x, net.concepts["c0"]))))
+    res = ForcingEngine(net, propagate=True).force(Context(), EqAtom(x, x), conds)
+    assert res.status is TriBool.FALSE
+    assert "x 30->0" in res.explanation
+
+
+class _Plain(Strategy):
+    def candidates(self, ctx, vars_to_assign):
+        return BruteEnumStrategy(100_000).candidates(ctx, vars_to_assign)
+
+
+def test_same_result_as_without_propagation():
+    net = _make_net(8)
+    rng = random.Random(22)
+    vs = [_var(net, n) for n in "xyz"]
+    c = list(net.concepts.values())
+    for _ in range(30):
+        atoms = []
+        for _k in range(rng.randint(1, 4)):
+            a, b = rng.sample(vs + c[:2], 2)
+            atoms.append(rng.choice((FactAtom("r", (a, b)), Not(EqAtom(a, b)), FactAtom("has_p", (a,)))))
+        phi, conds = atoms[0], Conditions(tuple(atoms[1:]))
+        for strategy in (BruteEnumStrategy(), JoinStrategy(), BacktrackingStrategy(), _Plain()):
+            plain = ForcingEngine(net).force(Context(), phi, conds, strategy)
+            pruned = ForcingEngine(net, propagate=True).force(Context(), phi, conds, strategy)
+            assert pruned.status is plain.status
+            if plain.status is TriBool.TRUE and not isinstance(strategy, BacktrackingStrategy):
+                assert pruned.context.as_dict() == plain.context.as_dict()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+from ctmsn.core.predicate import Predicate
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.forcing.strategy import JoinStrategy
+from ctmsn.logic import query
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Not
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain, PredicateDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net
+
+
+def _make_net() -> SemanticNetwork:
+    edges = [("edge", e) for e in ("ab", "bc", "cd", "ac", "bb")]
+    return make_net("abcd", {"edge": 2, "has_mark": 1}, edges + [("has_mark", "c")])
+
+
+def _brute(net, formula, variables):
+    out = []
+    for combo in itertools.product(net.concepts.values(), repeat=len(variables)):
+        ctx = Context(_values={v.name: val for v, val in zip(variables, combo)})
+        if evaluate(formula, net, ctx) is TriBool.TRUE:
+            out.append(dict(zip(variables, combo)))
+    return out
+
+
+def _key(bindings):
+    return sorted(tuple(sorted((v.name, val.id) for v, val in b.items())) for b in bindings)
+
+
+class TestQuery:
+    def test_join_matches_enumeration(self):
+        net = _make_net()
+        x, y, z = concept_vars(net, "xyz")
+        goal = And((FactAtom("edge", (x, y)), FactAtom("edge", (y, z)), FactAtom("edge", (x, z))))
+        assert _key(query(net, goal)) == _key(_brute(net, goal, (x, y, z)))
+
+    def test_filters_and_repeated_variables(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        goal = And((
+            FactAtom("edge", (x, y)),
+            Not(EqAtom(x, net.concepts["a"])),
+            FactAtom("lacks_mark", (y,)),
+        ))
+        assert _key(query(net, goal)) == _key(_brute(net, goal, (x, y)))
+        assert _key(query(net, FactAtom("edge", (x, x)))) == [(("x", "b"),)]
+
+    def test_context_values_are_constants(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        ctx = Context(_values={"x": net.concepts["a"]})
+        res = list(query(net, FactAtom("edge", (x, y)), ctx))
+        assert _key(res) == [(("y", "b"),), (("y", "c"),)]
+
+    def test_domain_restricts_values(self):
+        net = _make_net()
+        only_b = Variable("y", PredicateDomain(lambda v: getattr(v, "id", None) == "b"))
+        (x,) = concept_vars(net, "x")
+        assert _key(query(net, FactAtom("edge", (x, only_b)))) == [(("x", "a"), ("y", "b")), (("x", "b"), ("y", "b"))]
+
+    def test_unbound_filter_variable(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        with pytest.raises(ValueError, match="y"):
+            list(query(net, And((FactAtom("edge", (x, x)), EqAtom(x, y)))))
+
+    def test_large_domains_use_join(self):
+        net = SemanticNetwork()
+        net.add_predicate(Predicate(name="r", arity=2))
+        net.assert_facts(("r", (i, i + 1)) for i in range(1000))
+        dom = EnumDomain(tuple(range(1001)))
+        x, y, z = (Variable(n, dom) for n in "xyz")
+        goal = And((FactAtom("r", (x, y)), FactAtom("r", (y, z))))
+        res = list(query(net, goal))
+        assert len(res) == 999
+        assert all(b[y] == b[x] + 1 and b[z] == b[y] + 1 for b in res)
+
+
+class TestJoinStrategy:
+    def test_force_with_join_strategy(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        phi = And((FactAtom("edge", (x, y)), FactAtom("has_mark", (y,))))
+        conds = Conditions((Not(EqAtom(x, y)),))
+        res = ForcingEngine(net).force(Context(), phi, conds, JoinStrategy())
+        assert res.status is TriBool.TRUE
+        assert res.context.get(y).id == "c"
+        assert res.context.get(x).id in ("a", "b")
+
+    def test_extra_variables_are_enumerated(self):
+        net = _make_net()
+        x, y, w = concept_vars(net, "xyw")
+        phi = And((FactAtom("edge", (x, y)), EqAtom(w, net.concepts["d"]), FactAtom("has_mark", (y,))))
+        res = ForcingEngine(net).force(Context(), phi, Conditions(), JoinStrategy())
+        assert res.status is TriBool.TRUE
+        assert res.context.get(w).id == "d"
+
+    def test_no_solution(self):
+        net = _make_net()
+        (x,) = concept_vars(net, "x")
+        phi = And((FactAtom("edge", (x, x)), FactAtom("has_mark", (x,))))
+        res = ForcingEngine(net).force(Context(), phi, Conditions(), JoinStrategy())
+        assert res.status is TriBool.FALSE
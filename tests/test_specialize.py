@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+from ctmsn.core.network import SemanticNetwork
+from ctmsn.forcing.conditions import Conditions
+from ctmsn.forcing.engine import ForcingEngine
+from ctmsn.logic import specialize
+from ctmsn.logic.cache import EvalCache
+from ctmsn.logic.evaluator import evaluate
+from ctmsn.logic.formula import And, EqAtom, FactAtom, Formula, Implies, Not, Or
+from ctmsn.logic.partial import FALSE_FORMULA, TRUE_FORMULA
+from ctmsn.logic.tribool import TriBool
+from ctmsn.param.context import Context
+from ctmsn.param.domain import EnumDomain
+from ctmsn.param.variable import Variable
+
+from helpers import concept_vars, make_net
+
+
+def _make_net() -> SemanticNetwork:
+    facts = [("has_p", "a"), ("r", "ab"), ("r", "bb"), ("r", "bc")]
+    return make_net("abc", {"has_p": 1, "r": 2}, facts)
+
+
+def _has_facts(f: Formula) -> bool:
+    if isinstance(f, FactAtom):
+        return True
+    if isinstance(f, Not):
+        return _has_facts(f.inner)
+    if isinstance(f, (And, Or)):
+        return any(_has_facts(it) for it in f.items)
+    if isinstance(f, Implies):
+        return _has_facts(f.left) or _has_facts(f.right)
+    return False
+
+
+def _random_formula(rng, atoms, depth=3):
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(atoms)
+    kind = rng.choice(("not", "and", "or", "implies"))
+    if kind == "not":
+        return Not(_random_formula(rng, atoms, depth - 1))
+    if kind == "implies":
+        return Implies(_random_formula(rng, atoms, depth - 1), _random_formula(rng, atoms, depth - 1))
+    items = tuple(_random_formula(rng, atoms, depth - 1) for _ in range(rng.randint(0, 3)))
+    return And(items) if kind == "and" else Or(items)
+
+
+class TestSpecialize:
+    def test_ground_atoms_fold(self):
+        net = _make_net()
+        a, c = net.concepts["a"], net.concepts["c"]
+        assert specialize(FactAtom("has_p", (a,)), net) == TRUE_FORMULA
+        assert specialize(FactAtom("lacks_p", (a,)), net) == FALSE_FORMULA
+        assert specialize(And((FactAtom("has_p", (c,)), EqAtom(a, a))), net) == FALSE_FORMULA
+        assert specialize(Implies(EqAtom(a, c), FactAtom("has_p", (c,))), net) == TRUE_FORMULA
+
+    def test_variable_atom_becomes_equalities(self):
+        net = _make_net()
+        (x,) = concept_vars(net, "x")
+        res = specialize(FactAtom("r", (net.concepts["b"], x)), net)
+        assert isinstance(res, Or)
+        assert set(res.items) == {EqAtom(x, net.concepts["b"]), EqAtom(x, net.concepts["c"])}
+
+    def test_equivalent_on_every_extension(self):
+        net = _make_net()
+        concepts = list(net.concepts.values())
+        dom = EnumDomain(tuple(concepts))
+        x, y = Variable("x", dom), Variable("y", dom)
+        a = net.concepts["a"]
+        atoms = [
+            FactAtom("has_p", (x,)),
+            FactAtom("lacks_p", (y,)),
+            FactAtom("r", (x, y)),
+            FactAtom("r", (x, x)),
+            FactAtom("r", (a, y)),
+            FactAtom("r", (y, None)),
+            FactAtom("has_p", (a,)),
+            EqAtom(x, y),
+            EqAtom(x, a),
+        ]
+        values = [None] + concepts
+        contexts = []
+        for vx, vy in itertools.product(values, repeat=2):
+            ctx = Context()
+            if vx is not None:
+                ctx.set(x, vx)
+            if vy is not None:
+                ctx.set(y, vy)
+            contexts.append(ctx)
+        empty = SemanticNetwork()
+        rng = random.Random(5)
+        for _ in range(200):
+            f = _random_formula(rng, atoms)
+            for base in (Context(), Context(_values={"x": concepts[1]})):
+                residual = specialize(f, net, base)
+                assert not _has_facts(residual)
+                for ctx in contexts:
+                    if any(ctx._values.get(k) != v for k, v in base._values.items()):
+                        continue
+                    assert evaluate(residual, empty, ctx) is evaluate(f, net, ctx)
+
+    def test_max_bindings_keeps_atom(self):
+        net = _make_net()
+        x, y = concept_vars(net, "xy")
+        f = FactAtom("r", (x, y))
+        assert specialize(f, net, max_bindings=2) is f
+
+
+def test_force_on_residual_matches_cached_search():
+    net = _make_net()
+    x, y = concept_vars(net, "xy")
+    phi = FactAtom("r", (x, y))
+    conds = Conditions((Not(EqAtom(x, y)), FactAtom("lacks_p", (x,))))
+    res = ForcingEngine(net).force(Context(), phi, conds)
+    cached = ForcingEngine(net, cache=EvalCache()).force(Context(), phi, conds)
+    assert res.status is cached.status is TriBool.TRUE
+    assert res.context.as_dict() == cached.context.as_dict()
+    assert (res.context.get(x).id, res.context.get(y).id) == ("b", "c")